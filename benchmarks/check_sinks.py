@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Changed-only output check for the SMB upload and the MQTT publisher
+
+Runs `process_images()` against the local FTP stand-in with the
+standalone-mode SMB upload writing to LocalSMBClient and the MQTT publisher
+connected to LocalMQTTBroker, and checks after every step that:
+
+- only files whose content changed were uploaded, and the share holds
+  exactly the current outputs
+- only topics whose resource changed were published
+- the timestamp file was uploaded and published after everything else
+
+The steps are a cold cycle, a repeat cycle with no new radar data, a loop
+re-encode with a new frame duration, and a cycle after a new scan appears
+on the FTP server:
+
+    python benchmarks/check_sinks.py
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+from local_servers import LocalFTPServer, LocalMQTTBroker, LocalSMBClient, LocalTileServer  # noqa: E402
+from run_benchmarks import BACKGROUNDS, build_config  # noqa: E402
+
+SMB_SERVER = 'nas'
+SMB_SHARE = 'radar'
+SMB_REMOTE_PATH = '/bom'
+MQTT_TOPIC_PREFIX = 'bom_radar'
+MQTT_TIMEOUT_SECONDS = 10     # Longest wait for the expected publishes to reach the broker
+MQTT_SETTLE_SECONDS = 0.5     # Extra wait to catch publishes beyond the expected ones
+
+
+def mqtt_topics(config):
+    """Topic suffix -> FrameStore resource, as configured by the add-on"""
+    return {
+        'loop': config['animated_gif_filename'],
+        'latest': 'latest.png',
+        'status': 'radar_status.json',
+        'timestamp': config['timestamp_filename'],
+    }
+
+
+def synced_files(processor):
+    """The outputs the SMB upload is responsible for, as {name: bytes}"""
+    names = list(processor.saved_filenames) + [processor.config['timestamp_filename']]
+    return {name: processor.encoded_outputs[name] for name in names if name in processor.encoded_outputs}
+
+
+def wait_for_messages(broker, count):
+    """Wait until the broker has received `count` publishes, then a little longer for strays"""
+    deadline = time.monotonic() + MQTT_TIMEOUT_SECONDS
+    while len(broker.messages) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(MQTT_SETTLE_SECONDS)
+    with broker.lock:
+        return list(broker.messages)
+
+
+def check_step(name, run, processor, smb_client, broker, state):
+    """Run one step and compare what reached the share and the broker with what changed
+
+    Args:
+        name: Step label for the report
+        run: Callable performing the step; returns False on failure
+        state: {'files': {name: bytes}, 'etags': {topic: etag}} from the previous step, updated here
+
+    Returns:
+        dict: Uploaded and published names, the expected ones, and failures
+    """
+    topics = mqtt_topics(processor.config)
+    timestamp_name = processor.config['timestamp_filename']
+    timestamp_topic = f"{MQTT_TOPIC_PREFIX}/timestamp"
+    uploads_before = len(smb_client.uploads)
+    messages_before = len(broker.messages)
+
+    failures = []
+    if not run():
+        failures.append('step failed')
+
+    files = synced_files(processor)
+    expected_uploads = sorted(n for n, data in files.items() if state['files'].get(n) != data)
+    etags = {}
+    for suffix, resource_name in topics.items():
+        resource = processor.frame_store.get(resource_name)
+        if resource is not None:
+            etags[f"{MQTT_TOPIC_PREFIX}/{suffix}"] = resource[1]
+    expected_topics = sorted(t for t, etag in etags.items() if state['etags'].get(t) != etag)
+
+    uploads = [path.rsplit('/', 1)[1] for path in smb_client.uploads[uploads_before:]]
+    messages = [topic for topic in wait_for_messages(broker, messages_before + len(expected_topics))
+                [messages_before:] if topic in etags]
+
+    if sorted(uploads) != expected_uploads:
+        failures.append(f"SMB uploaded {sorted(uploads)}, expected the changed files {expected_uploads}")
+    if timestamp_name in uploads and uploads[-1] != timestamp_name:
+        failures.append(f"SMB uploaded {timestamp_name} before {uploads[-1]}")
+    share = Path(smb_client.root, SMB_SHARE, SMB_REMOTE_PATH.strip('/'))
+    for file_name, data in files.items():
+        remote = share / file_name
+        if not remote.exists() or remote.read_bytes() != data:
+            failures.append(f"share copy of {file_name} does not match the output")
+    if sorted(messages) != expected_topics:
+        failures.append(f"MQTT published {sorted(messages)}, expected the changed topics {expected_topics}")
+    if timestamp_topic in messages and messages[-1] != timestamp_topic:
+        failures.append(f"MQTT published {timestamp_topic} before {messages[-1]}")
+
+    state['files'] = files
+    state['etags'] = etags
+    return {
+        'name': name,
+        'uploads': uploads,
+        'expected_uploads': expected_uploads,
+        'messages': messages,
+        'expected_topics': expected_topics,
+        'failures': failures,
+    }
+
+
+def run_checks(background, product, fixture_dir):
+    """Run the steps for one background and return their results"""
+    from bom_radar_downloader import RadarProcessor
+    from mqtt_sink import MQTTSink
+    from smb_sync import SMBSync
+
+    tree = fixtures.load_ftp_tree(fixture_dir)
+    radar_files = tree['/anon/gen/radar']
+    scans = sorted(n for n in radar_files if n.startswith(f"{product}."))
+    # Hold the newest scan back so it can appear between cycles
+    held_back = scans[-1]
+    held_back_data = radar_files.pop(held_back)
+
+    ftp_server = LocalFTPServer(tree).start()
+    tile_server = LocalTileServer(fixture_dir / 'tiles', tile_factory=fixtures.synthetic_tile).start()
+    broker = LocalMQTTBroker().start()
+    sink = None
+    processor = None
+    try:
+        with tempfile.TemporaryDirectory(prefix='bom-sinks-') as work_dir:
+            output_dir = Path(work_dir, 'output')
+            output_dir.mkdir()
+            config = build_config(background, [product], str(output_dir), ftp_server.port,
+                                  tile_source=tile_server.url_template, tile_rate_limit=0,
+                                  addon_mode=False, smb_server=SMB_SERVER, smb_share=SMB_SHARE,
+                                  smb_remote_path=SMB_REMOTE_PATH, smb_username='bench', smb_password='bench')
+            processor = RadarProcessor(config)
+            smb_client = LocalSMBClient(Path(work_dir, 'share'))
+            processor.smb_sync = SMBSync(SMB_SERVER, SMB_SHARE, SMB_REMOTE_PATH, 'bench', 'bench', client=smb_client)
+
+            sink = MQTTSink('127.0.0.1', broker.port, topic_prefix=MQTT_TOPIC_PREFIX, topics=mqtt_topics(config))
+            sink.start(processor.frame_store)
+            deadline = time.monotonic() + MQTT_TIMEOUT_SECONDS
+            while not sink.client.is_connected() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            if not sink.client.is_connected():
+                raise RuntimeError(f"could not connect to the local MQTT broker on port {broker.port}")
+
+            def reencode():
+                processor.config['gif_duration'] += 250
+                return processor.reencode_loop()
+
+            def new_scan():
+                ftp_server.directories['/anon/gen/radar'][held_back] = held_back_data
+                return processor.process_images()
+
+            state = {'files': {}, 'etags': {}}
+            steps = [
+                ('cold cycle', processor.process_images),
+                ('repeat cycle', processor.process_images),
+                ('loop re-encode', reencode),
+                ('new scan', new_scan),
+            ]
+            return [check_step(name, run, processor, smb_client, broker, state) for name, run in steps]
+    finally:
+        if sink is not None:
+            sink.stop()
+        if processor is not None:
+            processor.shutdown_render_pool()
+        broker.stop()
+        tile_server.stop()
+        ftp_server.stop()
+
+
+def print_report(background, results):
+    print(f"{background}:")
+    for result in results:
+        status = 'OK' if not result['failures'] else f"FAILED ({len(result['failures'])})"
+        print(f"  {result['name']:<16} {status:<12} SMB {len(result['uploads']):>2} uploaded "
+              f"({len(result['expected_uploads'])} changed)  MQTT {len(result['messages'])} published "
+              f"({len(result['expected_topics'])} changed)")
+        for failure in result['failures']:
+            print(f"    {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that SMB upload and MQTT publishing send only changed outputs')
+    parser.add_argument('--backgrounds', default=','.join(BACKGROUNDS),
+                        help='Comma-separated background types (bom,openstreetmap)')
+    parser.add_argument('--product', default=fixtures.DEFAULT_PRODUCTS[0],
+                        help='Radar product ID to run')
+    parser.add_argument('--fixtures', help='Fixture set directory (default: recorded, else synthetic)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    fixture_dir = Path(args.fixtures) if args.fixtures else fixtures.default_fixture_dir()
+
+    failed = 0
+    for background in args.backgrounds.split(','):
+        print(f"Running {background}...", file=sys.stderr)
+        results = run_checks(background, args.product, fixture_dir)
+        print_report(background, results)
+        failed += sum(1 for result in results if result['failures'])
+
+    if failed:
+        print(f"\n{failed} step(s) sent unchanged outputs, missed changed ones or wrote the timestamp early")
+        return 1
+    print("\nOnly changed outputs were uploaded and published, timestamp last")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Benchmark fixtures: recorded or synthetic BOM radar data and OSM tiles
+
+A fixture set is a directory laid out as:
+
+    radar/IDRxxx.T.YYYYMMDDHHmm.png          radar frames (/anon/gen/radar/)
+    radar_transparencies/IDRxxx.<layer>.png  background layers
+    tiles/{z}/{x}/{y}.png                    OSM tiles
+
+`record` captures a real set from the BOM FTP server and OpenStreetMap so
+results reflect genuine image content. Without a recorded set the suite
+falls back to a deterministic synthetic set that is generated on first use,
+so it runs fully offline and produces identical inputs on every machine.
+"""
+import argparse
+import ftplib
+import hashlib
+import io
+import random
+import sys
+import urllib.request
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+RECORDED_DIR = FIXTURES_DIR / 'recorded'
+SYNTHETIC_DIR = FIXTURES_DIR / 'synthetic'
+
+# Melbourne, Yarrawonga and Bairnsdale at 256km: three overlapping stations
+DEFAULT_PRODUCTS = ['IDR022', 'IDR492', 'IDR682']
+LAYERS = ['background', 'catchments', 'topography', 'locations', 'range']
+SAMPLE_TILE = (8, 231, 158)   # Synthesised tile folded into fixture checksums
+SYNTHETIC_TIMESTAMPS = [f"20260115{hour:02d}{minute:02d}"
+                        for hour in (3, 4) for minute in range(0, 60, 6)][:8]
+
+# A representative subset of the BOM rain-rate palette
+RAIN_COLOURS = [
+    (245, 245, 255), (180, 180, 255), (120, 120, 255), (20, 20, 255),
+    (0, 216, 195), (0, 150, 144), (0, 102, 102), (255, 255, 0),
+    (255, 200, 0), (255, 150, 0), (255, 100, 0), (255, 0, 0),
+    (200, 0, 0), (120, 0, 0),
+]
+
+
+def _png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def synthetic_radar_frame(product_id, frame_index):
+    """Draw a radar frame with drifting storm cells, copyright and timestamp text"""
+    rng = random.Random(product_id)
+    image = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+
+    # Storm cells drift east-north-east between frames
+    for _ in range(12):
+        cx = rng.randrange(40, 472) + frame_index * 6
+        cy = rng.randrange(40, 472) - frame_index * 3
+        radius = rng.randrange(15, 70)
+        for band, colour in enumerate(RAIN_COLOURS[:rng.randrange(4, len(RAIN_COLOURS))]):
+            r = radius * (1 - band / len(RAIN_COLOURS))
+            draw.ellipse([cx - r, cy - r * 0.7, cx + r, cy + r * 0.7], fill=colour + (255,))
+
+    draw.rectangle([0, 0, 511, 15], fill=(255, 255, 255, 255))
+    draw.text((4, 2), "(c) Commonwealth of Australia, Bureau of Meteorology", fill=(0, 0, 0, 255))
+    draw.text((4, 498), f"{product_id} frame {frame_index} UTC", fill=(0, 0, 0, 255))
+    return _png(image)
+
+
+def synthetic_layer(product_id, layer):
+    """Draw a transparency layer resembling the BOM equivalent"""
+    rng = random.Random(f"{product_id}.{layer}")
+    if layer == 'background':
+        image = Image.new('RGBA', (512, 512), (223, 214, 191, 255))
+        draw = ImageDraw.Draw(image)
+        draw.polygon([(0, 380), (200, 330), (512, 400), (512, 512), (0, 512)], fill=(181, 208, 208, 255))
+        return _png(image)
+
+    image = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    if layer == 'range':
+        for radius in (64, 128, 192, 256):
+            draw.ellipse([256 - radius, 256 - radius, 256 + radius, 256 + radius], outline=(90, 90, 90, 255))
+    elif layer == 'locations':
+        for _ in range(25):
+            x, y = rng.randrange(512), rng.randrange(512)
+            draw.rectangle([x, y, x + 2, y + 2], fill=(0, 0, 0, 255))
+            draw.text((x + 4, y - 4), f"Town{rng.randrange(100)}", fill=(40, 40, 40, 255))
+    else:
+        colour = (100, 140, 200, 255) if layer == 'catchments' else (150, 120, 90, 255)
+        for _ in range(15):
+            points = [(rng.randrange(512), rng.randrange(512)) for _ in range(6)]
+            draw.line(points, fill=colour, width=1)
+    return _png(image)
+
+
+def synthetic_tile(z, x, y):
+    """Draw a deterministic 256x256 map tile with a street grid"""
+    rng = random.Random(f"{z}/{x}/{y}")
+    image = Image.new('RGB', (256, 256), (242, 239, 233))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x0, y0 = rng.randrange(256), rng.randrange(256)
+        draw.rectangle([x0, y0, x0 + rng.randrange(20, 80), y0 + rng.randrange(20, 80)], fill=(200, 230, 190))
+    for offset in range(0, 256, rng.choice((32, 48, 64))):
+        draw.line([(offset, 0), (offset, 255)], fill=(255, 255, 255), width=3)
+        draw.line([(0, offset), (255, offset)], fill=(255, 255, 255), width=3)
+    draw.text((8, 8), f"{z}/{x}/{y}", fill=(120, 120, 120))
+    return _png(image)
+
+
+def generate_synthetic(target=SYNTHETIC_DIR, products=DEFAULT_PRODUCTS):
+    """Write the synthetic fixture set (tiles are produced on demand)"""
+    radar_dir = target / 'radar'
+    layer_dir = target / 'radar_transparencies'
+    radar_dir.mkdir(parents=True, exist_ok=True)
+    layer_dir.mkdir(parents=True, exist_ok=True)
+    (target / 'tiles').mkdir(exist_ok=True)
+
+    for product_id in products:
+        # Stations publish at slightly different minute offsets, as on the real server
+        offset = int(product_id[3:-1]) % 3
+        for frame_index, timestamp in enumerate(SYNTHETIC_TIMESTAMPS):
+            stamped = timestamp[:-2] + f"{int(timestamp[-2:]) + offset:02d}"
+            path = radar_dir / f"{product_id}.T.{stamped}.png"
+            if not path.exists():
+                path.write_bytes(synthetic_radar_frame(product_id, frame_index))
+        for layer in LAYERS:
+            path = layer_dir / f"{product_id}.{layer}.png"
+            if not path.exists():
+                path.write_bytes(synthetic_layer(product_id, layer))
+    return target
+
+
+def default_fixture_dir():
+    """Prefer a recorded fixture set, generating the synthetic one if needed"""
+    if (RECORDED_DIR / 'radar').is_dir():
+        return RECORDED_DIR
+    return generate_synthetic()
+
+
+def fixture_checksum(fixture_dir):
+    """SHA-256 over every file in a fixture set, for results to be compared only on the same inputs
+
+    Tiles missing from the set are synthesised by the local tile server, so
+    a sample synthetic tile is included too: changes to the synthesiser, or
+    to how Pillow draws and encodes it, change the checksum.
+    """
+    fixture_dir = Path(fixture_dir)
+    digest = hashlib.sha256()
+    for path in sorted(p for p in fixture_dir.rglob('*') if p.is_file()):
+        digest.update(path.relative_to(fixture_dir).as_posix().encode() + b'\0')
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    digest.update(hashlib.sha256(synthetic_tile(*SAMPLE_TILE)).digest())
+    return digest.hexdigest()
+
+
+def load_ftp_tree(fixture_dir):
+    """Map a fixture set onto the remote FTP directory layout"""
+    fixture_dir = Path(fixture_dir)
+    return {
+        '/anon/gen/radar': {p.name: p.read_bytes() for p in (fixture_dir / 'radar').glob('*.png')},
+        '/anon/gen/radar_transparencies': {
+            p.name: p.read_bytes() for p in (fixture_dir / 'radar_transparencies').glob('*.png')
+        },
+    }
+
+
+def record(products, target=RECORDED_DIR, frames=8, tile_zooms=(7, 8, 9, 10)):
+    """Capture a real fixture set from BOM FTP and OpenStreetMap"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'bom-radar-loop'))
+    from bom_radar_downloader import MapTileProvider, VERSION
+    from radar_metadata import RADAR_METADATA
+
+    radar_dir = target / 'radar'
+    layer_dir = target / 'radar_transparencies'
+    radar_dir.mkdir(parents=True, exist_ok=True)
+    layer_dir.mkdir(parents=True, exist_ok=True)
+
+    ftp = ftplib.FTP('ftp.bom.gov.au', timeout=30)
+    ftp.login()
+    ftp.cwd('/anon/gen/radar/')
+    listing = ftp.nlst()
+    for product_id in products:
+        files = sorted(f for f in listing if f.startswith(f"{product_id}.T.") and f.endswith('.png'))
+        for name in files[-frames:]:
+            with open(radar_dir / name, 'wb') as f:
+                ftp.retrbinary('RETR ' + name, f.write)
+            print(f"recorded {name}")
+    ftp.cwd('/anon/gen/radar_transparencies/')
+    for product_id in products:
+        for layer in LAYERS:
+            name = f"{product_id}.{layer}.png"
+            try:
+                with open(layer_dir / name, 'wb') as f:
+                    ftp.retrbinary('RETR ' + name, f.write)
+                print(f"recorded {name}")
+            except ftplib.error_perm:
+                (layer_dir / name).unlink(missing_ok=True)
+    ftp.quit()
+
+    user_agent = f"HomeAssistant-BoM-Radar-Addon/{VERSION} benchmark fixture recorder"
+    for product_id in products:
+        lat, lon, _ = RADAR_METADATA[product_id]
+        for zoom in tile_zooms:
+            cx, cy = MapTileProvider.latlon_to_tile(lat, lon, zoom)
+            for x in range(cx - 3, cx + 4):
+                for y in range(cy - 3, cy + 4):
+                    path = target / 'tiles' / str(zoom) / str(x) / f"{y}.png"
+                    if path.exists():
+                        continue
+                    url = MapTileProvider.OSM_TILE_URL.format(z=zoom, x=x, y=y)
+                    request = urllib.request.Request(url, headers={'User-Agent': user_agent})
+                    with urllib.request.urlopen(request, timeout=10) as response:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        path.write_bytes(response.read())
+            print(f"recorded tiles for {product_id} at zoom {zoom}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='Record real BOM frames, layers and OSM tiles')
+    rec.add_argument('--products', default=','.join(DEFAULT_PRODUCTS))
+    rec.add_argument('--frames', type=int, default=8)
+    sub.add_parser('synthetic', help='(Re)generate the synthetic fixture set')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.products.split(','), frames=args.frames)
+    else:
+        print(f"Synthetic fixtures in {generate_synthetic()}")
+
+
+if __name__ == '__main__':
+    main()
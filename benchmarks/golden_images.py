@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Golden-image regression check for the radar render pipeline
+
+Runs full `process_images()` cycles against the local FTP and tile server
+stand-ins for a matrix of scenarios (background type x radar count x
+region of interest x house marker) and compares every image output - the frame PNGs and each frame of
+the animated GIF - pixel by pixel against golden copies recorded earlier.
+
+Golden images are not committed (they depend on the fixture set and the
+Pillow version). They must be recorded on the base commit of the branch
+under test, with no uncommitted changes to the add-on, and checked from the
+branch, so optimisations of the copyright and timestamp clean-up,
+compositing or encoders can be verified to render the same pictures:
+
+    git checkout main
+    python benchmarks/golden_images.py --update
+    git checkout my-branch
+    python benchmarks/golden_images.py --diff-dir /tmp/golden-diff
+
+The check refuses golden images recorded from a commit that is not in the
+history of HEAD.
+
+A pixel differs when any channel (RGBA) is off by more than the format's
+channel tolerance; an image fails when more than the format's fraction of
+its pixels differ. Cycle timings are reported alongside those recorded with
+the golden images.
+"""
+import argparse
+import io
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageSequence
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+from local_servers import LocalFTPServer, LocalTileServer  # noqa: E402
+from run_benchmarks import (  # noqa: E402
+    ADDON_DIR, BACKGROUNDS, ROI_MODES, build_config, git_revision, parse_roi_modes, roi_overrides, scenario_name,
+)
+
+GOLDEN_DIR = BENCH_DIR / 'golden'
+GOLDEN_MANIFEST = 'golden.json'
+IMAGE_SUFFIXES = ('.png', '.gif', '.webp')
+
+# Per-format (channel tolerance, fraction of pixels allowed beyond it).
+# PNG and lossless WebP must match exactly; GIF frames go through palette
+# quantization, where an equivalent encoder may pick slightly different colours.
+DEFAULT_TOLERANCES = {
+    'png': (0, 0.0),
+    'webp': (0, 0.0),
+    'gif': (12, 0.005),
+}
+
+
+def scenario_id(background, radars, house, roi='off'):
+    return f"{scenario_name(background, radars, roi)}-{'house' if house else 'nohouse'}"
+
+
+def addon_has_changes():
+    """Return True if the add-on sources differ from HEAD, None if git is unavailable"""
+    try:
+        return bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--', str(ADDON_DIR)], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def in_history(commit):
+    """Return True if `commit` is HEAD or one of its ancestors"""
+    try:
+        return subprocess.run(
+            ['git', 'merge-base', '--is-ancestor', commit, 'HEAD'], cwd=BENCH_DIR, capture_output=True
+        ).returncode == 0
+    except OSError:
+        return False
+
+
+def parse_tolerance(value):
+    """Parse FORMAT=DELTA[:FRACTION], e.g. gif=16:0.01"""
+    try:
+        format, _, limits = value.partition('=')
+        delta, _, fraction = limits.partition(':')
+        return format.lower().lstrip('.'), (int(delta), float(fraction or 0.0))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FORMAT=DELTA[:FRACTION], got '{value}'")
+
+
+def decode_frames(data):
+    """Decode an image file's bytes into a list of RGBA frames"""
+    image = Image.open(io.BytesIO(data))
+    return [frame.convert('RGBA') for frame in ImageSequence.Iterator(image)]
+
+
+def compare_frame(expected, actual, delta):
+    """Compare two RGBA frames
+
+    Returns:
+        (differing pixel count, largest channel difference, mask of differing pixels)
+    """
+    difference = ImageChops.difference(expected, actual)
+    bands = difference.split()
+    largest = bands[0]
+    for band in bands[1:]:
+        largest = ImageChops.lighter(largest, band)
+    mask = largest.point(lambda value: 255 if value > delta else 0)
+    return mask.histogram()[255], largest.getextrema()[1], mask
+
+
+def diff_image(expected, mask):
+    """Greyed-out golden frame with differing pixels in red"""
+    base = expected.convert('L').convert('RGB').point(lambda value: 64 + value // 2)
+    return Image.composite(Image.new('RGB', base.size, (255, 0, 0)), base, mask)
+
+
+def compare_outputs(golden_dir, outputs, tolerances, diff_dir=None):
+    """Compare a cycle's image outputs with the golden copies
+
+    Returns:
+        (list of failure messages, number of frames compared)
+    """
+    failures = []
+    compared = 0
+    golden_names = sorted(path.name for path in golden_dir.iterdir() if path.suffix in IMAGE_SUFFIXES)
+    for name in sorted(set(golden_names) | set(outputs)):
+        if name not in outputs:
+            failures.append(f"{name}: missing from the outputs")
+            continue
+        if name not in golden_names:
+            failures.append(f"{name}: not in the golden set")
+            continue
+        expected_frames = decode_frames((golden_dir / name).read_bytes())
+        actual_frames = decode_frames(outputs[name])
+        if len(expected_frames) != len(actual_frames):
+            failures.append(f"{name}: {len(actual_frames)} frame(s), expected {len(expected_frames)}")
+            continue
+
+        format = Path(name).suffix.lstrip('.')
+        delta, fraction = tolerances.get(format, (0, 0.0))
+        for index, (expected, actual) in enumerate(zip(expected_frames, actual_frames)):
+            compared += 1
+            label = name if len(expected_frames) == 1 else f"{name}[{index}]"
+            if expected.size != actual.size:
+                failures.append(f"{label}: size {actual.size}, expected {expected.size}")
+                continue
+            differing, largest, mask = compare_frame(expected, actual, delta)
+            share = differing / (expected.width * expected.height)
+            if share > fraction:
+                failures.append(f"{label}: {differing} pixel(s) ({share:.3%}) differ by more than {delta}, "
+                                f"largest channel difference {largest}")
+                if diff_dir is not None:
+                    diff_dir.mkdir(parents=True, exist_ok=True)
+                    stem = Path(name).stem if len(expected_frames) == 1 else f"{Path(name).stem}.{index}"
+                    diff_image(expected, mask).save(diff_dir / f"{stem}.diff.png")
+    return failures, compared
+
+
+def image_outputs(processor):
+    return {name: data for name, data in processor.encoded_outputs.items()
+            if Path(name).suffix in IMAGE_SUFFIXES}
+
+
+def run_scenario(spec, fixture_dir, golden_root, cycles, update, tolerances, diff_root=None):
+    """Render a scenario, then record or check its golden images
+
+    Returns:
+        dict with cycle timings, frames compared and failure messages
+    """
+    from bom_radar_downloader import RadarProcessor
+
+    ftp_server = LocalFTPServer(fixtures.load_ftp_tree(fixture_dir)).start()
+    tile_server = LocalTileServer(fixture_dir / 'tiles', tile_factory=fixtures.synthetic_tile).start()
+    golden_dir = golden_root / spec['name']
+    diff_dir = diff_root / spec['name'] if diff_root else None
+
+    result = {'cycles_s': [], 'stages_s': {}, 'frames_compared': 0, 'failures': []}
+    try:
+        with tempfile.TemporaryDirectory(prefix='bom-golden-') as output_dir:
+            config = build_config(spec['background'], spec['products'], output_dir, ftp_server.port,
+                                  residential_enabled=spec['house'],
+                                  tile_source=tile_server.url_template, tile_rate_limit=0,
+                                  **roi_overrides(spec.get('roi', 'off')))
+            processor = RadarProcessor(config)
+
+            for cycle in range(cycles):
+                start = time.perf_counter()
+                ok = processor.process_images()
+                result['cycles_s'].append(time.perf_counter() - start)
+                if not ok:
+                    raise RuntimeError(f"process_images() failed on cycle {cycle + 1}")
+                if cycle == 0:
+                    result['stages_s'] = dict(processor.stage_timings)
+
+                outputs = image_outputs(processor)
+                if update and cycle == 0:
+                    golden_dir.mkdir(parents=True, exist_ok=True)
+                    for path in golden_dir.iterdir():
+                        if path.suffix in IMAGE_SUFFIXES:
+                            path.unlink()
+                    for name, data in outputs.items():
+                        (golden_dir / name).write_bytes(data)
+                # Warm cycles reuse cached frames and must still render the same images
+                failures, compared = compare_outputs(golden_dir, outputs, tolerances, diff_dir)
+                result['frames_compared'] += compared
+                result['failures'] += [f"cycle {cycle + 1}: {failure}" for failure in failures]
+    finally:
+        ftp_server.stop()
+        tile_server.stop()
+    return result
+
+
+def print_report(results, recorded):
+    for name, data in results.items():
+        status = 'OK' if not data['failures'] else f"FAILED ({len(data['failures'])})"
+        cold = data['cycles_s'][0]
+        warm = data['cycles_s'][1:]
+        line = f"{name:<24} {status:<12} {data['frames_compared']:>4} frames  cold {cold:.3f}s"
+        if warm:
+            line += f"  warm {sum(warm) / len(warm):.3f}s"
+        previous = recorded.get(name)
+        if previous and previous.get('cycles_s'):
+            line += f"  (golden cold {previous['cycles_s'][0]:.3f}s, {cold / previous['cycles_s'][0] - 1:+.1%})"
+        print(line)
+        print("  " + ", ".join(f"{stage}={seconds:.3f}" for stage, seconds in data['stages_s'].items()))
+        for failure in data['failures']:
+            print(f"  {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Golden-image regression check for the BoM radar pipeline')
+    parser.add_argument('--update', action='store_true',
+                        help='Record the current outputs as the golden images')
+    parser.add_argument('--golden', default=str(GOLDEN_DIR),
+                        help='Golden image directory (default: benchmarks/golden)')
+    parser.add_argument('--backgrounds', default=','.join(BACKGROUNDS),
+                        help='Comma-separated background types (bom,openstreetmap)')
+    parser.add_argument('--radars', default='1,3',
+                        help='Comma-separated radar counts to run (1-3)')
+    parser.add_argument('--house', default='on,off',
+                        help='House marker settings to run (on,off)')
+    parser.add_argument('--roi', default=','.join(ROI_MODES),
+                        help='Region-of-interest settings to run (off,on,edge)')
+    parser.add_argument('--products', default=','.join(fixtures.DEFAULT_PRODUCTS),
+                        help='Product IDs used as primary, second and third radar')
+    parser.add_argument('--cycles', type=int, default=2,
+                        help='Cycles per scenario; every cycle is checked (default 2)')
+    parser.add_argument('--fixtures', help='Fixture set directory (default: recorded, else synthetic)')
+    parser.add_argument('--tolerance', action='append', type=parse_tolerance, default=[],
+                        metavar='FORMAT=DELTA[:FRACTION]',
+                        help='Override a format tolerance, e.g. gif=16:0.01 (repeatable)')
+    parser.add_argument('--diff-dir', help='Write a diff image for every failing frame here')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    fixture_dir = Path(args.fixtures) if args.fixtures else fixtures.default_fixture_dir()
+    golden_root = Path(args.golden)
+    manifest_path = golden_root / GOLDEN_MANIFEST
+    products = args.products.split(',')
+    radar_counts = [int(n) for n in args.radars.split(',')]
+    if any(n < 1 or n > min(3, len(products)) for n in radar_counts):
+        parser.error('radar counts must be between 1 and the number of products (max 3)')
+    houses = [setting.strip() == 'on' for setting in args.house.split(',')]
+    rois = parse_roi_modes(parser, args.roi)
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances.update(args.tolerance)
+
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+    elif not args.update:
+        parser.error(f"no golden images in {golden_root}; record them first with --update")
+
+    from bom_radar_downloader import VERSION
+    from PIL import __version__ as pillow_version
+    meta = {
+        'commit': git_revision(),
+        'version': VERSION,
+        'python': platform.python_version(),
+        'pillow': pillow_version,
+        'fixtures': str(fixture_dir),
+        'fixtures_sha256': fixtures.fixture_checksum(fixture_dir),
+    }
+    if args.update:
+        changes = addon_has_changes()
+        if meta['commit'] is None or changes is None:
+            parser.error('golden images must be recorded from a git checkout')
+        if changes:
+            parser.error(f"{ADDON_DIR.name} has uncommitted changes; golden images must be recorded "
+                         f"from a commit (commit or stash them first)")
+        if manifest.get('meta', {}).get('commit') != meta['commit']:
+            # Never mix scenarios recorded from different commits in one golden set
+            manifest = {}
+    else:
+        recorded_meta = manifest.get('meta', {})
+        if not recorded_meta.get('commit'):
+            parser.error(f"golden images in {golden_root} do not record their commit; record them again with --update")
+        if not in_history(recorded_meta['commit']):
+            parser.error(f"golden images in {golden_root} were recorded from {recorded_meta['commit']}, which is "
+                         f"not in the history of HEAD; record them on the base commit of this branch first")
+        if recorded_meta.get('fixtures_sha256') != meta['fixtures_sha256']:
+            parser.error(f"golden images in {golden_root} were recorded against different fixtures "
+                         f"({recorded_meta.get('fixtures_sha256') or 'checksum not recorded'}, "
+                         f"now {meta['fixtures_sha256']}); record them again with the same fixture set")
+        print(f"Checking against golden images from {recorded_meta.get('commit') or 'unknown commit'} "
+              f"(Pillow {recorded_meta.get('pillow')})")
+        if recorded_meta.get('pillow') != meta['pillow']:
+            print(f"Warning: golden images were recorded with pillow {recorded_meta.get('pillow')}, "
+                  f"now {meta['pillow']}", file=sys.stderr)
+
+    results = {}
+    for background in args.backgrounds.split(','):
+        for count in radar_counts:
+            for roi in rois:
+                for house in houses:
+                    name = scenario_id(background, count, house, roi)
+                    spec = {'name': name, 'background': background, 'products': products[:count],
+                            'house': house, 'roi': roi}
+                    if not args.update and name not in manifest.get('scenarios', {}):
+                        print(f"Skipping {name}: not in the golden set", file=sys.stderr)
+                        continue
+                    print(f"Running {name}...", file=sys.stderr)
+                    results[name] = run_scenario(
+                        spec, fixture_dir, golden_root, args.cycles, args.update, tolerances,
+                        Path(args.diff_dir) if args.diff_dir else None
+                    )
+
+    print_report(results, manifest.get('scenarios', {}))
+
+    if args.update:
+        manifest = {
+            'meta': meta,
+            'scenarios': {**manifest.get('scenarios', {}), **{
+                name: {'cycles_s': data['cycles_s'], 'stages_s': data['stages_s']}
+                for name, data in results.items()
+            }},
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+        print(f"\nRecorded golden images for {len(results)} scenario(s) in {golden_root}")
+
+    failed = [name for name, data in results.items() if data['failures']]
+    if failed:
+        print(f"\n{len(failed)} scenario(s) differ from the golden images: " + ", ".join(failed))
+        return 1
+    if not args.update:
+        print(f"\nAll {sum(data['frames_compared'] for data in results.values())} frames match the golden images")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,417 @@
+"""
+In-process stand-ins for the BOM FTP server, the OSM tile server, an SMB
+share and an MQTT broker
+
+The servers run on 127.0.0.1 in daemon threads and serve files from a
+fixture directory, counting requests and bytes so benchmarks can report
+upstream traffic alongside timings. LocalSMBClient replaces the
+`smbclient` module for the standalone-mode SMB upload, and LocalMQTTBroker
+speaks enough MQTT 3.1.1 for the MQTT publisher.
+"""
+import posixpath
+import socket
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class TrafficCounter:
+    """Thread-safe request/byte counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes = 0
+
+    def add(self, nbytes):
+        with self._lock:
+            self.requests += 1
+            self.bytes += nbytes
+
+    def snapshot(self):
+        with self._lock:
+            return {'requests': self.requests, 'bytes': self.bytes}
+
+
+class _FTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of RFC 959 for ftplib: login, CWD, PASV, NLST and RETR"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('latin-1'))
+
+    def handle(self):
+        self.cwd = '/'
+        self.pasv_socket = None
+        self.reply('220 Local BOM FTP stand-in ready')
+        for raw in self.rfile:
+            line = raw.decode('latin-1').rstrip('\r\n')
+            command, _, argument = line.partition(' ')
+            command = command.upper()
+            handler = getattr(self, f"ftp_{command.lower()}", None)
+            if handler is None:
+                self.reply(f'502 {command} not implemented')
+                continue
+            if handler(argument) is False:
+                break
+        if self.pasv_socket is not None:
+            self.pasv_socket.close()
+
+    def ftp_user(self, argument):
+        self.reply('331 Anonymous login ok, send password')
+
+    def ftp_pass(self, argument):
+        self.reply('230 Login successful')
+
+    def ftp_syst(self, argument):
+        self.reply('215 UNIX Type: L8')
+
+    def ftp_type(self, argument):
+        self.reply('200 Type set')
+
+    def ftp_noop(self, argument):
+        self.reply('200 OK')
+
+    def ftp_pwd(self, argument):
+        self.reply(f'257 "{self.cwd}"')
+
+    def ftp_cwd(self, argument):
+        path = posixpath.normpath(posixpath.join(self.cwd, argument))
+        if path in self.server.directories or path == '/':
+            self.cwd = path
+            self.reply('250 Directory changed')
+        else:
+            self.reply('550 No such directory')
+
+    def ftp_pasv(self, argument):
+        if self.pasv_socket is not None:
+            self.pasv_socket.close()
+        self.pasv_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.pasv_socket.bind(('127.0.0.1', 0))
+        self.pasv_socket.listen(1)
+        port = self.pasv_socket.getsockname()[1]
+        self.reply(f'227 Entering Passive Mode (127,0,0,1,{port >> 8},{port & 0xFF})')
+
+    def _send_data(self, data):
+        if self.pasv_socket is None:
+            self.reply('425 Use PASV first')
+            return
+        self.reply('150 Opening data connection')
+        conn, _ = self.pasv_socket.accept()
+        with conn:
+            conn.sendall(data)
+        self.pasv_socket.close()
+        self.pasv_socket = None
+        self.reply('226 Transfer complete')
+
+    def ftp_nlst(self, argument):
+        files = self.server.directories.get(self.cwd, {})
+        listing = ''.join(f"{name}\r\n" for name in sorted(files))
+        self.server.listings.add(len(listing))
+        self._send_data(listing.encode('latin-1'))
+
+    def ftp_retr(self, argument):
+        data = self.server.directories.get(self.cwd, {}).get(argument)
+        if data is None:
+            self.reply(f'550 {argument}: No such file')
+            return
+        self.server.retrievals.add(len(data))
+        self._send_data(data)
+
+    def ftp_quit(self, argument):
+        self.reply('221 Goodbye')
+        return False
+
+
+class LocalFTPServer(socketserver.ThreadingTCPServer):
+    """Serves fixture directories as if they were /anon/gen/... on BOM FTP
+
+    Args:
+        directories: Dict of {remote_path: {filename: bytes}}
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, directories):
+        super().__init__(('127.0.0.1', 0), _FTPHandler)
+        self.directories = {posixpath.normpath(path): files for path, files in directories.items()}
+        self.listings = TrafficCounter()
+        self.retrievals = TrafficCounter()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class LocalTileServer(ThreadingHTTPServer):
+    """Serves XYZ tiles from `tiles_dir/{z}/{x}/{y}.png`
+
+    Tiles missing from the fixture directory are produced by `tile_factory`
+    (if given) so that any zoom level or radar location can be benchmarked.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, tiles_dir, tile_factory=None):
+        super().__init__(('127.0.0.1', 0), _TileHandler)
+        self.tiles_dir = Path(tiles_dir)
+        self.tile_factory = tile_factory
+        self.tiles = TrafficCounter()
+        self._thread = None
+
+    @property
+    def url_template(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/{{z}}/{{x}}/{{y}}.png"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        try:
+            z, x, y = int(parts[0]), int(parts[1]), int(parts[2].split('.')[0])
+        except (IndexError, ValueError):
+            self.send_error(404)
+            return
+
+        tile_path = self.server.tiles_dir / str(z) / str(x) / f"{y}.png"
+        if tile_path.exists():
+            data = tile_path.read_bytes()
+        elif self.server.tile_factory is not None:
+            data = self.server.tile_factory(z, x, y)
+        else:
+            self.send_error(404)
+            return
+
+        self.server.tiles.add(len(data))
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalSMBClient:
+    """Drop-in for the `smbclient` functions used by SMBSync, backed by a local directory
+
+    `//server/share/path/name` maps to `root/share/path/name`. Each write
+    can be delayed by `write_latency` seconds to simulate a slow link.
+    Completed uploads are recorded in `uploads` in the order they finished.
+    """
+
+    def __init__(self, root, write_latency=0.0):
+        self.root = Path(root)
+        self.write_latency = write_latency
+        self.writes = TrafficCounter()   # Write requests and bytes
+        self.files = TrafficCounter()    # Files opened for writing
+        self.uploads = []                # Remote paths, in completion order
+        self.resets = 0
+        self._lock = threading.Lock()
+
+    def _local(self, path):
+        parts = path.lstrip('/').split('/')[1:]  # drop the server name
+        return self.root.joinpath(*parts)
+
+    def ClientConfig(self, username=None, password=None, **kwargs):
+        pass
+
+    def makedirs(self, path, exist_ok=False):
+        self._local(path).mkdir(parents=True, exist_ok=exist_ok)
+
+    def open_file(self, path, mode='r'):
+        if 'w' in mode:
+            self.files.add(0)
+            return _SlowWriter(open(self._local(path), mode), self, path)
+        return open(self._local(path), mode)
+
+    def reset_connection_cache(self):
+        self.resets += 1
+
+
+class _SlowWriter:
+
+    def __init__(self, handle, client, path):
+        self._handle = handle
+        self._client = client
+        self._path = path
+
+    def write(self, data):
+        if self._client.write_latency:
+            time.sleep(self._client.write_latency)
+        self._client.writes.add(len(data))
+        return self._handle.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._handle.close()
+        with self._client._lock:
+            self._client.uploads.append(self._path)
+
+
+class _MQTTHandler(socketserver.StreamRequestHandler):
+    """MQTT 3.1.1 subset: CONNECT, PUBLISH (QoS 0/1), SUBSCRIBE, PINGREQ, DISCONNECT"""
+
+    def read_packet(self):
+        header = self.rfile.read(1)
+        if not header:
+            return None, None
+        length, shift = 0, 0
+        while True:
+            byte = self.rfile.read(1)[0]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header[0], self.rfile.read(length)
+
+    def send_packet(self, header, body=b''):
+        length, encoded = len(body), bytearray()
+        while True:
+            byte, length = length % 128, length // 128
+            encoded.append(byte | (0x80 if length else 0))
+            if not length:
+                break
+        with self.write_lock:
+            self.wfile.write(bytes([header]) + bytes(encoded) + body)
+
+    @staticmethod
+    def read_string(body, offset):
+        (size,) = struct.unpack_from('!H', body, offset)
+        return body[offset + 2:offset + 2 + size], offset + 2 + size
+
+    def handle(self):
+        self.write_lock = threading.Lock()
+        self.subscriptions = []
+        will = None
+        try:
+            while True:
+                header, body = self.read_packet()
+                if header is None:
+                    break
+                kind = header >> 4
+                if kind == 1:  # CONNECT
+                    _, offset = self.read_string(body, 0)
+                    flags = body[offset + 1]
+                    _, offset = self.read_string(body, offset + 4)  # client id
+                    if flags & 0x04:
+                        topic, offset = self.read_string(body, offset)
+                        message, offset = self.read_string(body, offset)
+                        will = (topic.decode(), message, bool(flags & 0x20))
+                    self.send_packet(0x20, b'\x00\x00')
+                elif kind == 3:  # PUBLISH
+                    topic, offset = self.read_string(body, 0)
+                    qos = (header >> 1) & 0x03
+                    if qos:
+                        packet_id = body[offset:offset + 2]
+                        offset += 2
+                    self.server.route(topic.decode(), body[offset:], bool(header & 0x01))
+                    if qos:
+                        self.send_packet(0x40, packet_id)
+                elif kind == 8:  # SUBSCRIBE
+                    packet_id, offset, granted = body[:2], 2, b''
+                    while offset < len(body):
+                        topic_filter, offset = self.read_string(body, offset)
+                        offset += 1
+                        self.subscriptions.append(topic_filter.decode())
+                        granted += b'\x00'
+                    self.send_packet(0x90, packet_id + granted)
+                    with self.server.lock:
+                        self.server.subscribers.append(self)
+                        retained = list(self.server.retained.items())
+                    for topic, payload in retained:
+                        self.deliver(topic, payload, retain=True)
+                elif kind == 12:  # PINGREQ
+                    self.send_packet(0xD0)
+                elif kind == 14:  # DISCONNECT
+                    will = None
+                    break
+        except (ConnectionError, IndexError, struct.error):
+            pass
+        finally:
+            with self.server.lock:
+                if self in self.server.subscribers:
+                    self.server.subscribers.remove(self)
+            if will is not None:
+                self.server.route(*will)
+
+    def matches(self, topic):
+        return any(f == topic or (f.endswith('#') and topic.startswith(f[:-1])) for f in self.subscriptions)
+
+    def deliver(self, topic, payload, retain=False):
+        encoded = topic.encode()
+        try:
+            self.send_packet(0x30 | int(retain), struct.pack('!H', len(encoded)) + encoded + payload)
+        except OSError:
+            pass
+
+
+class LocalMQTTBroker(socketserver.ThreadingTCPServer):
+    """Minimal MQTT broker keeping retained messages and counting publishes
+
+    The topic of every publish received is recorded in `messages`, in order.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _MQTTHandler)
+        self.lock = threading.Lock()
+        self.retained = {}
+        self.subscribers = []
+        self.publishes = TrafficCounter()
+        self.messages = []
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def route(self, topic, payload, retain):
+        self.publishes.add(len(payload))
+        with self.lock:
+            self.messages.append(topic)
+            if retain:
+                if payload:
+                    self.retained[topic] = payload
+                else:
+                    self.retained.pop(topic, None)
+            subscribers = [handler for handler in self.subscribers if handler.matches(topic)]
+        for handler in subscribers:
+            handler.deliver(topic, payload)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
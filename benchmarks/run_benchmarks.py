@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the radar processing pipeline
+
+Runs full `process_images()` cycles against local FTP and tile server
+stand-ins for a matrix of scenarios (background type x radar count) and
+reports per-stage timings, peak memory, output sizes and upstream traffic.
+
+Each scenario runs in a fresh subprocess so that peak RSS and cold caches are
+measured in isolation. Results can be saved as JSON and compared against a
+previous run (e.g. from another commit) with configurable thresholds:
+
+    python benchmarks/run_benchmarks.py --output base.json
+    python benchmarks/run_benchmarks.py --compare base.json --time-threshold 0.15
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ADDON_DIR = BENCH_DIR.parent / 'bom-radar-loop'
+sys.path.insert(0, str(ADDON_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+from local_servers import LocalFTPServer, LocalTileServer  # noqa: E402
+
+BACKGROUNDS = ['bom', 'openstreetmap']
+ROI_RADIUS_KM = 60   # Region-of-interest scenarios show this radius around the residence
+# Config overrides per region-of-interest setting. 'edge' fixes the centre near the
+# bottom-right corner of its OpenStreetMap tile (sub-tile fraction ~0.99 at zoom 10)
+# and needs a 664 px background, which is not a multiple of the tile size
+ROI_MODES = {
+    'off': {},
+    'on': {'roi_enabled': True, 'roi_radius_km': ROI_RADIUS_KM},
+    'edge': {'roi_enabled': True, 'roi_radius_km': 40, 'roi_lat': -38.0036, 'roi_lon': 144.8431},
+}
+
+
+def scenario_name(background, radars, roi='off'):
+    name = f"{'osm' if background == 'openstreetmap' else 'bom'}-{radars}radar"
+    if roi == 'off':
+        return name
+    return f"{name}-roi" if roi == 'on' else f"{name}-roi-{roi}"
+
+
+def roi_overrides(roi):
+    """Config overrides for a region-of-interest setting (see ROI_MODES)"""
+    return dict(ROI_MODES[roi])
+
+
+def parse_roi_modes(parser, value):
+    """Parse the comma-separated --roi setting, rejecting unknown modes"""
+    modes = [setting.strip() for setting in value.split(',')]
+    unknown = [mode for mode in modes if mode not in ROI_MODES]
+    if unknown:
+        parser.error(f"unknown region-of-interest setting(s) {', '.join(unknown)}; "
+                     f"expected {','.join(ROI_MODES)}")
+    return modes
+
+
+def build_config(background, products, output_dir, ftp_port, **overrides):
+    """Build a processor config equivalent to a standalone config.yaml setup"""
+    from bom_radar_downloader import DEFAULT_FRAME_BUCKET_MINUTES
+
+    config = {
+        'product_id': products[0],
+        'timezone': 'Australia/Melbourne',
+        'background_type': background,
+        'scheduler_enabled': False,
+        'update_interval': 600,
+        'retry_on_error': False,
+        'retry_interval': 60,
+        'layers': ['background', 'locations', 'range'],
+        'output_directory': output_dir,
+        'animated_gif_filename': 'radar_animated.gif',
+        'timestamp_filename': 'radar_last_update.txt',
+        'legend_file': str(ADDON_DIR / 'radar-colour-bar.png'),
+        'gif_duration': 500,
+        'gif_last_frame_duration': 1000,
+        'gif_loop': 0,
+        'log_level': 'WARNING',
+        'residential_enabled': True,
+        'residential_lat': -37.8136,
+        'residential_lon': 144.9631,
+        'second_radar_enabled': len(products) > 1,
+        'second_radar_product_id': products[1] if len(products) > 1 else None,
+        'third_radar_enabled': len(products) > 2,
+        'third_radar_product_id': products[2] if len(products) > 2 else None,
+        'frame_bucket_minutes': DEFAULT_FRAME_BUCKET_MINUTES,
+        'addon_mode': True,
+        'ftp_host': '127.0.0.1',
+        'ftp_port': ftp_port,
+    }
+    config.update(overrides)
+    return config
+
+
+def run_worker(spec):
+    """Run one scenario in this process and return its measurements"""
+    from bom_radar_downloader import RadarProcessor
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    fixture_dir = Path(spec['fixtures'])
+    ftp_server = LocalFTPServer(fixtures.load_ftp_tree(fixture_dir)).start()
+    tile_server = LocalTileServer(fixture_dir / 'tiles', tile_factory=fixtures.synthetic_tile).start()
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='bom-bench-') as output_dir:
+            config = build_config(spec['background'], spec['products'], output_dir, ftp_server.port,
+                                  tile_source=tile_server.url_template, tile_rate_limit=0,
+                                  **roi_overrides(spec.get('roi', 'off')))
+            processor = RadarProcessor(config)
+
+            cycles = []
+            for cycle in range(spec['cycles']):
+                start = time.perf_counter()
+                ok = processor.process_images()
+                elapsed = time.perf_counter() - start
+                if not ok:
+                    raise RuntimeError(f"process_images() failed on cycle {cycle + 1}")
+                cycles.append({'total': elapsed, 'stages': dict(processor.stage_timings)})
+
+            outputs = {name: len(data) for name, data in processor.encoded_outputs.items()}
+    finally:
+        ftp_server.stop()
+        tile_server.stop()
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+    return {
+        'cold': cycles[0],
+        'warm': cycles[1:],
+        'peak_rss_mb': peak_rss_mb,
+        'output_bytes': outputs,
+        'output_bytes_total': sum(outputs.values()),
+        'ftp_retrievals': ftp_server.retrievals.snapshot(),
+        'ftp_listings': ftp_server.listings.snapshot(),
+        'tile_requests': tile_server.tiles.snapshot(),
+    }
+
+
+def run_scenario(spec, repeat):
+    """Run a scenario `repeat` times in subprocesses and summarise with medians"""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, __file__, '--worker', json.dumps(spec)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Scenario {spec['name']} failed:\n{proc.stderr}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    def median(values):
+        return statistics.median(values) if values else None
+
+    stage_names = sorted({stage for run in runs for stage in run['cold']['stages']})
+    warm_totals = [cycle['total'] for run in runs for cycle in run['warm']]
+    return {
+        'cold_total_s': median([run['cold']['total'] for run in runs]),
+        'cold_stages_s': {
+            stage: median([run['cold']['stages'].get(stage, 0.0) for run in runs]) for stage in stage_names
+        },
+        'warm_total_s': median(warm_totals),
+        'warm_stages_s': {
+            stage: median([cycle['stages'].get(stage, 0.0) for run in runs for cycle in run['warm']])
+            for stage in stage_names
+        } if warm_totals else {},
+        'peak_rss_mb': median([run['peak_rss_mb'] for run in runs]),
+        'output_bytes_total': runs[-1]['output_bytes_total'],
+        'output_bytes': runs[-1]['output_bytes'],
+        'ftp_retrievals': runs[-1]['ftp_retrievals'],
+        'ftp_listings': runs[-1]['ftp_listings'],
+        'tile_requests': runs[-1]['tile_requests'],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, thresholds):
+    """Print deltas against a baseline; return the list of regressions"""
+    metrics = [
+        ('cold_total_s', 'time'), ('warm_total_s', 'time'),
+        ('peak_rss_mb', 'memory'), ('output_bytes_total', 'size'),
+    ]
+    regressions = []
+    print(f"\nComparison against {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            print(f"  {name}: not in baseline")
+            continue
+        for metric, kind in metrics:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change > thresholds[kind]:
+                flag = '  << REGRESSION'
+                regressions.append(f"{name}.{metric} {change:+.1%}")
+            print(f"  {name:<16} {metric:<20} {old:>12.3f} -> {new:>12.3f} ({change:+.1%}){flag}")
+    return regressions
+
+
+def print_report(results):
+    for name, data in results['scenarios'].items():
+        print(f"\n{name}")
+        print(f"  cold cycle   {data['cold_total_s']:.3f}s  "
+              + ", ".join(f"{k}={v:.3f}" for k, v in data['cold_stages_s'].items()))
+        if data['warm_total_s'] is not None:
+            print(f"  warm cycle   {data['warm_total_s']:.3f}s  "
+                  + ", ".join(f"{k}={v:.3f}" for k, v in data['warm_stages_s'].items()))
+        print(f"  peak RSS     {data['peak_rss_mb']:.1f} MB")
+        print(f"  outputs      {data['output_bytes_total'] / 1024:.1f} KiB in {len(data['output_bytes'])} files")
+        print(f"  upstream     {data['ftp_retrievals']['requests']} RETR "
+              f"({data['ftp_retrievals']['bytes'] / 1024:.0f} KiB), "
+              f"{data['ftp_listings']['requests']} NLST, {data['tile_requests']['requests']} tiles")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the BoM radar pipeline')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--backgrounds', default=','.join(BACKGROUNDS),
+                        help='Comma-separated background types (bom,openstreetmap)')
+    parser.add_argument('--radars', default='1,3',
+                        help='Comma-separated radar counts to run (1-3)')
+    parser.add_argument('--roi', default=','.join(ROI_MODES),
+                        help='Region-of-interest settings to run (off,on,edge)')
+    parser.add_argument('--products', default=','.join(fixtures.DEFAULT_PRODUCTS),
+                        help='Product IDs used as primary, second and third radar')
+    parser.add_argument('--cycles', type=int, default=3, help='Cycles per run (first is cold)')
+    parser.add_argument('--repeat', type=int, default=3, help='Subprocess runs per scenario')
+    parser.add_argument('--fixtures', help='Fixture set directory (default: recorded, else synthetic)')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--time-threshold', type=float, default=0.20,
+                        help='Allowed fractional slowdown before failing (default 0.20)')
+    parser.add_argument('--memory-threshold', type=float, default=0.10,
+                        help='Allowed fractional peak RSS growth (default 0.10)')
+    parser.add_argument('--size-threshold', type=float, default=0.05,
+                        help='Allowed fractional output size growth (default 0.05)')
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return 0
+
+    fixture_dir = Path(args.fixtures) if args.fixtures else fixtures.default_fixture_dir()
+    products = args.products.split(',')
+    radar_counts = [int(n) for n in args.radars.split(',')]
+    if any(n < 1 or n > min(3, len(products)) for n in radar_counts):
+        parser.error('radar counts must be between 1 and the number of products (max 3)')
+    rois = parse_roi_modes(parser, args.roi)
+    fixtures_sha256 = fixtures.fixture_checksum(fixture_dir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # Timings, traffic and output sizes depend on the inputs, so only compare like with like
+        baseline_sha256 = baseline['meta'].get('fixtures_sha256')
+        if baseline_sha256 != fixtures_sha256:
+            parser.error(f"{args.compare} was run against different fixtures "
+                         f"({baseline_sha256 or 'checksum not recorded'}, now {fixtures_sha256}); "
+                         f"run the baseline again with the same fixture set")
+
+    from bom_radar_downloader import VERSION
+    from PIL import __version__ as pillow_version
+    results = {
+        'meta': {
+            'commit': git_revision(),
+            'version': VERSION,
+            'python': platform.python_version(),
+            'pillow': pillow_version,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'fixtures': str(fixture_dir),
+            'fixtures_sha256': fixtures_sha256,
+            'cycles': args.cycles,
+            'repeat': args.repeat,
+        },
+        'scenarios': {},
+    }
+
+    for background in args.backgrounds.split(','):
+        for count in radar_counts:
+            for roi in rois:
+                name = scenario_name(background, count, roi)
+                spec = {
+                    'name': name,
+                    'background': background,
+                    'products': products[:count],
+                    'roi': roi,
+                    'cycles': args.cycles,
+                    'fixtures': str(fixture_dir),
+                }
+                print(f"Running {name}...", file=sys.stderr)
+                results['scenarios'][name] = run_scenario(spec, args.repeat)
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, {
+            'time': args.time_threshold,
+            'memory': args.memory_threshold,
+            'size': args.size_threshold,
+        })
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): " + ", ".join(regressions))
+            return 1
+        print("\nNo regressions beyond thresholds")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,39 @@
 #!/usr/bin/env python3
 import io
 import ftplib
+import hashlib
 import json
 import os
+import queue
+import random
 import sys
 import asyncio
 import logging
 import signal
+import threading
 import time
-import urllib.request
-import urllib.error
-from PIL import Image, ImageDraw, ImageFont, ImageChops
+import zipfile
+from PIL import Image, ImageDraw, ImageFont
 from collections import OrderedDict
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
 import pytz
 import math
-from radar_metadata import RADAR_METADATA
+from radar_metadata import (
+    RADAR_METADATA, nearest_products, overlap_fraction, overlapping_products, station_of
+)
+from radar_server import FrameStore, FrameServer
+from tile_store import DirectoryTileStore, MBTilesStore, import_bundle
+from tile_sources import OSM_TILE_URL, TileNotFound, open_tile_source
+from smb_sync import SMBSync
+from mqtt_sink import MQTTSink
+from echo_archive import EchoArchive
+from rainfall import RainfallTracker, colourise, rainfall_legend
+from timelapse import TimelapseWriter
+from shared_cache import SharedCache
 
 VERSION = '1.0.13'
 
@@ -25,8 +42,144 @@ RADAR_IMAGE_SIZE = 512          # BOM radar PNGs are always 512x512
 COPYRIGHT_STRIP_PX = 16         # Top pixels containing BOM copyright text
 TIMESTAMP_STRIP_PX = 20         # Bottom pixels containing BOM timestamp text
 FRAME_COUNT = 5                  # Number of most-recent radar frames to fetch
+DOWNLOAD_QUEUE_DEPTH = 2         # Frames buffered between FTP transfer and decoding
 OSM_TILE_SIZE = 256              # OpenStreetMap tile dimensions (px)
 OSM_SUPERSAMPLE_SIZE = 1024     # High-res OSM composite before downsampling
+TILE_SEED_FILENAME = 'tile_seed.mbtiles'  # Imported into the tile cache at startup
+TILE_MEMORY_BUDGET_MB = 64      # Decoded tiles kept in memory (~256 RGBA tiles)
+TILE_DISK_BUDGET_MB = 256       # Default size limit for the persistent tile cache
+TILE_DOWNLOAD_WORKERS = 2       # Concurrent tile downloads (OSM usage policy allows 2)
+TILE_RATE_LIMIT = 4.0           # Default tile requests per second to URL tile sources
+OSM_MAX_ZOOM = 18               # Highest zoom requested for region-of-interest backgrounds
+
+# --- Region of interest ---
+DEFAULT_ROI_RADIUS_KM = 75      # Default half-width of the zoomed window
+MIN_ROI_HALF_WIDTH_PX = 8       # Smallest window half-width in radar pixels
+
+# --- Warm restart state ---
+STATE_FORMAT = 1                          # Bump when the snapshot layout changes
+BASE_IMAGE_MAX_AGE_SECONDS = 12 * 3600    # Rebuild cached base images twice a day
+
+# --- Source health / backoff ---
+BREAKER_FAILURE_THRESHOLD = 2       # Consecutive failures before a source is skipped
+BREAKER_BASE_DELAY_SECONDS = 300    # First back-off delay once a breaker opens
+BREAKER_MAX_DELAY_SECONDS = 3600    # Upper bound for the back-off delay
+BREAKER_PROBE_TIMEOUT_SECONDS = 300 # A probe not resolved by then is treated as lost and another is allowed
+
+# --- Per-radar refresh ---
+DEFAULT_RADAR_CADENCE_SECONDS = 360   # Typical interval between BOM radar scans
+SECONDARY_REFRESH_WAIT_SECONDS = 5    # How long a cycle waits for secondaries after the primary
+DEFAULT_FRAME_BUCKET_MINUTES = 6      # Multi-radar frames are aligned to buckets this wide
+
+# --- Parallel rendering ---
+MAX_RENDER_WORKERS = 16               # Upper bound for render_workers
+
+# --- Client-side compositing ---
+LAYER_MANIFEST_FILENAME = 'radar_layers.json'
+
+# --- Time-lapse archive ---
+TIMELAPSE_DISK_BUDGET_MB = 2048       # Default disk budget for daily time-lapse archives
+
+# --- Shared upstream cache ---
+SHARED_LISTING_MAX_AGE_SECONDS = 30       # Refreshes within this window share one directory listing
+SHARED_FRAME_MAX_AGE_SECONDS = 3 * 3600   # Raw frames are pruned from the shared cache after this
+
+# --- Hot configuration reload ---
+CONFIG_POLL_SECONDS = 5               # How often the options file is checked for changes
+# Settings that only change how the existing frames are encoded into the loop
+RELOAD_LOOP_KEYS = {
+    'gif_duration', 'gif_last_frame_duration', 'gif_loop',
+    'residential_enabled', 'residential_lat', 'residential_lon', 'output_sizes',
+}
+# Settings that take effect without rendering anything
+RELOAD_PASSIVE_KEYS = {
+    'update_interval', 'retry_on_error', 'retry_interval', 'log_level', 'render_workers',
+    'smb_server', 'smb_share', 'smb_username', 'smb_password', 'smb_remote_path',
+}
+# Settings bound at startup (servers, sinks, paths); changing them needs a restart
+RELOAD_RESTART_KEYS = {
+    'output_directory', 'state_file', 'scheduler_enabled', 'addon_mode',
+    'http_server_enabled', 'http_server_port', 'profile_cycles', 'profile_min_seconds',
+    'mqtt_enabled', 'mqtt_host', 'mqtt_port', 'mqtt_username', 'mqtt_password', 'mqtt_topic_prefix',
+    'echo_archive_hours', 'echo_archive_compression', 'echo_archive_dir', 'rainfall_hours',
+    'timelapse_enabled', 'timelapse_format', 'timelapse_max_mb', 'timelapse_directory',
+    'shared_cache_dir',
+}
+RELOAD_TILE_KEYS = {'tile_source', 'tile_rate_limit', 'tile_store', 'tile_cache_max_mb', 'tile_memory_cache_mb'}
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential back-off with jitter
+
+    Returns a delay between 50% and 100% of min(max_delay, base_delay * 2^(attempt-1))
+    so that co-located instances and sources do not retry in lock-step.
+    """
+    delay = min(max_delay, base_delay * (2 ** max(0, attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def parse_int_list(value):
+    """Sorted unique integers from a list or a comma-separated string such as '1,3,24'"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return sorted({int(hours) for hours in value if str(hours).strip()})
+
+
+def _timestamp_minutes(timestamp):
+    """Minutes since the epoch for a BOM YYYYMMDDHHmm (UTC) timestamp"""
+    return int(datetime.strptime(timestamp, '%Y%m%d%H%M').replace(tzinfo=pytz.utc).timestamp()) // 60
+
+
+def align_timestamps(radar_timestamps, bucket_minutes, tolerance_minutes=None, frame_count=FRAME_COUNT):
+    """Group multi-radar frames into time buckets
+
+    Radars publish at different minute offsets and cadences, so their raw
+    timestamps rarely coincide. Time is divided into buckets of
+    `bucket_minutes`; for each bucket every radar contributes its most recent
+    frame at or before the end of the bucket, provided it is no more than
+    `tolerance_minutes` older than the start of the bucket. Each bucket
+    becomes one loop frame, labelled with the newest source timestamp it uses.
+
+    Args:
+        radar_timestamps: Dict of {label: iterable of YYYYMMDDHHmm timestamps}
+        bucket_minutes: Bucket width in minutes
+        tolerance_minutes: How much older than the bucket a frame may be (default: bucket width)
+        frame_count: Number of most recent frames to return
+
+    Returns:
+        List of (frame timestamp, {label: source timestamp}) tuples, oldest first
+    """
+    if tolerance_minutes is None:
+        tolerance_minutes = bucket_minutes
+    entries = {
+        label: sorted((_timestamp_minutes(timestamp), timestamp) for timestamp in timestamps)
+        for label, timestamps in radar_timestamps.items()
+    }
+    bucket_ends = {
+        -(-minute // bucket_minutes) * bucket_minutes
+        for frames in entries.values() for minute, _ in frames
+    }
+
+    frames = {}
+    for bucket_end in sorted(bucket_ends):
+        earliest = bucket_end - bucket_minutes - tolerance_minutes
+        chosen = {}
+        for label, radar_frames in entries.items():
+            candidates = [timestamp for minute, timestamp in radar_frames if earliest < minute <= bucket_end]
+            if candidates:
+                chosen[label] = candidates[-1]
+        # Buckets that end up with the same newest frame keep the most complete mosaic
+        frame_timestamp = max(chosen.values())
+        if len(chosen) >= len(frames.get(frame_timestamp, ())):
+            frames[frame_timestamp] = chosen
+    return sorted(frames.items())[-frame_count:]
+
+
+# --- BOM FTP server ---
+BOM_FTP_HOST = 'ftp.bom.gov.au'
+BOM_FTP_PORT = 21
 
 # Check for Home Assistant addon options file or fallback to config.yaml
 OPTIONS_FILE = Path('/data/options.json')
@@ -36,37 +189,128 @@ CONFIG_FILE = Path('/config/config.yaml')
 class MapTileProvider:
     """Handles fetching and caching of OpenStreetMap tiles"""
 
-    # OpenStreetMap tile server URL
-    OSM_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+    # Default tile source: the public OpenStreetMap tile server
+    OSM_TILE_URL = OSM_TILE_URL
+
+    USER_AGENT = f"HomeAssistant-BoM-Radar-Addon/{VERSION} (https://github.com/safepay/ha-bom-radar-loop-addon)"
 
     # Cache expiry: 30 days (map tiles rarely change)
     CACHE_EXPIRY_SECONDS = 30 * 24 * 3600
 
-    def __init__(self, cache_dir):
+    def __init__(self, cache_dir, breaker=None, store=None,
+                 memory_budget_bytes=TILE_MEMORY_BUDGET_MB * 1024 * 1024, disk_budget_bytes=None,
+                 source=None, shared=None):
         """
         Initialize the map tile provider
 
         Args:
             cache_dir: Directory path for persistent tile cache
+            breaker: Optional CircuitBreaker guarding tile server requests
+            store: Optional tile store (default: DirectoryTileStore on cache_dir)
+            memory_budget_bytes: Size limit for decoded tiles held in memory
+            disk_budget_bytes: Size limit for the tile store (None = unlimited)
+            source: Optional tile source (default: rate-limited OpenStreetMap server)
+            shared: Optional SharedCache; downloads are then coordinated with
+                other instances using the same (shared) tile store
         """
         self.cache_dir = Path(cache_dir)
-        self._tile_cache_max = 256
-        self._memory_cache = OrderedDict()  # LRU cache capped at 256 tiles (~64 MB)
-        self.USER_AGENT = f"HomeAssistant-BoM-Radar-Addon/{VERSION} (https://github.com/safepay/ha-bom-radar-loop-addon)"
+        self.breaker = breaker
+        self.download_failures = 0  # Tiles replaced by a placeholder after a failed download
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self._memory_cache = OrderedDict()  # LRU of decoded tiles, bounded by memory_budget_bytes
+        self._memory_bytes = 0
+        self._eviction_thread = None
+        self._inflight = {}  # (z, x, y) -> Future for downloads in progress, shared by concurrent callers
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'downloads': 0, 'coalesced': 0, 'shared_hits': 0,
+            'memory_evictions': 0, 'disk_evictions': 0, 'disk_evicted_bytes': 0,
+        }
+        if source is None:
+            source = open_tile_source(self.OSM_TILE_URL, self.USER_AGENT, TILE_RATE_LIMIT)
+        self.source = source
+        self.shared = shared
+
+        if store is None:
+            # Create cache directory if it doesn't exist
+            if not self.cache_dir.exists():
+                logging.info(f"Creating tile cache directory: {self.cache_dir}")
+            store = DirectoryTileStore(self.cache_dir)
+        self.store = store
+
+        # Size the existing cache and trim it to budget without delaying startup
+        self.schedule_eviction()
 
-        # Create cache directory if it doesn't exist
-        if not self.cache_dir.exists():
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            logging.info(f"Created tile cache directory: {self.cache_dir}")
+    @staticmethod
+    def _tile_bytes(tile):
+        return tile.width * tile.height * len(tile.getbands())
 
     def _lru_insert(self, key, value):
-        """Insert a tile into the LRU memory cache, evicting the oldest if full."""
+        """Insert a tile into the LRU memory cache, evicting the oldest until it fits the byte budget."""
         if key in self._memory_cache:
-            self._memory_cache.move_to_end(key)
-        elif len(self._memory_cache) >= self._tile_cache_max:
-            oldest, _ = self._memory_cache.popitem(last=False)
+            self._memory_bytes -= self._tile_bytes(self._memory_cache.pop(key))
+        size = self._tile_bytes(value)
+        while self._memory_cache and self._memory_bytes + size > self.memory_budget_bytes:
+            oldest, tile = self._memory_cache.popitem(last=False)
+            self._memory_bytes -= self._tile_bytes(tile)
+            self.stats['memory_evictions'] += 1
             logging.debug(f"LRU evicted tile {oldest} from memory cache")
         self._memory_cache[key] = value
+        self._memory_bytes += size
+
+    def schedule_eviction(self):
+        """Trim the tile store to its disk budget in a background thread"""
+        if not self.disk_budget_bytes:
+            return
+        if self._eviction_thread is not None and self._eviction_thread.is_alive():
+            return
+        # A shared store also grows through other instances, so its size is only known after a rescan
+        if self.shared is None and self.store.total_bytes is not None \
+                and self.store.total_bytes <= self.disk_budget_bytes:
+            return
+        self._eviction_thread = threading.Thread(target=self._evict, name='tile-eviction', daemon=True)
+        self._eviction_thread.start()
+
+    def _evict(self):
+        try:
+            if self.shared is not None:
+                # One instance at a time measures the shared store and trims it to the budget
+                with self.shared.lock('tile_cache') as locked:
+                    if not locked:
+                        return
+                    self.store.scan()
+                    count, freed = self.store.evict(self.disk_budget_bytes)
+            else:
+                count, freed = self.store.evict(self.disk_budget_bytes)
+        except Exception as e:
+            logging.error(f"Tile cache eviction failed: {e}")
+            return
+        if count:
+            self.stats['disk_evictions'] += count
+            self.stats['disk_evicted_bytes'] += freed
+            logging.info(f"Evicted {count} least recently used tiles ({freed / 1024 / 1024:.1f} MB) "
+                         f"to stay within the {self.disk_budget_bytes / 1024 / 1024:.0f} MB tile cache budget")
+
+    def close(self):
+        """Wait for a running eviction and close the tile store"""
+        if self._eviction_thread is not None:
+            self._eviction_thread.join()
+        self.store.close()
+
+    def _count(self, name, amount=1):
+        """Increment a stats counter (downloads run on several threads)"""
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def cache_stats(self):
+        """Return tile cache counters and sizes for the status file"""
+        stats = dict(self.stats)
+        stats['memory_tiles'] = len(self._memory_cache)
+        stats['memory_bytes'] = self._memory_bytes
+        stats['disk_bytes'] = self.store.total_bytes
+        return stats
 
     @staticmethod
     def latlon_to_tile(lat, lon, zoom):
@@ -118,43 +362,162 @@ class MapTileProvider:
         Returns:
             PIL Image object (256x256 pixels)
         """
-        cache_key = f"{z}/{x}/{y}"
-        if cache_key in self._memory_cache:  # LRU: move to end on hit
-            logging.debug(f"Tile {cache_key} loaded from memory cache")
-            self._memory_cache.move_to_end(cache_key)
-            return self._memory_cache[cache_key]
-
-        cache_path = self.cache_dir / str(z) / str(x) / f"{y}.png"
-
-        if cache_path.exists():
-            cache_age = time.time() - cache_path.stat().st_mtime
-            if cache_age < self.CACHE_EXPIRY_SECONDS:
-                logging.debug(f"Tile {cache_key} loaded from disk cache (age: {cache_age/86400:.1f} days)")
-                tile = Image.open(cache_path).convert('RGBA')
-                self._lru_insert(cache_key, tile)
-                return tile
+        return self.fetch_tiles(z, [(x, y)])[(x, y)]
+
+    def fetch_tiles(self, z, coords):
+        """
+        Fetch a batch of tiles at one zoom level with caching
+
+        Tiles are taken from the memory cache, then read from the tile store
+        in a single batch, and only missing or expired tiles are fetched from
+        the tile source, up to TILE_DOWNLOAD_WORKERS at a time.
+
+        Args:
+            z: Zoom level
+            coords: Iterable of (x, y) tile coordinates
+
+        Returns:
+            Dict of {(x, y): PIL Image (256x256 pixels)}
+        """
+        tiles = {}
+        wanted = []
+        downloads_before = self.stats['downloads']
+        for x, y in coords:
+            cache_key = f"{z}/{x}/{y}"
+            if cache_key in self._memory_cache:  # LRU: move to end on hit
+                logging.debug(f"Tile {cache_key} loaded from memory cache")
+                self.stats['memory_hits'] += 1
+                self._memory_cache.move_to_end(cache_key)
+                tiles[(x, y)] = self._memory_cache[cache_key]
             else:
+                wanted.append((x, y))
+
+        stored = self.store.get_many(z, wanted) if wanted else {}
+        now = time.time()
+        missing = []
+        for x, y in wanted:
+            cache_key = f"{z}/{x}/{y}"
+            entry = stored.get((x, y))
+            if entry is not None:
+                data, fetched_at = entry
+                cache_age = now - fetched_at
+                if cache_age < self.CACHE_EXPIRY_SECONDS:
+                    logging.debug(f"Tile {cache_key} loaded from disk cache (age: {cache_age/86400:.1f} days)")
+                    self.stats['disk_hits'] += 1
+                    tile = Image.open(io.BytesIO(data)).convert('RGBA')
+                    self._lru_insert(cache_key, tile)
+                    tiles[(x, y)] = tile
+                    continue
                 logging.debug(f"Tile {cache_key} cache expired, re-downloading")
+            self.stats['misses'] += 1
+            missing.append((x, y))
 
-        url = self.OSM_TILE_URL.format(z=z, x=x, y=y)
-        logging.info(f"Downloading tile: {cache_key}")
+        if len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=TILE_DOWNLOAD_WORKERS, thread_name_prefix='tile-fetch') as pool:
+                fetched = list(pool.map(lambda coord: CycleProfiler.profiled(self._download_tile, z, *coord), missing))
+        else:
+            fetched = [self._download_tile(z, x, y) for x, y in missing]
+        for (x, y), (tile, ok) in zip(missing, fetched):
+            if ok:
+                self._lru_insert(f"{z}/{x}/{y}", tile)
+            tiles[(x, y)] = tile
 
-        try:
-            req = urllib.request.Request(url, headers={'User-Agent': self.USER_AGENT})
-            with urllib.request.urlopen(req, timeout=10) as response:
-                tile_data = response.read()
-                tile = Image.open(io.BytesIO(tile_data)).convert('RGBA')
+        if self.stats['downloads'] > downloads_before:
+            self.schedule_eviction()
+        return tiles
 
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            tile.save(cache_path, 'PNG')
-            logging.debug(f"Tile {cache_key} saved to disk cache")
-            self._lru_insert(cache_key, tile)
+    def _download_tile(self, z, x, y):
+        """
+        Fetch a tile from the tile source, coalescing concurrent requests
+
+        If another thread is already fetching the same tile, wait for its
+        result instead of sending a second request.
 
-            return tile
+        Returns:
+            Tuple of (PIL Image, ok) - a grey placeholder with ok=False on failure
+        """
+        key = (z, x, y)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            self._count('coalesced')
+            return future.result()
+
+        try:
+            if self.shared is not None and self.source.remote:
+                result = self._fetch_shared(z, x, y)
+            else:
+                result = self._fetch_from_source(z, x, y)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _fetch_shared(self, z, x, y):
+        """Fetch a tile as the only instance doing so, or take the one another instance stored"""
+        with self.shared.lock(f"tiles/{z}/{x}/{y}"):
+            # Another instance may have stored the tile while this one waited for the lock
+            entry = self.store.get(z, x, y)
+            if entry is not None and time.time() - entry[1] < self.CACHE_EXPIRY_SECONDS:
+                logging.debug(f"Tile {z}/{x}/{y} fetched by another instance")
+                self._count('shared_hits')
+                return Image.open(io.BytesIO(entry[0])).convert('RGBA'), True
+            return self._fetch_from_source(z, x, y)
+
+    def _fetch_from_source(self, z, x, y):
+        """Fetch, decode and store one tile; return (tile, ok)"""
+        cache_key = f"{z}/{x}/{y}"
+        if self.source.remote and self.breaker is not None and not self.breaker.allow_request():
+            logging.debug(f"Tile server unavailable (retry in {self.breaker.retry_in():.0f}s), using placeholder for {cache_key}")
+            self._record_failure()
+            return Image.new('RGBA', (256, 256), (200, 200, 200, 255)), False
 
+        logging.info(f"Fetching tile {cache_key} from {self.source.name}")
+        try:
+            tile_data = self.source.fetch(z, x, y)
+            tile = Image.open(io.BytesIO(tile_data)).convert('RGBA')
+
+            if self.source.remote:
+                # Store the tile exactly as served rather than re-encoding it
+                self.store.put(z, x, y, tile_data)
+                logging.debug(f"Tile {cache_key} saved to disk cache")
+                if self.breaker is not None:
+                    self.breaker.record_success()
+            self._count('downloads')
+            return tile, True
+
+        except TileNotFound as e:
+            # A gap in the tile set says nothing about the source's health
+            logging.warning(f"Tile {cache_key} not available: {e}")
+            self._record_failure()
         except Exception as e:
             logging.error(f"Failed to download tile {cache_key}: {e}")
-            return Image.new('RGBA', (256, 256), (200, 200, 200, 255))
+            self._record_failure()
+            if self.source.remote and self.breaker is not None:
+                self.breaker.record_failure(e)
+        return Image.new('RGBA', (256, 256), (200, 200, 200, 255)), False
+
+    def _record_failure(self):
+        with self._stats_lock:
+            self.download_failures += 1
+
+    def import_bundle(self, bundle_path):
+        """Import an MBTiles bundle into the tile store (e.g. to seed an offline install)
+
+        Returns:
+            int: Number of tiles imported
+        """
+        count = import_bundle(bundle_path, self.store)
+        logging.info(f"Imported {count} tiles from {bundle_path}")
+        return count
 
     def create_background(self, lat, lon, zoom, size=1024):
         """
@@ -180,10 +543,11 @@ class MapTileProvider:
         center_tile_x = int(exact_x)
         center_tile_y = int(exact_y)
 
-        # Fetch a larger grid to allow for sub-tile centering
-        # e.g. for 1024x1024 output (4x4 tiles), fetch 6x6 tiles for margin
-        tiles_per_side = (size // OSM_TILE_SIZE) + 2  # Add 2 for margin
-        half_tiles = tiles_per_side // 2
+        # Fetch enough tiles either side of the centre tile to cover half the
+        # output wherever the centre falls within its tile, e.g. 5x5 tiles
+        # for a 1024x1024 output. Sizes need not be multiples of the tile size.
+        half_tiles = math.ceil(size / 2 / OSM_TILE_SIZE)
+        tiles_per_side = 2 * half_tiles + 1
 
         # Calculate tile range
         start_x = center_tile_x - half_tiles
@@ -193,13 +557,12 @@ class MapTileProvider:
         stitched_size = tiles_per_side * OSM_TILE_SIZE
         stitched = Image.new('RGBA', (stitched_size, stitched_size))
 
-        # Fetch and paste each tile
+        # Fetch the whole grid in one batch, then paste each tile
+        tiles = self.fetch_tiles(zoom, [(start_x + dx, start_y + dy)
+                                        for dy in range(tiles_per_side) for dx in range(tiles_per_side)])
         for dy in range(tiles_per_side):
             for dx in range(tiles_per_side):
-                tile_x = start_x + dx
-                tile_y = start_y + dy
-
-                tile = self.fetch_tile(zoom, tile_x, tile_y)
+                tile = tiles[(start_x + dx, start_y + dy)]
 
                 paste_x = dx * OSM_TILE_SIZE
                 paste_y = dy * OSM_TILE_SIZE
@@ -217,19 +580,12 @@ class MapTileProvider:
         crop_right = crop_left + size
         crop_bottom = crop_top + size
 
-        # Ensure we're within bounds (should always be true with margin)
-        if crop_left >= 0 and crop_top >= 0 and crop_right <= stitched.width and crop_bottom <= stitched.height:
-            centered = stitched.crop((crop_left, crop_top, crop_right, crop_bottom))
-            logging.debug(f"Cropped to {size}x{size} centered on exact coordinates ({pixel_x:.1f}, {pixel_y:.1f})")
-        else:
-            # Fallback - shouldn't happen with margin
-            logging.warning(f"Crop bounds exceeded (margin insufficient), using rough centering")
-            crop_left = max(0, crop_left)
-            crop_top = max(0, crop_top)
-            crop_right = min(stitched.width, crop_right)
-            crop_bottom = min(stitched.height, crop_bottom)
-            centered = stitched.crop((crop_left, crop_top, crop_right, crop_bottom))
-
+        # The grid covers the output for any sub-tile position, so this only fails on a sizing bug
+        if not (crop_left >= 0 and crop_top >= 0 and crop_right <= stitched.width and crop_bottom <= stitched.height):
+            raise RuntimeError(f"{size}x{size} crop at ({crop_left}, {crop_top}) exceeds the "
+                               f"{stitched.width}x{stitched.height} tile grid")
+        centered = stitched.crop((crop_left, crop_top, crop_right, crop_bottom))
+        logging.debug(f"Cropped to {size}x{size} centered on exact coordinates ({pixel_x:.1f}, {pixel_y:.1f})")
         return centered
 
 
@@ -292,6 +648,11 @@ class Config:
                 'gif_duration': int(options.get('gif_duration', 500)),
                 'gif_last_frame_duration': int(options.get('gif_last_frame_duration', 1000)),
                 'gif_loop': 0,
+                'output_sizes': parse_int_list(options.get('output_sizes')),  # Extra loop widths, e.g. '256,128'
+
+                # 'composite' (GIF and frames), 'layers' (base + radar overlays + manifest) or 'both'
+                'output_mode': options.get('output_mode', 'composite'),
+                'overlay_format': options.get('overlay_format', 'png'),  # 'png' or 'webp'
 
                 # Logging
                 'log_level': 'INFO',
@@ -301,6 +662,13 @@ class Config:
                 'residential_lat': float(options.get('residential_latitude', -37.8136)),
                 'residential_lon': float(options.get('residential_longitude', 144.9631)),
 
+                # Region of interest: crop and enlarge a window around the residence (or roi_latitude/longitude)
+                'roi_enabled': options.get('roi_enabled', False),
+                'roi_radius_km': float(options.get('roi_radius_km', DEFAULT_ROI_RADIUS_KM)),
+                'roi_lat': options.get('roi_latitude'),
+                'roi_lon': options.get('roi_longitude'),
+                'roi_output_size': int(options.get('roi_output_size', RADAR_IMAGE_SIZE)),
+
                 # Second radar
                 'second_radar_enabled': options.get('second_radar_enabled', False),
                 'second_radar_product_id': options.get('second_radar_product_id'),
@@ -309,6 +677,60 @@ class Config:
                 'third_radar_enabled': options.get('third_radar_enabled', False),
                 'third_radar_product_id': options.get('third_radar_product_id'),
 
+                # Automatic selection of overlapping radars for unused slots
+                'auto_mosaic': options.get('auto_mosaic', False),
+                'auto_mosaic_min_overlap': float(options.get('auto_mosaic_min_overlap', 0.1)),
+
+                # Warm restart snapshot (kept in the addon's private /data volume)
+                'state_file': '/data/radar_state.zip',
+
+                # Profiling (normally armed at runtime via a profile_request file)
+                'profile_cycles': int(os.getenv('BOM_RADAR_PROFILE_CYCLES', options.get('profile_cycles', 0))),
+                'profile_min_seconds': float(os.getenv('BOM_RADAR_PROFILE_MIN_SECONDS', options.get('profile_min_seconds', 0))),
+
+                # Frame rendering worker processes (1 = in-process, 0 = one per CPU)
+                'render_workers': int(options.get('render_workers', 1)),
+
+                # Multi-radar time alignment (0 = one frame per distinct timestamp)
+                'frame_bucket_minutes': int(options.get('frame_bucket_minutes', DEFAULT_FRAME_BUCKET_MINUTES)),
+                'frame_bucket_tolerance_minutes': options.get('frame_bucket_tolerance_minutes'),  # default: bucket width
+
+                # Echo-intensity history (0 hours = disabled)
+                'echo_archive_hours': int(options.get('echo_archive_hours', 0)),
+                'echo_archive_compression': options.get('echo_archive_compression', 'none'),  # 'none' or 'rle'
+                'echo_archive_dir': '/data/echo_archive',
+
+                # Rainfall totals over these windows, e.g. '1,3,24' (empty = disabled)
+                'rainfall_hours': parse_int_list(options.get('rainfall_hours')),
+
+                # Daily time-lapse archive of rendered frames
+                'timelapse_enabled': options.get('timelapse_enabled', False),
+                'timelapse_format': options.get('timelapse_format', 'auto'),  # 'auto' (ffmpeg if installed), 'mp4' or 'frames'
+                'timelapse_max_mb': int(options.get('timelapse_max_mb', TIMELAPSE_DISK_BUDGET_MB)),  # 0 = unlimited
+                'timelapse_directory': os.path.join(output_directory, 'timelapse'),
+
+                # OSM tile source and cache: 'directory' (one file per tile) or 'mbtiles' (single SQLite file)
+                'tile_source': options.get('tile_source') or OSM_TILE_URL,  # XYZ URL template, .mbtiles file or directory
+                'tile_rate_limit': float(options.get('tile_rate_limit', TILE_RATE_LIMIT)),  # 0 = unlimited
+                'tile_store': options.get('tile_store', 'directory'),
+                'tile_cache_max_mb': int(options.get('tile_cache_max_mb', TILE_DISK_BUDGET_MB)),  # 0 = unlimited
+                'tile_memory_cache_mb': int(options.get('tile_memory_cache_mb', TILE_MEMORY_BUDGET_MB)),
+
+                # Listings, frames and tiles shared with other instances on this host (under /config, empty = disabled)
+                'shared_cache_dir': f"/config/{options['shared_cache_path']}" if options.get('shared_cache_path') else None,
+
+                # Built-in HTTP server
+                'http_server_enabled': options.get('http_server_enabled', False),
+                'http_server_port': 8099,  # Mapped to a host port via the addon network settings
+
+                # MQTT publisher
+                'mqtt_enabled': options.get('mqtt_enabled', False),
+                'mqtt_host': options.get('mqtt_host', 'core-mosquitto'),
+                'mqtt_port': int(options.get('mqtt_port', 1883)),
+                'mqtt_username': options.get('mqtt_username'),
+                'mqtt_password': options.get('mqtt_password'),
+                'mqtt_topic_prefix': options.get('mqtt_topic_prefix', 'bom_radar'),
+
                 # Home Assistant addon mode (no SMB needed)
                 'addon_mode': True,
             }
@@ -332,8 +754,15 @@ class Config:
             gif = config.get('gif', {})
             log_config = config.get('logging', {})
             residential = config.get('residential_location', {})
+            roi = config.get('region_of_interest', {})
             second_radar = config.get('second_radar', {})
             third_radar = config.get('third_radar', {})
+            http_server = config.get('http_server', {})
+            mqtt = config.get('mqtt', {})
+            timelapse = config.get('timelapse', {})
+            profiling = config.get('profiling', {})
+            processing = config.get('processing', {})
+            output_directory = os.getenv('OUTPUT_DIR', output.get('directory', '/images'))
 
             return {
                 # Radar settings
@@ -360,7 +789,7 @@ class Config:
                 'layers': config.get('layers', ['background', 'catchments', 'topography', 'locations']),
 
                 # Output settings
-                'output_directory': os.getenv('OUTPUT_DIR', output.get('directory', '/images')),
+                'output_directory': output_directory,
                 'animated_gif_filename': os.getenv('ANIMATED_GIF', output.get('animated_gif', 'radar_animated.gif')),
                 'timestamp_filename': os.getenv('TIMESTAMP_FILE', output.get('timestamp_file', 'radar_last_update.txt')),
                 'legend_file': os.getenv('LEGEND_FILE', output.get('legend_file', '/app/radar-colour-bar.png')),
@@ -369,6 +798,11 @@ class Config:
                 'gif_duration': int(os.getenv('GIF_DURATION', gif.get('duration', 500))),
                 'gif_last_frame_duration': int(os.getenv('GIF_LAST_FRAME_DURATION', gif.get('last_frame_duration', 1000))),
                 'gif_loop': int(os.getenv('GIF_LOOP', gif.get('loop', 0))),
+                'output_sizes': parse_int_list(os.getenv('OUTPUT_SIZES', gif.get('output_sizes'))),  # Extra loop widths, e.g. [256, 128]
+
+                # 'composite' (GIF and frames), 'layers' (base + radar overlays + manifest) or 'both'
+                'output_mode': os.getenv('OUTPUT_MODE', output.get('mode', 'composite')),
+                'overlay_format': os.getenv('OVERLAY_FORMAT', output.get('overlay_format', 'png')),  # 'png' or 'webp'
 
                 # Logging
                 'log_level': os.getenv('LOG_LEVEL', log_config.get('level', 'INFO')).upper(),
@@ -378,6 +812,13 @@ class Config:
                 'residential_lat': residential.get('latitude'),
                 'residential_lon': residential.get('longitude'),
 
+                # Region of interest: crop and enlarge a window around the residence (or latitude/longitude)
+                'roi_enabled': os.getenv('ROI_ENABLED', str(roi.get('enabled', False))).lower() == 'true',
+                'roi_radius_km': float(os.getenv('ROI_RADIUS_KM', roi.get('radius_km', DEFAULT_ROI_RADIUS_KM))),
+                'roi_lat': os.getenv('ROI_LATITUDE', roi.get('latitude')),
+                'roi_lon': os.getenv('ROI_LONGITUDE', roi.get('longitude')),
+                'roi_output_size': int(os.getenv('ROI_OUTPUT_SIZE', roi.get('output_size', RADAR_IMAGE_SIZE))),
+
                 # Second radar
                 'second_radar_enabled': second_radar.get('enabled', False),
                 'second_radar_product_id': second_radar.get('product_id'),
@@ -386,6 +827,60 @@ class Config:
                 'third_radar_enabled': third_radar.get('enabled', False),
                 'third_radar_product_id': third_radar.get('product_id'),
 
+                # Automatic selection of overlapping radars for unused slots
+                'auto_mosaic': radar.get('auto_mosaic', False),
+                'auto_mosaic_min_overlap': float(radar.get('auto_mosaic_min_overlap', 0.1)),
+
+                # Warm restart snapshot
+                'state_file': os.getenv('STATE_FILE', output.get('state_file', os.path.join(output_directory, '.radar_state.zip'))),
+
+                # Profiling (normally armed at runtime via a profile_request file)
+                'profile_cycles': int(os.getenv('BOM_RADAR_PROFILE_CYCLES', profiling.get('cycles', 0))),
+                'profile_min_seconds': float(os.getenv('BOM_RADAR_PROFILE_MIN_SECONDS', profiling.get('min_seconds', 0))),
+
+                # Frame rendering worker processes (1 = in-process, 0 = one per CPU)
+                'render_workers': int(os.getenv('RENDER_WORKERS', processing.get('render_workers', 1))),
+
+                # Multi-radar time alignment (0 = one frame per distinct timestamp)
+                'frame_bucket_minutes': int(os.getenv('FRAME_BUCKET_MINUTES', processing.get('frame_bucket_minutes', DEFAULT_FRAME_BUCKET_MINUTES))),
+                'frame_bucket_tolerance_minutes': os.getenv('FRAME_BUCKET_TOLERANCE_MINUTES', processing.get('frame_bucket_tolerance_minutes')),  # default: bucket width
+
+                # Echo-intensity history (0 hours = disabled)
+                'echo_archive_hours': int(os.getenv('ECHO_ARCHIVE_HOURS', processing.get('echo_archive_hours', 0))),
+                'echo_archive_compression': os.getenv('ECHO_ARCHIVE_COMPRESSION', processing.get('echo_archive_compression', 'none')),  # 'none' or 'rle'
+                'echo_archive_dir': os.getenv('ECHO_ARCHIVE_DIR', processing.get('echo_archive_dir', os.path.join(output_directory, '.echo_archive'))),
+
+                # Rainfall totals over these windows, e.g. [1, 3, 24] (empty = disabled)
+                'rainfall_hours': parse_int_list(os.getenv('RAINFALL_HOURS', processing.get('rainfall_hours'))),
+
+                # Daily time-lapse archive of rendered frames
+                'timelapse_enabled': os.getenv('TIMELAPSE_ENABLED', str(timelapse.get('enabled', False))).lower() == 'true',
+                'timelapse_format': os.getenv('TIMELAPSE_FORMAT', timelapse.get('format', 'auto')),  # 'auto' (ffmpeg if installed), 'mp4' or 'frames'
+                'timelapse_max_mb': int(os.getenv('TIMELAPSE_MAX_MB', timelapse.get('max_mb', TIMELAPSE_DISK_BUDGET_MB))),  # 0 = unlimited
+                'timelapse_directory': os.getenv('TIMELAPSE_DIR', timelapse.get('directory', os.path.join(output_directory, 'timelapse'))),
+
+                # OSM tile source and cache: 'directory' (one file per tile) or 'mbtiles' (single SQLite file)
+                'tile_source': os.getenv('TILE_SOURCE', output.get('tile_source')) or OSM_TILE_URL,  # XYZ URL template, .mbtiles file or directory
+                'tile_rate_limit': float(os.getenv('TILE_RATE_LIMIT', output.get('tile_rate_limit', TILE_RATE_LIMIT))),  # 0 = unlimited
+                'tile_store': os.getenv('TILE_STORE', output.get('tile_store', 'directory')),
+                'tile_cache_max_mb': int(os.getenv('TILE_CACHE_MAX_MB', output.get('tile_cache_max_mb', TILE_DISK_BUDGET_MB))),  # 0 = unlimited
+                'tile_memory_cache_mb': int(os.getenv('TILE_MEMORY_CACHE_MB', output.get('tile_memory_cache_mb', TILE_MEMORY_BUDGET_MB))),
+
+                # Listings, frames and tiles shared with other instances on this host (empty = disabled)
+                'shared_cache_dir': os.getenv('SHARED_CACHE_DIR', output.get('shared_cache_dir')) or None,
+
+                # Built-in HTTP server
+                'http_server_enabled': os.getenv('HTTP_SERVER_ENABLED', str(http_server.get('enabled', False))).lower() == 'true',
+                'http_server_port': int(os.getenv('HTTP_SERVER_PORT', http_server.get('port', 8099))),
+
+                # MQTT publisher
+                'mqtt_enabled': os.getenv('MQTT_ENABLED', str(mqtt.get('enabled', False))).lower() == 'true',
+                'mqtt_host': os.getenv('MQTT_HOST', mqtt.get('host', 'localhost')),
+                'mqtt_port': int(os.getenv('MQTT_PORT', mqtt.get('port', 1883))),
+                'mqtt_username': os.getenv('MQTT_USERNAME', mqtt.get('username')),
+                'mqtt_password': os.getenv('MQTT_PASSWORD', mqtt.get('password')),
+                'mqtt_topic_prefix': os.getenv('MQTT_TOPIC_PREFIX', mqtt.get('topic_prefix', 'bom_radar')),
+
                 # Not in addon mode
                 'addon_mode': False,
             }
@@ -396,21 +891,620 @@ class Config:
             sys.exit(1)
 
 
+class CircuitBreaker:
+    """Health tracking for a single upstream source
+
+    A breaker is 'closed' while the source works. After
+    BREAKER_FAILURE_THRESHOLD consecutive failures it 'opens' and requests are
+    skipped until an exponentially growing, jittered delay has passed. A
+    single request is then let through as a probe ('half_open'), and others
+    are skipped until it resolves: success closes the breaker, failure
+    re-opens it with a longer delay. Breakers are shared by the refresh,
+    decode and tile threads, so state changes are made under a lock.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 base_delay=BREAKER_BASE_DELAY_SECONDS, max_delay=BREAKER_MAX_DELAY_SECONDS,
+                 probe_timeout=BREAKER_PROBE_TIMEOUT_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_timeout = probe_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_success = None
+        self.next_probe = 0.0
+        self.probe_started = 0.0     # When the current half-open probe was let through
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return True if the source should be contacted now
+
+        In the half-open state only the caller that takes the probe gets
+        True. A caller that takes it must report the outcome with
+        record_success() or record_failure(); a probe left unresolved for
+        probe_timeout seconds is handed to the next caller.
+        """
+        with self._lock:
+            now = time.time()
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if now < self.next_probe:
+                    return False
+                self.state = 'half_open'
+                logging.info(f"Probing {self.name} after back-off")
+            elif now - self.probe_started < self.probe_timeout:
+                return False
+            else:
+                logging.warning(f"Probe of {self.name} did not report back, probing again")
+            self.probe_started = now
+            return True
+
+    def available(self):
+        """Return True if allow_request() would let a request through now, without taking the probe"""
+        with self._lock:
+            now = time.time()
+            if self.state == 'open':
+                return now >= self.next_probe
+            if self.state == 'half_open':
+                return now - self.probe_started >= self.probe_timeout
+            return True
+
+    def retry_in(self):
+        """Seconds until the next probe (0 if requests are allowed)"""
+        with self._lock:
+            return self._retry_in()
+
+    def _retry_in(self):
+        return max(0.0, self.next_probe - time.time()) if self.state == 'open' else 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"{self.name} recovered after {self.consecutive_failures} failure(s)")
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_success = time.time()
+
+    def record_failure(self, error):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                attempt = self.consecutive_failures - self.failure_threshold + 1
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                self.state = 'open'
+                self.next_probe = time.time() + delay
+                logging.warning(f"{self.name} marked unavailable after {self.consecutive_failures} "
+                                f"failure(s) ({error}); next probe in {delay:.0f}s")
+
+    def status(self):
+        """Return a JSON-serialisable summary for the status file"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'last_error': self.last_error,
+                'retry_in_seconds': round(self._retry_in()),
+                'last_success': datetime.fromtimestamp(self.last_success).isoformat() if self.last_success else None,
+            }
+
+
+class SourceHealth:
+    """Registry of circuit breakers keyed by source name"""
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Return the breaker for a source, creating it on first use"""
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def status(self):
+        with self._lock:
+            breakers = sorted(self._breakers.items())
+        return {name: breaker.status() for name, breaker in breakers}
+
+
+class RadarSource:
+    """Refresh state for one radar product (primary, second or third)
+
+    Each source is refreshed by its own background job with its own FTP
+    connection. A job that is still running when the cycle renders is left
+    to finish in the background and its frames are picked up next cycle.
+    """
+
+    def __init__(self, product_id, label):
+        self.product_id = product_id
+        self.label = label
+        self.future = None          # In-flight refresh job
+        self.next_refresh = 0.0     # Epoch seconds when a new scan is expected
+        self.last_refresh = None    # Epoch seconds of the last successful refresh
+        self.stale = False          # True if the last render used cached frames after a failed/slow refresh
+
+    def schedule_after(self, timestamps):
+        """Expect the next scan one cadence after the newest frame
+
+        The cadence is the smallest gap between the frames just fetched, so
+        stations scanning every 5, 6 or 10 minutes are all handled.
+        """
+        epochs = sorted(pytz.utc.localize(datetime.strptime(ts, "%Y%m%d%H%M")).timestamp()
+                        for ts in timestamps)
+        gaps = [b - a for a, b in zip(epochs, epochs[1:]) if b > a]
+        cadence = min(gaps) if gaps else DEFAULT_RADAR_CADENCE_SECONDS
+        self.next_refresh = epochs[-1] + cadence if epochs else 0.0
+
+    def status_time(self, timezone):
+        """Last successful refresh as an ISO 8601 string, or None"""
+        if self.last_refresh is None:
+            return None
+        return datetime.fromtimestamp(self.last_refresh, pytz.timezone(timezone)).isoformat()
+
+
+class RegionOfInterest:
+    """Square window of the primary radar image that is cropped and enlarged in ROI mode
+
+    Coordinates are pixels of the primary radar image, with the radar at the centre.
+    """
+
+    def __init__(self, centre, half_width, radar_location, km_per_pixel, output_size):
+        """
+        Args:
+            centre: Window centre (x, y) in primary radar pixels
+            half_width: Half the window width in primary radar pixels
+            radar_location: (lat, lon) of the primary radar
+            km_per_pixel: Scale of the primary radar image
+            output_size: Width and height of the enlarged window
+        """
+        self.centre = centre
+        self.box = (centre[0] - half_width, centre[1] - half_width, centre[0] + half_width, centre[1] + half_width)
+        self.radar_location = radar_location
+        self.km_per_pixel = km_per_pixel
+        self.output_size = output_size
+        self.scale = output_size / (2 * half_width)
+
+    @property
+    def width_km(self):
+        return (self.box[2] - self.box[0]) * self.km_per_pixel
+
+    def centre_latlon(self):
+        """Latitude/longitude of the window centre (the inverse of latlon_to_pixel)"""
+        R = 6371.0  # Earth's radius in km
+        radar_lat, radar_lon = self.radar_location
+        dx = (self.centre[0] - RADAR_IMAGE_SIZE // 2) * self.km_per_pixel
+        dy = (RADAR_IMAGE_SIZE // 2 - self.centre[1]) * self.km_per_pixel
+        lat = radar_lat + math.degrees(dy / R)
+        lon = radar_lon + math.degrees(dx / (R * math.cos(math.radians(radar_lat))))
+        return lat, lon
+
+    def overlaps(self, offset, size=RADAR_IMAGE_SIZE):
+        """Whether an image of `size` placed at `offset` covers any of the window"""
+        left, top, right, bottom = self.box
+        return offset[0] < right and offset[0] + size > left and offset[1] < bottom and offset[1] + size > top
+
+    def crop(self, image, offset=(0, 0), resample=Image.Resampling.NEAREST):
+        """The part of an image placed at `offset` that lies in the window, enlarged to the output size
+
+        Parts of the window outside the image are transparent. Nearest
+        neighbour keeps radar colours exact, so echoes stay on the colour scale.
+        """
+        left, top, right, bottom = self.box
+        offset_x, offset_y = offset
+        window = image.crop((left - offset_x, top - offset_y, right - offset_x, bottom - offset_y))
+        return window.resize((self.output_size, self.output_size), resample)
+
+    def to_output(self, x, y):
+        """Map a primary radar pixel to the enlarged output"""
+        return (int((x - self.box[0]) * self.scale), int((y - self.box[1]) * self.scale))
+
+    def status(self):
+        lat, lon = self.centre_latlon()
+        return {
+            'latitude': round(lat, 4),
+            'longitude': round(lon, 4),
+            'width_km': round(self.width_km, 1),
+            'output_size': self.output_size,
+        }
+
+
+class CycleProfiler:
+    """On-demand cProfile/tracemalloc capture of processing cycles
+
+    Profiling is armed for the next N cycles either from configuration
+    ('profile_cycles' / BOM_RADAR_PROFILE_CYCLES), from SIGUSR1, or at runtime
+    by creating a `profile_request` file in the output directory containing
+    the number of cycles and optionally a minimum duration, e.g. "3 20".
+    The request file is consumed when read, so no restart is needed.
+
+    When a minimum duration is set, every cycle is profiled while armed but
+    results are only written (and counted) for cycles at least that slow.
+
+    cProfile only sees the thread that enables it, so work handed to other
+    threads (radar refreshes, frame decoding, tile fetches) is started
+    through `CycleProfiler.profiled()`, which profiles it in its own thread
+    and merges it into the cycle's results.
+    """
+
+    REQUEST_FILENAME = 'profile_request'
+    TOP_ALLOCATIONS = 30
+    TOP_FUNCTIONS = 40
+
+    current = None  # The CycleProfiler capturing a cycle right now, if any
+
+    @classmethod
+    def profiled(cls, func, *args):
+        """Call `func(*args)` in a worker thread, profiling it if a cycle is being profiled"""
+        active = cls.current
+        if active is None:
+            return func(*args)
+
+        import cProfile
+
+        # Bind the cycle's list now, so a thread outliving the cycle cannot leak into the next one
+        thread_profilers = active.thread_profilers
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            with active.thread_profilers_lock:
+                thread_profilers.append(profiler)
+
+    def __init__(self, output_directory, cycles=0, min_seconds=0.0):
+        self.output_directory = Path(output_directory)
+        self.profile_directory = self.output_directory / 'profiles'
+        self.remaining = 0
+        self.min_seconds = 0.0
+        self.thread_profilers = []
+        self.thread_profilers_lock = threading.Lock()
+        if cycles:
+            self.arm(cycles, min_seconds)
+
+    def arm(self, cycles, min_seconds=0.0):
+        """Profile the next `cycles` cycles (only those >= min_seconds)"""
+        self.remaining = max(0, int(cycles))
+        self.min_seconds = max(0.0, float(min_seconds))
+        if self.remaining:
+            threshold = f" slower than {self.min_seconds:.1f}s" if self.min_seconds else ""
+            logging.info(f"Profiling armed for the next {self.remaining} cycle(s){threshold}")
+
+    def check_request(self):
+        """Arm from a profile_request file in the output directory, if present"""
+        request_path = self.output_directory / self.REQUEST_FILENAME
+        if not request_path.exists():
+            return
+        try:
+            fields = request_path.read_text().split()
+            cycles = int(fields[0]) if fields else 1
+            min_seconds = float(fields[1]) if len(fields) > 1 else 0.0
+            self.arm(cycles, min_seconds)
+        except ValueError as e:
+            logging.error(f"Invalid {self.REQUEST_FILENAME} contents (expected '<cycles> [min_seconds]'): {e}")
+        finally:
+            request_path.unlink(missing_ok=True)
+
+    def run(self, func, label):
+        """Call `func()`, profiling it if armed
+
+        Args:
+            func: Zero-argument callable (normally RadarProcessor.process_images)
+            label: Short identifier used in output filenames (e.g. 'run7')
+
+        Returns:
+            Whatever `func()` returns
+        """
+        self.check_request()
+        if not self.remaining:
+            return func()
+
+        import cProfile
+        import tracemalloc
+
+        profiler = cProfile.Profile()
+        with self.thread_profilers_lock:
+            self.thread_profilers = []
+        tracemalloc.start(10)
+        start = time.perf_counter()
+        CycleProfiler.current = self
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+            CycleProfiler.current = None
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with self.thread_profilers_lock:
+                thread_profilers = list(self.thread_profilers)
+
+            if elapsed >= self.min_seconds:
+                self.remaining -= 1
+                self._write_results(profiler, thread_profilers, snapshot, peak, elapsed, label)
+            else:
+                logging.debug(f"Cycle took {elapsed:.1f}s (< {self.min_seconds:.1f}s), profile discarded")
+
+    def _write_results(self, profiler, thread_profilers, snapshot, peak, elapsed, label):
+        import pstats
+
+        try:
+            self.profile_directory.mkdir(parents=True, exist_ok=True)
+            stem = self.profile_directory / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{label}"
+
+            summary = io.StringIO()
+            stats = pstats.Stats(profiler, stream=summary)
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+            stats.dump_stats(f"{stem}.pstats")
+
+            summary.write(f"Cycle time: {elapsed:.3f}s ({len(thread_profilers)} worker thread task(s) included)\n\n")
+            stats.sort_stats('cumulative').print_stats(self.TOP_FUNCTIONS)
+            with open(f"{stem}.profile.txt", 'w') as f:
+                f.write(summary.getvalue())
+
+            with open(f"{stem}.allocations.txt", 'w') as f:
+                f.write(f"Peak traced Python memory: {peak / (1024 * 1024):.1f} MiB\n")
+                f.write("(Pillow pixel buffers are allocated outside tracemalloc and not included)\n\n")
+                for stat in snapshot.statistics('lineno')[:self.TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+
+            logging.info(f"Wrote profile for {elapsed:.1f}s cycle to {stem}.* "
+                         f"({self.remaining} profiled cycle(s) remaining)")
+        except Exception as e:
+            logging.error(f"Failed to write profiling results: {e}")
+
+
 class RadarProcessor:
     """Processes radar images from BOM FTP"""
 
     def __init__(self, config):
         self.config = config
-        self.frames = []
+        self.loaded_config = dict(config)  # As loaded, before auto mosaic; diffed on reload
+        self.frame_count = 0
         self.timestamps = []
         self.saved_filenames = []
 
+        # Wall-clock seconds spent in each pipeline stage during the last cycle
+        self.stage_timings = {}
+
+        # Caches carried across cycles (and snapshotted across restarts):
+        # cleaned radar frames as compact PNG bytes keyed by remote filename,
+        # and base images keyed by (product, background type, layers)
+        self.frame_cache = {}
+        self.frame_cache_lock = threading.Lock()
+        self.base_image_cache = {}
+        self.base_layer_errors = 0
+        self._overlay_font = None
+        self._legend_bar = None
+
+        # Optional process pool for frame rendering, bound to one base image
+        self.render_pool = None
+        self._render_pool_base = None
+        self._render_pool_workers = 0
+
+        # Encoded bytes of every output written this cycle, published to the
+        # in-memory frame store (served by the optional HTTP server)
+        self.encoded_outputs = {}
+        self.frame_store = FrameStore()
+
+        # Main loop plus any downscaled loops from the last cycle, for the status file
+        self.loop_outputs = []
+
+        # Client-side compositing outputs: {filename: bytes} referenced by the
+        # last manifest, and the encoded base as (base image, marker, filename, bytes, size)
+        self.layer_files = {}
+        self._layer_base = None
+
+        # Incremental SMB upload (standalone mode), created on first transfer
+        self.smb_sync = None
+
+        # Optional per-product history of echo intensity levels (memory-mapped rings)
+        self.echo_archive = None
+        rainfall_hours = self.config.get('rainfall_hours') or []
+        archive_hours = self.config.get('echo_archive_hours', 0)
+        if rainfall_hours and archive_hours <= max(rainfall_hours):
+            # Frames are subtracted from the rainfall totals by reading them back from the archive
+            archive_hours = max(rainfall_hours) + 1
+            logging.info(f"Keeping {archive_hours} hours of echo history for rainfall totals")
+        if archive_hours > 0:
+            self.echo_archive = EchoArchive(self.config['echo_archive_dir'], archive_hours,
+                                            self.config.get('echo_archive_compression', 'none'))
+
+        # Optional running rainfall totals over sliding windows
+        self.rainfall = RainfallTracker(self.echo_archive, rainfall_hours) if rainfall_hours else None
+        self._rainfall_legend = None
+
+        # Optional daily time-lapse of every newly rendered frame
+        self.timelapse = None
+        if self.config.get('timelapse_enabled', False):
+            self.timelapse = TimelapseWriter(self.config['timelapse_directory'], self.config['timezone'],
+                                             self.config.get('timelapse_max_mb', TIMELAPSE_DISK_BUDGET_MB),
+                                             self.config.get('timelapse_format', 'auto'))
+            logging.info(f"Archiving a daily time-lapse ({self.timelapse.format}) to {self.config['timelapse_directory']}")
+
         # Create output directory if it doesn't exist
         os.makedirs(self.config['output_directory'], exist_ok=True)
 
+        # Per-source circuit breakers (radar products, BoM layers, tile server)
+        self.source_health = SourceHealth()
+
+        # Per-radar refresh state and the worker pool that refreshes them
+        self.radar_sources = {}
+        self.refresh_executor = None
+
+        # Optional cache of upstream fetches shared with other instances on this host
+        self.shared_cache = None
+        if self.config.get('shared_cache_dir'):
+            try:
+                self.shared_cache = SharedCache(self.config['shared_cache_dir'])
+                logging.info(f"Sharing listings, frames and tiles with other instances via {self.config['shared_cache_dir']}")
+            except OSError as e:
+                logging.warning(f"Shared cache disabled: {e}")
+
         # Initialize map tile provider for OSM backgrounds
-        tile_cache_dir = os.path.join(self.config['output_directory'], 'tile_cache')
-        self.tile_provider = MapTileProvider(tile_cache_dir)
+        self.tile_provider = self.create_tile_provider()
+
+        # A bundle dropped into the output directory seeds the tile cache once
+        seed_path = os.path.join(self.config['output_directory'], TILE_SEED_FILENAME)
+        if os.path.exists(seed_path):
+            try:
+                self.tile_provider.import_bundle(seed_path)
+                os.replace(seed_path, f"{seed_path}.imported")
+            except Exception as e:
+                logging.error(f"Failed to import tile bundle {seed_path}: {e}")
+
+        if self.config.get('auto_mosaic', False):
+            self.apply_auto_mosaic()
+
+    def create_tile_provider(self):
+        """Create the OSM tile provider from the tile source/store settings"""
+        # With a shared cache, all instances use one tile store and coordinate downloads
+        cache_root = str(self.shared_cache.directory) if self.shared_cache else self.config['output_directory']
+        tile_cache_dir = os.path.join(cache_root, 'tile_cache')
+        tile_store = None
+        if self.config.get('tile_store', 'directory') == 'mbtiles':
+            tile_store = MBTilesStore(os.path.join(cache_root, 'tile_cache.mbtiles'))
+        disk_budget_mb = self.config.get('tile_cache_max_mb', TILE_DISK_BUDGET_MB)
+        tile_source = open_tile_source(
+            self.config.get('tile_source', OSM_TILE_URL), MapTileProvider.USER_AGENT,
+            self.config.get('tile_rate_limit', TILE_RATE_LIMIT)
+        )
+        return MapTileProvider(
+            tile_cache_dir, self.source_health.get('osm_tiles'), tile_store,
+            memory_budget_bytes=self.config.get('tile_memory_cache_mb', TILE_MEMORY_BUDGET_MB) * 1024 * 1024,
+            disk_budget_bytes=disk_budget_mb * 1024 * 1024 if disk_budget_mb else None,
+            source=tile_source,
+            shared=self.shared_cache,
+        )
+
+    def apply_config(self, new_config):
+        """Switch to a reloaded configuration, invalidating only what it affects
+
+        The config dict is updated in place (the scheduler shares it). Base
+        images and radar frames are cached per product, so a new product or
+        background simply misses the cache; entries for products no longer
+        shown are dropped. Settings bound at startup keep their old values
+        until the next restart.
+
+        Args:
+            new_config: Freshly loaded configuration dict
+
+        Returns:
+            str: 'render' if a new cycle is needed, 'reencode' if only the loop
+                has to be re-encoded from the current frames, or None
+        """
+        old_config = self.loaded_config
+        changed = {key for key in set(old_config) | set(new_config) if old_config.get(key) != new_config.get(key)}
+        if not changed:
+            logging.info("Configuration reloaded, no changes")
+            return None
+
+        restart_keys = changed & RELOAD_RESTART_KEYS
+        if restart_keys:
+            logging.warning(f"Changes to {', '.join(sorted(restart_keys))} take effect after a restart")
+            for key in restart_keys:
+                if key in old_config:
+                    new_config[key] = old_config[key]
+                else:
+                    new_config.pop(key, None)
+            changed -= restart_keys
+            if not changed:
+                return None
+        logging.info(f"Configuration reloaded, changed: {', '.join(sorted(changed))}")
+
+        # Refresh jobs read the config, so none may run while it is swapped
+        self.wait_for_refreshes()
+        self.loaded_config = dict(new_config)
+        self.config.clear()
+        self.config.update(new_config)
+        if self.config.get('auto_mosaic', False):
+            self.apply_auto_mosaic()
+        self.validate_config()
+
+        if 'log_level' in changed:
+            logging.getLogger().setLevel(getattr(logging, self.config['log_level'], logging.INFO))
+        if changed & {'smb_server', 'smb_share', 'smb_username', 'smb_password', 'smb_remote_path'}:
+            self.smb_sync = None
+        if changed & RELOAD_TILE_KEYS:
+            self.tile_provider.close()
+            self.tile_provider = self.create_tile_provider()
+            self.base_image_cache = {
+                key: value for key, value in self.base_image_cache.items() if key[1] != 'openstreetmap'
+            }
+        if 'legend_file' in changed:
+            self._legend_bar = None
+
+        # Forget frames and base images of products that are no longer shown
+        products = {self.config['product_id']}
+        for slot in ('second', 'third'):
+            if self.config.get(f'{slot}_radar_enabled') and self.config.get(f'{slot}_radar_product_id'):
+                products.add(self.config[f'{slot}_radar_product_id'])
+        with self.frame_cache_lock:
+            for name in [name for name in self.frame_cache if name.split('.', 1)[0] not in products]:
+                del self.frame_cache[name]
+        self.base_image_cache = {
+            key: value for key, value in self.base_image_cache.items() if key[0] == self.config['product_id']
+        }
+
+        passive_keys = RELOAD_PASSIVE_KEYS
+        if self.config['background_type'] != 'openstreetmap':
+            passive_keys = passive_keys | RELOAD_TILE_KEYS
+
+        # Render workers hold a copy of the config from when they started
+        if changed - passive_keys or 'render_workers' in changed:
+            self.shutdown_render_pool()
+
+        loop_keys = RELOAD_LOOP_KEYS
+        if self.roi_centred_on_residence():
+            # The residence also positions the ROI window, so moving it needs a new render
+            loop_keys = loop_keys - {'residential_lat', 'residential_lon'}
+
+        if changed - loop_keys - passive_keys:
+            return 'render'
+        if changed & loop_keys:
+            return 'reencode'
+        return None
+
+    def apply_auto_mosaic(self):
+        """Fill unused second/third radar slots with the most overlapping stations
+
+        Candidates come from the spatial index in radar_metadata: other
+        stations with the same range whose canvas covers at least
+        'auto_mosaic_min_overlap' of the primary canvas, largest overlap first.
+        Slots the user has enabled explicitly are left untouched.
+        """
+        pid = self.config.get('product_id', '')
+        taken = {station_of(pid)}
+        for slot in ('second', 'third'):
+            if self.config.get(f'{slot}_radar_enabled') and self.config.get(f'{slot}_radar_product_id'):
+                taken.add(station_of(self.config[f'{slot}_radar_product_id']))
+
+        candidates = [
+            (candidate, fraction)
+            for candidate, fraction in overlapping_products(pid, self.config.get('auto_mosaic_min_overlap', 0.1))
+            if station_of(candidate) not in taken
+        ]
+        for slot in ('second', 'third'):
+            if self.config.get(f'{slot}_radar_enabled') or not candidates:
+                continue
+            candidate, fraction = candidates.pop(0)
+            self.config[f'{slot}_radar_enabled'] = True
+            self.config[f'{slot}_radar_product_id'] = candidate
+            logging.info(f"Auto mosaic: {slot} radar set to {candidate} "
+                         f"(covers {fraction:.0%} of the {pid} canvas)")
+
+        if not self.config.get('second_radar_enabled') and not self.config.get('third_radar_enabled'):
+            logging.info(f"Auto mosaic: no other stations overlap {pid} enough to add")
     
     def validate_config(self):
         """Validate configuration values and warn about potential issues.
@@ -462,6 +1556,11 @@ class RadarProcessor:
                         f"primary radar '{pid}'. Secondary and tertiary radars must be "
                         f"different stations from the primary."
                     )
+                if pid in RADAR_METADATA and sid in RADAR_METADATA and overlap_fraction(pid, sid) == 0:
+                    issues.append(
+                        f"{label} radar '{sid}' does not overlap the primary radar '{pid}' "
+                        f"image and would never be visible."
+                    )
                 enabled_secondaries.append((label, sid, sid_prefix))
 
         if len(enabled_secondaries) == 2:
@@ -486,6 +1585,28 @@ class RadarProcessor:
                 if not (-180.0 <= float(lon) <= 180.0):
                     issues.append(f"residential_longitude {lon} is out of valid range [-180, 180]")
 
+                # Suggest better products when the house is outside the primary image
+                covering = nearest_products(float(lat), float(lon), primary_range, k=None)
+                if pid in RADAR_METADATA and pid not in [product for product, _ in covering]:
+                    suggestions = ', '.join(f"{product} ({distance:.0f} km)" for product, distance in covering[:3])
+                    logging.warning(
+                        f"Residential location ({lat}, {lon}) is outside the {pid} radar image. "
+                        f"Nearest covering products: {suggestions or 'none at this range'}"
+                    )
+
+        # Validate the region of interest
+        if self.config.get('roi_enabled'):
+            centre_set = self.config.get('roi_lat') not in (None, '') and self.config.get('roi_lon') not in (None, '')
+            residence_set = self.config.get('residential_lat') is not None and self.config.get('residential_lon') is not None
+            if float(self.config.get('roi_radius_km', DEFAULT_ROI_RADIUS_KM)) <= 0:
+                issues.append(f"roi_radius_km must be positive, got {self.config.get('roi_radius_km')}")
+            elif not centre_set and not residence_set:
+                issues.append("Region of interest is enabled but neither roi_latitude/roi_longitude "
+                              "nor the residential location is set")
+            elif self.region_of_interest() is None:
+                issues.append(f"Region of interest centre is outside the {pid} radar image, "
+                              f"showing the whole image")
+
         # Validate timezone
         tz_str = self.config.get('timezone', '')
         try:
@@ -544,6 +1665,29 @@ class RadarProcessor:
             logging.error(f"Error loading house icon: {e}")
             return None
 
+    def connect_ftp(self, directory):
+        """Open an anonymous connection to the BOM FTP server
+
+        The host and port default to the public BOM server and can be
+        overridden with the 'ftp_host' / 'ftp_port' config keys (used by the
+        offline benchmark suite to point at a local stand-in).
+
+        Args:
+            directory: Remote directory to change into after login
+
+        Returns:
+            ftplib.FTP: Logged-in connection
+        """
+        ftp = ftplib.FTP(timeout=30)
+        ftp.connect(self.config.get('ftp_host', BOM_FTP_HOST), self.config.get('ftp_port', BOM_FTP_PORT))
+        ftp.login()
+        ftp.cwd(directory)
+        return ftp
+
+    def record_stage(self, name, start):
+        """Add the time elapsed since `start` (perf_counter) to a pipeline stage"""
+        self.stage_timings[name] = self.stage_timings.get(name, 0.0) + time.perf_counter() - start
+
     def get_optimal_zoom(self, product_id):
         """
         Calculate optimal zoom level for OSM tiles based on radar range
@@ -625,6 +1769,130 @@ class RadarProcessor:
             # Use BoM background with layers
             return self.create_bom_base_image(product_id)
 
+    def get_base_image(self, product_id):
+        """Return the base image for a product, rebuilding it only when stale
+
+        Base images only change when the product, background type or layers
+        change, so they are cached for BASE_IMAGE_MAX_AGE_SECONDS. Images built
+        while a layer or tile download failed are used but not cached.
+
+        Args:
+            product_id: BOM product ID
+
+        Returns:
+            PIL Image object (512x512 RGBA)
+        """
+        roi = self.region_of_interest()
+        key = (product_id, self.config['background_type'], tuple(self.config['layers']), roi.box if roi else None)
+        cached = self.base_image_cache.get(key)
+        if cached is not None and time.time() - cached[0] < BASE_IMAGE_MAX_AGE_SECONDS:
+            logging.info(f"Using cached base image for {product_id} ({(time.time() - cached[0]) / 60:.0f} minutes old)")
+            return cached[1]
+
+        self.base_layer_errors = 0
+        tile_failures = self.tile_provider.download_failures
+        if roi is not None:
+            base_image = self.create_roi_base_image(product_id, roi)
+        else:
+            base_image = self.create_base_image(product_id)
+
+        if base_image is not None and not self.base_layer_errors and \
+                self.tile_provider.download_failures == tile_failures:
+            self.base_image_cache[key] = (time.time(), base_image)
+        elif cached is not None:
+            # Keep serving the last complete base image rather than a degraded one
+            logging.warning(f"Base image for {product_id} is incomplete, reusing the previous one")
+            return cached[1]
+        return base_image
+
+    def roi_centred_on_residence(self):
+        """Whether ROI mode is on and its window follows the residential location"""
+        return bool(self.config.get('roi_enabled')) and (
+            self.config.get('roi_lat') in (None, '') or self.config.get('roi_lon') in (None, '')
+        )
+
+    def region_of_interest(self):
+        """Window of the primary radar image shown in ROI mode, or None to show the whole image
+
+        The window is centred on roi_lat/roi_lon, or the residential location
+        if those are not set. A centre outside the primary radar image
+        disables the window (validate_config() reports it).
+        """
+        if not self.config.get('roi_enabled'):
+            return None
+        lat, lon = self.config.get('roi_lat'), self.config.get('roi_lon')
+        if self.roi_centred_on_residence():
+            lat, lon = self.config.get('residential_lat'), self.config.get('residential_lon')
+        if lat is None or lon is None:
+            return None
+
+        radar_lat, radar_lon, km_per_pixel = self.get_radar_metadata(self.config['product_id'])
+        centre = self.latlon_to_pixel(float(lat), float(lon), radar_lat, radar_lon, km_per_pixel,
+                                      (RADAR_IMAGE_SIZE, RADAR_IMAGE_SIZE))
+        if not (0 <= centre[0] < RADAR_IMAGE_SIZE and 0 <= centre[1] < RADAR_IMAGE_SIZE):
+            return None
+        radius_km = float(self.config.get('roi_radius_km', DEFAULT_ROI_RADIUS_KM))
+        half_width = max(MIN_ROI_HALF_WIDTH_PX, round(radius_km / km_per_pixel))
+        return RegionOfInterest(centre, half_width, (radar_lat, radar_lon), km_per_pixel,
+                                int(self.config.get('roi_output_size', RADAR_IMAGE_SIZE)))
+
+    def create_roi_base_image(self, product_id, roi):
+        """Create the base image of a region of interest at its output size
+
+        OpenStreetMap backgrounds are fetched for just the window, at the zoom
+        level that gives at least the output resolution. BoM layers only exist
+        for the whole radar image, so they are cropped and enlarged.
+
+        Args:
+            product_id: BOM product ID
+            roi: RegionOfInterest
+
+        Returns:
+            PIL Image object (output size square, RGBA)
+        """
+        if self.config['background_type'] == 'openstreetmap' and product_id in RADAR_METADATA:
+            lat, lon = roi.centre_latlon()
+            # Metres per pixel at zoom 0 on this latitude; each zoom level halves it
+            zoom_0_metres = 156543.03392 * math.cos(math.radians(lat))
+            width_metres = roi.width_km * 1000
+            zoom = math.ceil(math.log2(roi.output_size * zoom_0_metres / width_metres))
+            zoom = max(0, min(OSM_MAX_ZOOM, zoom))
+            size = max(1, round(width_metres / (zoom_0_metres / 2 ** zoom)))
+            logging.info(f"Creating OpenStreetMap background for the {roi.width_km:.0f} km region of interest "
+                         f"at zoom {zoom}")
+            try:
+                background = self.tile_provider.create_background(lat, lon, zoom, size=size)
+                return background.resize((roi.output_size, roi.output_size), Image.Resampling.LANCZOS)
+            except Exception as e:
+                logging.error(f"Failed to create OSM background for the region of interest: {e}")
+                logging.info("Falling back to BoM background")
+
+        return roi.crop(self.create_bom_base_image(product_id), resample=Image.Resampling.LANCZOS)
+
+    def crop_radar_layers(self, roi, radar_layers):
+        """Crop every radar frame to the region of interest and enlarge it to the output size
+
+        Frames are replaced in their dicts; radars that miss the window are
+        dropped (and their frames released).
+
+        Args:
+            roi: RegionOfInterest
+            radar_layers: As for render_frames()
+
+        Returns:
+            List of (label, {timestamp: image}, (0, 0)) in output coordinates
+        """
+        cropped = []
+        for label, images, offset in radar_layers:
+            if not roi.overlaps(offset):
+                logging.debug(f"{label.capitalize()} radar does not reach the region of interest")
+                images.clear()
+                continue
+            for timestamp, image in images.items():
+                images[timestamp] = roi.crop(image, offset)
+            cropped.append((label, images, (0, 0)))
+        return cropped
+
     def create_bom_base_image(self, product_id):
         """
         Create base image using BoM layers (original behavior)
@@ -640,11 +1908,15 @@ class RadarProcessor:
         # Start with blank radar-sized image
         base_image = Image.new('RGBA', (RADAR_IMAGE_SIZE, RADAR_IMAGE_SIZE), (255, 255, 255, 0))
 
+        breaker = self.source_health.get('bom_layers')
+        if not breaker.allow_request():
+            logging.warning(f"BoM layer server unavailable, next probe in {breaker.retry_in():.0f}s")
+            self.base_layer_errors += 1
+            return base_image
+
         # Connect to FTP and build composite layers
         try:
-            ftp = ftplib.FTP('ftp.bom.gov.au', timeout=30)
-            ftp.login()
-            ftp.cwd('anon/gen/radar_transparencies/')
+            ftp = self.connect_ftp('/anon/gen/radar_transparencies/')
 
             for layer in self.config['layers']:
                 filename = f"{product_id}.{layer}.png"
@@ -658,10 +1930,13 @@ class RadarProcessor:
                 logging.debug(f"Added layer: {layer}")
 
             ftp.quit()
+            breaker.record_success()
             logging.info(f"BoM base image with all layers created: {base_image.size}")
 
         except Exception as e:
             logging.error(f"Error creating BoM base image: {e}")
+            self.base_layer_errors += 1
+            breaker.record_failure(e)
 
         return base_image
 
@@ -747,6 +2022,9 @@ class RadarProcessor:
         pixel_x, pixel_y = self.latlon_to_pixel(
             lat, lon, radar_lat, radar_lon, km_per_pixel, frame.size
         )
+        roi = self.region_of_interest()
+        if roi is not None:
+            pixel_x, pixel_y = roi.to_output(pixel_x, pixel_y)
 
         # Check if coordinates are within image bounds
         icon_size = house_icon.size[0]
@@ -815,17 +2093,18 @@ class RadarProcessor:
         Returns:
             PIL Image with legend bar added at bottom (512x520)
         """
-        # Load legend
-        legend = self.load_legend()
-        if legend is None:
-            logging.warning("Could not load legend, returning image without legend")
-            return image
-
-        legend_width, legend_height = legend.size  # Should be 492x8
         img_width, img_height = image.size  # Should be 512x512
 
-        # Stretch legend to match image width
-        legend_stretched = legend.resize((img_width, legend_height), Image.Resampling.LANCZOS)
+        # Load and stretch the legend once; every frame shares the same bar
+        if self._legend_bar is None or self._legend_bar.width != img_width:
+            legend = self.load_legend()
+            if legend is None:
+                logging.warning("Could not load legend, returning image without legend")
+                return image
+            # Stretch legend (normally 492x8) to match image width
+            self._legend_bar = legend.resize((img_width, legend.height), Image.Resampling.LANCZOS)
+        legend_stretched = self._legend_bar
+        legend_height = legend_stretched.height
 
         # Create new image with extra height for legend
         new_height = img_height + legend_height
@@ -841,6 +2120,77 @@ class RadarProcessor:
         logging.debug(f"Added legend bar at bottom: final size {extended.size}")
         return extended
 
+    def render_rainfall(self, base_image, layers, house_icon, timestamp):
+        """Update the rainfall totals and write rainfall_<N>h.png for each window
+
+        Args:
+            base_image: Background image (512x512 RGBA)
+            layers: List of (product_id, (offset_x, offset_y)) for every radar
+            house_icon: House icon image, or None to skip the marker
+            timestamp: YYYYMMDDHHmm shown on the images
+
+        Returns:
+            Dict of {hours: total in mm at the residential location, or None}
+        """
+        self.rainfall.update([product_id for product_id, _ in layers])
+
+        pixel = None
+        lat, lon = self.config['residential_lat'], self.config['residential_lon']
+        if self.config['residential_enabled'] and lat is not None and lon is not None:
+            radar_lat, radar_lon, km_per_pixel = self.get_radar_metadata(self.config['product_id'])
+            pixel = self.latlon_to_pixel(lat, lon, radar_lat, radar_lon, km_per_pixel, base_image.size)
+
+        if self._rainfall_legend is None or self._rainfall_legend.width != base_image.width:
+            self._rainfall_legend = rainfall_legend(base_image.width)
+        legend = self._rainfall_legend
+
+        roi = self.region_of_interest()
+        totals = {}
+        for hours in self.rainfall.windows:
+            # Totals cover the whole primary radar image; only the drawing is cropped
+            total = self.rainfall.mosaic(hours, layers, (RADAR_IMAGE_SIZE, RADAR_IMAGE_SIZE))
+            overlay = colourise(total)
+            if roi is not None:
+                overlay = roi.crop(overlay)
+            image = Image.new('RGBA', (base_image.width, base_image.height + legend.height), (255, 255, 255, 255))
+            image.paste(base_image, (0, 0), base_image)
+            image.paste(overlay, (0, 0), overlay)
+            image.paste(legend, (0, base_image.height))
+            image = self.add_timestamp_overlay(image, timestamp)
+            if house_icon is not None:
+                image = self.add_house_marker(image, house_icon)
+
+            filename = f"rainfall_{hours}h.png"
+            self.write_output(filename, self.encode_image(image, 'PNG'))
+            self.saved_filenames.append(filename)
+
+            totals[hours] = None
+            if pixel is not None and 0 <= pixel[0] < total.width and 0 <= pixel[1] < total.height:
+                totals[hours] = round(total.getpixel(pixel) / 1000, 1)
+        logging.info("Rainfall totals at residence: " + ", ".join(
+            f"{hours}h={'n/a' if mm is None else f'{mm}mm'}" for hours, mm in totals.items()
+        ))
+        return totals
+
+    def get_overlay_font(self):
+        """Load the timestamp overlay font once and reuse it for every frame"""
+        if self._overlay_font is None:
+            # Try to use a nice font, fall back to default if not available
+            try:
+                self._overlay_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
+            except OSError:
+                try:
+                    self._overlay_font = ImageFont.truetype("arial.ttf", 20)
+                except OSError:
+                    self._overlay_font = ImageFont.load_default()
+        return self._overlay_font
+
+    def local_time_label(self, timestamp_str):
+        """Format a YYYYMMDDHHmm (UTC) timestamp as local time, e.g. '2:35 pm'"""
+        dt_utc = pytz.utc.localize(datetime.strptime(timestamp_str, "%Y%m%d%H%M"))
+        dt_local = dt_utc.astimezone(pytz.timezone(self.config['timezone']))
+        return dt_local.strftime('%I:%M %p').lstrip('0').lower()
+
     def add_timestamp_overlay(self, image, timestamp_str):
         """Add timestamp overlay in top-left corner with semi-transparent background
 
@@ -855,22 +2205,9 @@ class RadarProcessor:
         draw = ImageDraw.Draw(img)
 
         try:
-            # Parse timestamp (UTC) and convert to local timezone
-            dt_utc = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
-            dt_utc = pytz.utc.localize(dt_utc)
-            local_tz = pytz.timezone(self.config['timezone'])
-            dt_local = dt_utc.astimezone(local_tz)
-
-            time_str = dt_local.strftime('%I:%M %p').lstrip('0').lower()
+            time_str = self.local_time_label(timestamp_str)
 
-            # Try to use a nice font, fall back to default if not available
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-            except:
-                try:
-                    font = ImageFont.truetype("arial.ttf", 20)
-                except:
-                    font = ImageFont.load_default()
+            font = self.get_overlay_font()
 
             # Position in top-left with some padding
             text_x = 10
@@ -947,12 +2284,49 @@ class RadarProcessor:
 
         return (offset_x, offset_y)
 
-    def download_radar_frames(self, ftp, ftp_files, product_id, label, images_out):
+    def list_radar_files(self, connection):
+        """Directory listing of /anon/gen/radar/, shared with other instances when configured
+
+        Args:
+            connection: Callable returning the FTP connection (opened on first use)
+        """
+        if self.shared_cache is None:
+            return connection().nlst()
+
+        def fetch_listing():
+            files = connection().nlst()
+            # Whoever fetches the listing also drops frames that have left every loop
+            self.shared_cache.prune('frames', SHARED_FRAME_MAX_AGE_SECONDS)
+            return '\n'.join(files).encode()
+
+        data = self.shared_cache.fetch('listings/radar', fetch_listing, SHARED_LISTING_MAX_AGE_SECONDS)
+        return data.decode().splitlines()
+
+    def retrieve_radar_file(self, connection, filename):
+        """Download one file from /anon/gen/radar/, via the shared cache when configured
+
+        Returns:
+            io.BytesIO: File contents, positioned at the start
+        """
+        if self.shared_cache is None:
+            buffer = io.BytesIO()
+            connection().retrbinary('RETR ' + filename, buffer.write)
+        else:
+            def download():
+                received = io.BytesIO()
+                connection().retrbinary('RETR ' + filename, received.write)
+                return received.getvalue()
+            buffer = io.BytesIO(self.shared_cache.fetch(f"frames/{filename}", download))
+        buffer.seek(0)
+        return buffer
+
+    def download_radar_frames(self, connection, ftp_files, product_id, label, images_out):
         """Download the most recent radar frames for a single radar product.
 
         Args:
-            ftp: Active ftplib.FTP connection, already cwd'd to /anon/gen/radar/
-            ftp_files: Pre-fetched directory listing from ftp.nlst()
+            connection: Callable returning an ftplib.FTP connection cwd'd to
+                /anon/gen/radar/, opened on first use
+            ftp_files: Pre-fetched directory listing from list_radar_files()
             product_id: BOM product ID string (e.g. 'IDR022')
             label: Human-readable label for log messages ('primary', 'second', 'third')
             images_out: Dict to populate with {timestamp: PIL.Image} entries
@@ -960,6 +2334,12 @@ class RadarProcessor:
         Returns:
             bool: True if any frames were downloaded, False if radar offline
         """
+        breaker = self.source_health.get(f"radar:{product_id}")
+        if not breaker.allow_request():
+            logging.warning(f"{label.capitalize()} radar ({product_id}) skipped after repeated failures, "
+                            f"next probe in {breaker.retry_in():.0f}s")
+            return False
+
         all_files = [f for f in ftp_files
                      if f.startswith(product_id) and f.endswith('.png')]
         sorted_files = sorted(all_files, key=self.get_timestamp)
@@ -968,25 +2348,842 @@ class RadarProcessor:
         logging.info(f"Found {len(all_files)} total radar files for {label} radar ({product_id})")
         if not files:
             logging.warning(f"{label.capitalize()} radar is offline - no files available")
+            breaker.record_failure('no files available')
             return False
 
         logging.info(f"Selected most recent {len(files)}: {[f.split('.')[2] for f in files]}")
+
+        # Forget cached frames for this product that have left the loop window
+        with self.frame_cache_lock:
+            for name in [n for n in self.frame_cache if n.startswith(f"{product_id}.") and n not in files]:
+                del self.frame_cache[name]
+            cached_frames = {file: self.frame_cache.get(file) for file in files}
+
+        to_fetch = []
         for file in files:
-            timestamp = self.get_timestamp(file)
-            file_obj = io.BytesIO()
-            try:
-                ftp.retrbinary('RETR ' + file, file_obj.write)
-                file_obj.seek(0)
-                image = Image.open(file_obj).convert('RGBA')
-                image = self.remove_copyright(image)
-                image = self.make_timestamp_transparent(image)
-                images_out[timestamp] = image
-                logging.debug(f"Successfully processed {label} radar {file}")
-            except ftplib.all_errors as e:
-                logging.error(f"Error downloading {label} radar {file}: {e}")
+            # Frames already downloaded and cleaned in an earlier cycle
+            cached = cached_frames[file]
+            if cached is not None:
+                images_out[self.get_timestamp(file)] = Image.open(io.BytesIO(cached)).convert('RGBA')
+                logging.debug(f"Loaded {label} radar {file} from frame cache")
+            else:
+                to_fetch.append(file)
+
+        # Overlap transfer and decoding: this thread keeps RETRs flowing while
+        # a decoder thread cleans each received buffer (Pillow releases the
+        # GIL while decoding and encoding). The bounded queue caps how many
+        # raw frames are held in memory at once.
+        decoded = []
+        pending = queue.Queue(maxsize=DOWNLOAD_QUEUE_DEPTH)
+
+        def decode_frames():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                file, buffer = item
+                try:
+                    image = self.decode_radar_frame(buffer)
+                    encoded = self.encode_image(image, 'PNG', compress_level=1)
+                    with self.frame_cache_lock:
+                        self.frame_cache[file] = encoded
+                    images_out[self.get_timestamp(file)] = image
+                    decoded.append(file)
+                    logging.debug(f"Successfully processed {label} radar {file}")
+                    if self.echo_archive is not None:
+                        try:
+                            self.echo_archive.append(product_id, self.get_timestamp(file), image)
+                        except Exception as e:
+                            logging.warning(f"Could not archive echo levels for {file}: {e}")
+                except Exception as e:
+                    # Keep consuming so the transfer side never blocks on a full queue
+                    logging.error(f"Error decoding {label} radar {file}: {e}")
+
+        decoder = None
+        if to_fetch:
+            decoder = threading.Thread(target=CycleProfiler.profiled, args=(decode_frames,), name=f"decode-{product_id}", daemon=True)
+            decoder.start()
+        try:
+            for file in to_fetch:
+                try:
+                    # Decoded straight from the receive buffer, no copy
+                    buffer = self.retrieve_radar_file(connection, file)
+                except ftplib.error_perm as e:
+                    # File rotated out between NLST and RETR - not a source failure
+                    logging.error(f"Error downloading {label} radar {file}: {e}")
+                    continue
+                except ftplib.all_errors as e:
+                    # Timeouts and connection errors: stop paying for the remaining frames
+                    logging.error(f"Error downloading {label} radar {file}: {e}")
+                    breaker.record_failure(e)
+                    break
+                pending.put((file, buffer))
+        finally:
+            if decoder is not None:
+                pending.put(None)
+                decoder.join()
+        downloaded = len(decoded)
+
+        logging.info(f"Downloaded {downloaded} new {label} radar frame(s), {len(images_out) - downloaded} from cache")
+        if images_out and breaker.state != 'open':
+            breaker.record_success()
 
         return len(images_out) > 0
 
+    def refresh_radar_source(self, source):
+        """Background job: fetch the latest frames for one radar
+
+        Runs on the refresh pool with its own FTP connection so that a slow
+        or failing radar cannot hold up the others.
+
+        Returns:
+            dict: {timestamp: PIL.Image} of the frames fetched (empty on failure)
+        """
+        images = {}
+        breaker = self.source_health.get(f"radar:{source.product_id}")
+        ftp = None
+
+        def connection():
+            # Connect on first use: with a shared cache another instance may already have fetched everything
+            nonlocal ftp
+            if ftp is None:
+                ftp = self.connect_ftp('/anon/gen/radar/')
+            return ftp
+
+        try:
+            try:
+                files = self.list_radar_files(connection)
+                if self.download_radar_frames(connection, files, source.product_id, source.label, images):
+                    source.last_refresh = time.time()
+                    source.schedule_after(images.keys())
+            finally:
+                if ftp is not None:
+                    try:
+                        ftp.quit()
+                    except ftplib.all_errors:
+                        ftp.close()
+        except ftplib.all_errors as e:
+            logging.error(f"FTP error refreshing {source.label} radar ({source.product_id}): {e}")
+            breaker.record_failure(e)
+        return images
+
+    def refresh_radar_sources(self, sources):
+        """Start refresh jobs for the due radars and collect what is ready
+
+        The primary radar is always waited for; secondaries get a further
+        SECONDARY_REFRESH_WAIT_SECONDS. Radars that are not yet due (no new
+        scan expected) or whose breaker is open are not contacted.
+
+        Args:
+            sources: List of RadarSource objects, primary first
+
+        Returns:
+            dict: {label: {timestamp: PIL.Image}} for refreshes completed
+                since the last cycle; labels missing from the dict are
+                rendered from the frame cache
+        """
+        if self.refresh_executor is None:
+            self.refresh_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='radar-refresh')
+
+        now = time.time()
+        for source in sources:
+            if source.future is not None:
+                logging.info(f"{source.label.capitalize()} radar ({source.product_id}) refresh still in progress")
+                continue
+            if now < source.next_refresh:
+                logging.info(f"{source.label.capitalize()} radar ({source.product_id}) is up to date, "
+                             f"next scan expected in {source.next_refresh - now:.0f}s")
+                continue
+            # The probe itself is taken by download_radar_frames() in the job
+            if not self.source_health.get(f"radar:{source.product_id}").available():
+                continue
+            source.future = self.refresh_executor.submit(CycleProfiler.profiled, self.refresh_radar_source, source)
+
+        primary = sources[0]
+        if primary.future is not None:
+            wait_futures([primary.future])
+        pending = [s.future for s in sources[1:] if s.future is not None]
+        if pending:
+            wait_futures(pending, timeout=SECONDARY_REFRESH_WAIT_SECONDS)
+
+        results = {}
+        for source in sources:
+            if source.future is None:
+                # Not due or breaker open: keep the staleness from the last attempt
+                continue
+            if not source.future.done():
+                logging.warning(f"{source.label.capitalize()} radar ({source.product_id}) is slow, "
+                                f"rendering its cached frames")
+                source.stale = True
+                continue
+            images = source.future.result()
+            source.future = None
+            source.stale = not images
+            results[source.label] = images
+        return results
+
+    def wait_for_refreshes(self):
+        """Cancel queued radar refresh jobs and wait for the running ones
+
+        Jobs that finish keep their results, which the next cycle collects
+        as usual (or drops, if the slot now shows another product).
+        """
+        for source in self.radar_sources.values():
+            if source.future is not None and source.future.cancel():
+                source.future = None
+        running = [source.future for source in self.radar_sources.values() if source.future is not None]
+        if running:
+            logging.info(f"Waiting for {len(running)} radar refresh job(s) to finish")
+            wait_futures(running)
+
+    def load_cached_frames(self, product_id):
+        """Decode the last good frames for a product from the frame cache
+
+        Returns:
+            dict: {timestamp: PIL.Image}
+        """
+        with self.frame_cache_lock:
+            cached = sorted((name, data) for name, data in self.frame_cache.items()
+                            if name.startswith(f"{product_id}."))
+        return {
+            self.get_timestamp(name): Image.open(io.BytesIO(data)).convert('RGBA')
+            for name, data in cached[-FRAME_COUNT:]
+        }
+
+    def get_radar_source(self, label, product_id):
+        """Return the refresh state for a radar slot, resetting it if the product changed"""
+        source = self.radar_sources.get(label)
+        if source is None or source.product_id != product_id:
+            source = RadarSource(product_id, label)
+            self.radar_sources[label] = source
+        return source
+
+    @classmethod
+    def for_rendering(cls, config):
+        """Create a processor that only renders frames (used by render pool workers)
+
+        Skips all I/O set-up in __init__: no output directory, tile provider,
+        caches or frame store.
+        """
+        processor = cls.__new__(cls)
+        processor.config = config
+        processor.stage_timings = {}
+        processor._overlay_font = None
+        processor._legend_bar = None
+        return processor
+
+    def render_worker_count(self, frame_count):
+        """Number of render processes to use for a loop of `frame_count` frames
+
+        Returns 0 for in-process rendering: when render_workers is 1, or when
+        it is 0 (one per CPU) on a single-core host.
+        """
+        workers = self.config.get('render_workers', 1)
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, MAX_RENDER_WORKERS, frame_count)
+        return workers if workers > 1 else 0
+
+    def get_render_pool(self, base_image, house_icon, workers):
+        """Return a process pool primed with this base image and house icon
+
+        The base image, legend and house icon are sent to each worker once
+        through the pool initializer; tasks only carry the radar frames.
+        The pool is kept across cycles while the base image is unchanged.
+        """
+        if self.render_pool is not None and self._render_pool_base is base_image \
+                and self._render_pool_workers == workers:
+            return self.render_pool
+
+        self.shutdown_render_pool()
+        base_png = self.encode_image(base_image, 'PNG', compress_level=1)
+        house_png = self.encode_image(house_icon, 'PNG') if house_icon is not None else None
+        # Spawn rather than fork: the parent runs an event loop and worker threads
+        self.render_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_render_worker,
+            initargs=(self.config, base_png, house_png),
+        )
+        self._render_pool_base = base_image
+        self._render_pool_workers = workers
+        logging.info(f"Started {workers} render worker processes")
+        return self.render_pool
+
+    def shutdown_render_pool(self):
+        """Stop the render worker processes, if running"""
+        if self.render_pool is not None:
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+            self.render_pool = None
+            self._render_pool_base = None
+            self._render_pool_workers = 0
+
+    def stream_pooled_outputs(self, pool, timestamps, radar_layers):
+        """Render frames on the process pool, save them and yield GIF frames
+
+        Equivalent to stream_frame_outputs(render_frames(...)): each job
+        composites, overlays and PNG-encodes one timestamp, then applies the
+        house marker; palette conversion is left to the GIF encoder here.
+        Results are consumed in timestamp order.
+
+        Args:
+            pool: ProcessPoolExecutor from get_render_pool()
+            timestamps: Sorted list of YYYYMMDDHHmm timestamps to render
+            radar_layers: As for render_frames()
+
+        Yields:
+            PIL Image for the animated loop
+        """
+        jobs = []
+        for timestamp in timestamps:
+            layers = []
+            for label, images, offset in radar_layers:
+                image = images.pop(timestamp, None)
+                if image is not None:
+                    # Pickled as raw pixels: cheaper than a PNG round trip
+                    layers.append((label, image, offset))
+            jobs.append(pool.submit(_render_frame_job, timestamp, layers))
+
+        for index, (timestamp, job) in enumerate(zip(timestamps, jobs), start=1):
+            stage_start = time.perf_counter()
+            png_data, gif_frame = job.result()
+            self.record_stage('composite', stage_start)
+
+            stage_start = time.perf_counter()
+            filename = f"image_{index}.png"
+            filepath = self.write_output(filename, png_data)
+            self.saved_filenames.append(filename)
+            self.timestamps.append(timestamp)
+            self.frame_count = index
+            logging.debug(f"Saved {filepath}")
+            self.record_stage('save_frames', stage_start)
+            yield gif_frame
+
+    def decode_radar_frame(self, buffer):
+        """Decode a downloaded radar PNG and strip its copyright and timestamp text
+
+        Args:
+            buffer: File-like object positioned at the start of the PNG
+
+        Returns:
+            PIL Image in RGBA mode
+        """
+        image = Image.open(buffer).convert('RGBA')
+        image = self.remove_copyright(image)
+        return self.make_timestamp_transparent(image)
+
+    def render_frames(self, base_image, timestamps, radar_layers):
+        """Composite one frame per timestamp, yielding each as soon as it is built
+
+        Source images are popped from the per-radar dicts as they are
+        composited so they can be freed as the loop progresses.
+
+        Args:
+            base_image: Background image (512x512 RGBA)
+            timestamps: Sorted list of YYYYMMDDHHmm timestamps to render
+            radar_layers: List of (label, {timestamp: image}, (offset_x, offset_y))
+                tuples ordered bottom to top
+
+        Yields:
+            tuple: (timestamp, frame) with legend bar and timestamp overlay applied
+        """
+        for timestamp in timestamps:
+            stage_start = time.perf_counter()
+            logging.debug(f"Creating frame for timestamp {timestamp}")
+
+            # Start with base image (maintains original size)
+            frame = base_image.copy()
+
+            for label, images, (offset_x, offset_y) in radar_layers:
+                image = images.pop(timestamp, None)
+                if image is None:
+                    continue
+
+                # Check if this radar overlaps with the primary radar canvas
+                overlaps = (
+                    offset_x < RADAR_IMAGE_SIZE and (offset_x + RADAR_IMAGE_SIZE) > 0 and
+                    offset_y < RADAR_IMAGE_SIZE and (offset_y + RADAR_IMAGE_SIZE) > 0
+                )
+                if overlaps:
+                    # PIL will automatically clip if it extends beyond canvas
+                    frame.paste(image, (offset_x, offset_y), image)
+                    logging.debug(f"Pasted {label} radar at ({offset_x}, {offset_y}) for timestamp {timestamp}")
+                else:
+                    logging.warning(f"{label.capitalize()} radar at offset ({offset_x}, {offset_y}) does not overlap with primary radar - skipping")
+
+            # Add legend bar at bottom (all frames get the legend)
+            frame = self.add_legend_bar(frame)
+
+            # Add timestamp overlay (all frames get timestamps)
+            frame = self.add_timestamp_overlay(frame, timestamp)
+
+            self.record_stage('composite', stage_start)
+            logging.debug(f"Successfully created frame for timestamp {timestamp}")
+            yield timestamp, frame
+
+    def stream_frame_outputs(self, frames, house_icon):
+        """Save each rendered frame as image_N.png, then yield it for the loop encoder
+
+        The house marker is drawn onto the frame in place after the PNG has
+        been written, so PNG frames stay clean without keeping a second copy.
+
+        Args:
+            frames: Iterable of (timestamp, frame) from render_frames()
+            house_icon: House icon image, or None to skip the marker
+
+        Yields:
+            PIL Image for the animated loop
+        """
+        for index, (timestamp, frame) in enumerate(frames, start=1):
+            stage_start = time.perf_counter()
+            filename = f"image_{index}.png"
+            filepath = self.write_output(filename, self.encode_image(frame, 'PNG'))
+            self.saved_filenames.append(filename)
+            self.timestamps.append(timestamp)
+            self.frame_count = index
+            logging.debug(f"Saved {filepath}")
+
+            if house_icon is not None:
+                frame = self.add_house_marker(frame, house_icon)
+            self.record_stage('save_frames', stage_start)
+            yield frame
+
+    @staticmethod
+    def reduce_frame(frame, width):
+        """Downscale a full-size frame to `width` pixels wide, keeping its aspect ratio
+
+        Image.reduce() averages whole blocks of pixels in a single pass; a
+        small bilinear resize finishes widths that are not an exact divisor.
+        """
+        if frame.mode not in ('RGB', 'RGBA'):
+            # Pool workers hand back palette frames ready for the GIF encoder
+            frame = frame.convert('RGBA')
+        factor = max(1, frame.width // width)
+        small = frame.reduce(factor) if factor > 1 else frame
+        if small.width != width:
+            small = small.resize((width, max(1, round(small.height * width / small.width))),
+                                 Image.Resampling.BILINEAR)
+        return small
+
+    def loop_output_sizes(self, frame_width):
+        """Configured extra loop widths smaller than the full-size frames"""
+        sizes = []
+        for width in self.config.get('output_sizes') or []:
+            if 0 < width < frame_width:
+                sizes.append(width)
+            else:
+                logging.warning(f"Ignoring output size {width}: must be smaller than the {frame_width}px loop")
+        return sizes
+
+    def collect_reduced_frames(self, frames, reduced):
+        """Pass loop frames through to the encoder, keeping a downscaled copy for each extra size
+
+        Args:
+            frames: Iterable of full-size loop frames
+            reduced: Dict of {width: list}; the list for each width is filled in
+        """
+        for frame in frames:
+            stage_start = time.perf_counter()
+            for width, collected in reduced.items():
+                collected.append(self.reduce_frame(frame, width))
+            self.record_stage('reduce_frames', stage_start)
+            yield frame
+
+    def write_reduced_loops(self, reduced, durations):
+        """Encode and write one extra loop per size, named like radar_animated_256.gif
+
+        Returns:
+            List of {width, height, file, bytes} for the status file
+        """
+        stem, suffix = os.path.splitext(self.config['animated_gif_filename'])
+        outputs = []
+        for width, frames in reduced.items():
+            if not frames:
+                continue
+            filename = f"{stem}_{width}{suffix}"
+            data = self.encode_image(
+                frames[0],
+                'GIF',
+                save_all=True,
+                append_images=frames[1:],
+                duration=durations,
+                loop=self.config['gif_loop'],
+                optimize=False
+            )
+            self.write_output(filename, data)
+            if filename not in self.saved_filenames:
+                self.saved_filenames.append(filename)
+            outputs.append({'width': frames[0].width, 'height': frames[0].height, 'file': filename, 'bytes': len(data)})
+            logging.info(f"Saved {frames[0].width}x{frames[0].height} loop: {filename} ({len(data)} bytes)")
+        return outputs
+
+    def encode_overlay(self, image, format):
+        """Encode a radar-only overlay as lossless WebP or as a compact PNG
+
+        Cleaned radar frames use a handful of colours, so PNG overlays are
+        stored as palette images whenever that round-trips exactly.
+        """
+        if format == 'webp':
+            return self.encode_image(image, 'WEBP', lossless=True)
+        if image.getcolors(256) is not None:
+            palette_image = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+            if palette_image.convert('RGBA').tobytes() == image.tobytes():
+                image = palette_image
+        return self.encode_image(image, 'PNG')
+
+    def write_layer_outputs(self, base_image, house_icon, timestamps, radar_layers, products, scan_timestamps):
+        """Write a static base, radar-only overlays and a manifest for client-side compositing
+
+        The base (background, legend and house marker) and each overlay (one
+        radar scan) are named after their content, so they are only encoded
+        and written when new and clients can cache them indefinitely; only
+        the manifest, radar_layers.json, changes every cycle.
+
+        Args:
+            base_image: Background image (512x512 RGBA)
+            house_icon: House icon image, or None to skip the marker
+            timestamps: Sorted list of YYYYMMDDHHmm frame timestamps
+            radar_layers: As for render_frames(); the images are left in place
+            products: Dict of {radar label: product ID}
+            scan_timestamps: Dict of {frame timestamp: {label: scan timestamp}}
+                for time-aligned frames
+        """
+        overlay_format = self.config.get('overlay_format', 'png')
+        extension = 'webp' if overlay_format == 'webp' else 'png'
+        # An ROI crop changes the overlays' geometry, so the window is part of their names
+        roi = self.region_of_interest()
+        roi_suffix = ''
+        if roi is not None:
+            roi_key = repr((roi.box, roi.output_size)).encode()
+            roi_suffix = f"_{hashlib.blake2b(roi_key, digest_size=4).hexdigest()}"
+
+        marker = (house_icon is not None, self.config['residential_lat'], self.config['residential_lon'])
+        cached = self._layer_base
+        if cached is None or cached[0] is not base_image or cached[1] != marker:
+            base = self.add_legend_bar(base_image)
+            if house_icon is not None:
+                base = self.add_house_marker(base, house_icon)
+            data = self.encode_image(base, 'PNG')
+            filename = f"layer_base_{hashlib.blake2b(data, digest_size=6).hexdigest()}.png"
+            cached = self._layer_base = (base_image, marker, filename, data, base.size)
+        _, _, base_filename, base_data, base_size = cached
+
+        files = {base_filename: base_data}
+        frames = []
+        for timestamp, duration in zip(timestamps, self.frame_durations(len(timestamps))):
+            layers = []
+            for label, images, (offset_x, offset_y) in radar_layers:
+                image = images.get(timestamp)
+                if image is None:
+                    continue
+                scan = scan_timestamps.get(timestamp, {}).get(label, timestamp)
+                filename = f"overlay_{products[label]}_{scan}{roi_suffix}.{extension}"
+                if filename not in files:
+                    data = self.layer_files.get(filename)
+                    files[filename] = data if data is not None else self.encode_overlay(image, overlay_format)
+                layers.append({'file': filename, 'x': offset_x, 'y': offset_y})
+            frames.append({
+                'timestamp': timestamp,
+                'time': self.local_time_label(timestamp),
+                'duration': duration,
+                'layers': layers,
+            })
+
+        output_directory = self.config['output_directory']
+        written = 0
+        for filename, data in files.items():
+            if filename in self.layer_files and os.path.exists(os.path.join(output_directory, filename)):
+                self.encoded_outputs[filename] = data
+            else:
+                self.write_output(filename, data)
+                written += 1
+            self.saved_filenames.append(filename)
+
+        # Files from earlier cycles that the manifest no longer references
+        for filename in os.listdir(output_directory):
+            if filename.startswith(('overlay_', 'layer_base_')) and filename not in files:
+                try:
+                    os.remove(os.path.join(output_directory, filename))
+                except OSError:
+                    pass
+        self.layer_files = files
+
+        manifest = {
+            'version': 1,
+            'width': base_size[0],
+            'height': base_size[1],
+            'base': base_filename,
+            'loop': self.config['gif_loop'],
+            'frames': frames,
+            'updated': datetime.now(pytz.timezone(self.config['timezone'])).isoformat(),
+        }
+        self.write_output(LAYER_MANIFEST_FILENAME, json.dumps(manifest, indent=2).encode('utf-8'))
+        self.saved_filenames.append(LAYER_MANIFEST_FILENAME)
+        logging.info(f"Wrote layer manifest with {len(frames)} frames ({written} new of {len(files)} layer files)")
+
+    def frame_durations(self, count):
+        """Milliseconds per loop frame, with the configured pause on the last one"""
+        durations = [self.config['gif_duration']] * count
+        if durations:
+            durations[-1] = self.config['gif_last_frame_duration']
+        return durations
+
+    def render_loop(self, base_image, house_icon, timestamps, radar_layers):
+        """Composite the frames, save them as image_N.png and encode the animated loops
+
+        Args:
+            base_image: Background image (512x512 RGBA)
+            house_icon: House icon image, or None to skip the marker
+            timestamps: Sorted list of YYYYMMDDHHmm timestamps to render
+            radar_layers: As for render_frames()
+        """
+        # Render as a streaming pipeline: each timestamp is composited,
+        # saved as image_N.png, marked and handed to the GIF encoder before
+        # the next one is built, so only one full RGBA frame is alive at a time
+        frame_durations = self.frame_durations(len(timestamps))
+        logging.debug(f"GIF frame durations: {frame_durations}")
+
+        stage_start = time.perf_counter()
+        nested_stages = ('composite', 'save_frames', 'reduce_frames')
+        nested_before = sum(self.stage_timings.get(name, 0.0) for name in nested_stages)
+
+        workers = self.render_worker_count(len(timestamps))
+        pool = None
+        if workers:
+            try:
+                pool = self.get_render_pool(base_image, house_icon, workers)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not start render workers, rendering in-process: {e}")
+
+        if pool is not None:
+            loop_frames = self.stream_pooled_outputs(pool, timestamps, radar_layers)
+        else:
+            loop_frames = self.stream_frame_outputs(
+                self.render_frames(base_image, timestamps, radar_layers),
+                house_icon
+            )
+        # Smaller loops are downscaled from the same frames as they stream past
+        reduced = {width: [] for width in self.loop_output_sizes(base_image.width)}
+        if reduced:
+            loop_frames = self.collect_reduced_frames(loop_frames, reduced)
+        first_frame = next(loop_frames)
+        gif_data = self.encode_image(
+            first_frame,
+            'GIF',
+            save_all=True,
+            append_images=loop_frames,
+            duration=frame_durations,
+            loop=self.config['gif_loop'],
+            optimize=False
+        )
+        loop_size = first_frame.size
+        del first_frame
+        gif_filepath = self.write_output(self.config['animated_gif_filename'], gif_data)
+        self.saved_filenames.append(self.config['animated_gif_filename'])
+
+        # Compositing and PNG saving ran inside the encoder's iteration;
+        # attribute only the remainder to GIF encoding
+        self.record_stage('encode_gif', stage_start)
+        nested_after = sum(self.stage_timings.get(name, 0.0) for name in nested_stages)
+        self.stage_timings['encode_gif'] -= nested_after - nested_before
+
+        stage_start = time.perf_counter()
+        self.loop_outputs = [{
+            'width': loop_size[0], 'height': loop_size[1],
+            'file': self.config['animated_gif_filename'], 'bytes': len(gif_data),
+        }]
+        self.loop_outputs += self.write_reduced_loops(reduced, frame_durations)
+        if reduced:
+            self.record_stage('encode_sizes', stage_start)
+
+        logging.info(f"Saved {self.frame_count} PNG images")
+        logging.info(f"Saved animated GIF: {gif_filepath} ({self.frame_count} frames, last frame pauses for {self.config['gif_last_frame_duration']}ms)")
+
+    def write_output(self, filename, data):
+        """Write encoded output bytes to the output directory
+
+        The file is written to a temporary name and atomically renamed so that
+        readers never see a partially written image. The bytes are also kept
+        in `encoded_outputs` for publishing at the end of the cycle.
+
+        Args:
+            filename: Output filename relative to the output directory
+            data: Encoded file contents (bytes)
+
+        Returns:
+            str: Full path of the written file
+        """
+        filepath = os.path.join(self.config['output_directory'], filename)
+        tmp_filepath = f"{filepath}.tmp"
+        with open(tmp_filepath, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_filepath, filepath)
+        self.encoded_outputs[filename] = data
+        return filepath
+
+    @staticmethod
+    def encode_image(image, format, **params):
+        """Encode a PIL image into bytes in the given format"""
+        buffer = io.BytesIO()
+        image.save(buffer, format=format, **params)
+        return buffer.getvalue()
+
+    def publish_outputs(self):
+        """Publish this cycle's encoded outputs to the in-memory frame store"""
+        aliases = {}
+        if self.frame_count:
+            aliases['latest.png'] = f"image_{self.frame_count}.png"
+        self.frame_store.publish(self.encoded_outputs, aliases)
+
+    def reencode_loop(self):
+        """Re-encode the animated GIF from the current PNG frames
+
+        Used when only loop settings (frame durations, looping or the house
+        marker) changed: nothing is downloaded or composited again.
+
+        Returns:
+            bool: True if the loop was re-encoded and published
+        """
+        if self.config.get('output_mode', 'composite') != 'composite':
+            # The layer manifest and base need a cycle (which reuses the cached overlays)
+            return False
+        frames = [self.encoded_outputs.get(f"image_{index}.png") for index in range(1, self.frame_count + 1)]
+        if not frames or any(data is None for data in frames):
+            return False
+
+        stage_start = time.perf_counter()
+        house_icon = self.load_house_icon() if self.config['residential_enabled'] else None
+
+        def loop_frames():
+            for data in frames:
+                frame = Image.open(io.BytesIO(data)).convert('RGBA')
+                yield self.add_house_marker(frame, house_icon) if house_icon is not None else frame
+
+        frame_durations = self.frame_durations(len(frames))
+        encoder_input = loop_frames()
+        frame_width = Image.open(io.BytesIO(frames[0])).width
+        reduced = {width: [] for width in self.loop_output_sizes(frame_width)}
+        if reduced:
+            encoder_input = self.collect_reduced_frames(encoder_input, reduced)
+        gif_data = self.encode_image(
+            next(encoder_input),
+            'GIF',
+            save_all=True,
+            append_images=encoder_input,
+            duration=frame_durations,
+            loop=self.config['gif_loop'],
+            optimize=False
+        )
+        self.write_output(self.config['animated_gif_filename'], gif_data)
+        self.loop_outputs = self.loop_outputs[:1] + self.write_reduced_loops(reduced, frame_durations)
+        self.publish_outputs()
+        if not self.config.get('addon_mode', False):
+            self.transfer_to_smb(None)
+        logging.info(f"Re-encoded animated GIF with new loop settings in {time.perf_counter() - stage_start:.2f}s")
+        return True
+
+    def save_state(self, path):
+        """Snapshot caches and the last published outputs for a warm restart
+
+        The snapshot is an uncompressed zip (its members are already PNG/GIF
+        compressed) holding a JSON manifest, the cleaned frame cache, cached
+        base images and the encoded outputs of the last cycle.
+
+        Args:
+            path: Snapshot file path
+        """
+        start = time.perf_counter()
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            manifest = {
+                'format': STATE_FORMAT,
+                'version': VERSION,
+                'saved_at': time.time(),
+                'frame_count': self.frame_count,
+                'timestamps': self.timestamps,
+                'saved_filenames': self.saved_filenames,
+                'base_images': [],
+            }
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as archive:
+                with self.frame_cache_lock:
+                    frames = list(self.frame_cache.items())
+                for name, data in frames:
+                    archive.writestr(f"frames/{name}", data)
+                for index, (key, (created, image)) in enumerate(self.base_image_cache.items()):
+                    member = f"base/{index}.png"
+                    archive.writestr(member, self.encode_image(image, 'PNG', compress_level=1))
+                    manifest['base_images'].append({'key': [key[0], key[1], list(key[2])],
+                                                    'roi': list(key[3]) if key[3] else None,
+                                                    'created': created, 'member': member})
+                for name, data in self.encoded_outputs.items():
+                    archive.writestr(f"outputs/{name}", data)
+                archive.writestr('manifest.json', json.dumps(manifest))
+            os.replace(tmp_path, path)
+            logging.info(f"Saved state snapshot to {path} ({os.path.getsize(path) / 1024:.0f} KiB, "
+                         f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+        except Exception as e:
+            logging.error(f"Failed to save state snapshot: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def restore_state(self, path):
+        """Restore a snapshot written by save_state() and republish its outputs
+
+        Args:
+            path: Snapshot file path
+
+        Returns:
+            bool: True if a snapshot was restored
+        """
+        if not os.path.exists(path):
+            logging.info("No state snapshot found, starting cold")
+            return False
+
+        start = time.perf_counter()
+        try:
+            with zipfile.ZipFile(path) as archive:
+                manifest = json.loads(archive.read('manifest.json'))
+                if manifest.get('format') != STATE_FORMAT:
+                    logging.info(f"Ignoring state snapshot with format {manifest.get('format')}")
+                    return False
+
+                for member in archive.namelist():
+                    if member.startswith('frames/'):
+                        self.frame_cache[member[len('frames/'):]] = archive.read(member)
+                    elif member.startswith('outputs/'):
+                        self.encoded_outputs[member[len('outputs/'):]] = archive.read(member)
+
+                for entry in manifest['base_images']:
+                    product_id, background_type, layers = entry['key']
+                    roi_box = tuple(entry['roi']) if entry.get('roi') else None
+                    image = Image.open(io.BytesIO(archive.read(entry['member']))).convert('RGBA')
+                    self.base_image_cache[(product_id, background_type, tuple(layers), roi_box)] = (entry['created'], image)
+
+            self.frame_count = manifest.get('frame_count', 0)
+            self.timestamps = manifest.get('timestamps', [])
+            self.saved_filenames = manifest.get('saved_filenames', [])
+
+            # Recreate any outputs missing from disk (e.g. a fresh output directory)
+            for name, data in self.encoded_outputs.items():
+                if not os.path.exists(os.path.join(self.config['output_directory'], name)):
+                    self.write_output(name, data)
+
+            self.publish_outputs()
+            age_minutes = (time.time() - manifest.get('saved_at', time.time())) / 60
+            logging.info(f"Restored state snapshot from {path} in {(time.perf_counter() - start) * 1000:.0f} ms "
+                         f"({len(self.frame_cache)} frames, {len(self.base_image_cache)} base images, "
+                         f"{len(self.encoded_outputs)} outputs, {age_minutes:.0f} minutes old)")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to restore state snapshot, starting cold: {e}")
+            self.frame_cache = {}
+            self.base_image_cache = {}
+            self.encoded_outputs = {}
+            return False
+
     def get_timestamp(self, filename):
         """Extract timestamp from filename for sorting"""
         try:
@@ -1017,9 +3214,11 @@ class RadarProcessor:
     
     def process_images(self):
         """Main processing function"""
-        self.frames = []
+        self.frame_count = 0
         self.timestamps = []
         self.saved_filenames = []
+        self.encoded_outputs = {}
+        self.stage_timings = {}
 
         product_id = self.config['product_id']
         second_radar_enabled = self.config.get('second_radar_enabled', False)
@@ -1029,7 +3228,9 @@ class RadarProcessor:
 
         try:
             # Create base image (BoM or OSM background)
-            base_image = self.create_base_image(product_id)
+            stage_start = time.perf_counter()
+            base_image = self.get_base_image(product_id)
+            self.record_stage('base_image', stage_start)
 
             if base_image is None:
                 logging.error("Cannot proceed without base image")
@@ -1045,196 +3246,187 @@ class RadarProcessor:
                 else:
                     logging.warning("Could not load house icon, marker will be disabled")
 
-            # Connect to FTP server for radar data
-            logging.info("Connecting to BOM FTP server...")
-            ftp = ftplib.FTP('ftp.bom.gov.au', timeout=30)
-            ftp.login()
-            ftp.cwd('/anon/gen/radar/')
-
-            # Download radar images into dictionaries keyed by timestamp.
-            # Using a helper avoids three near-identical download blocks.
-            primary_radar_images = {}
-            second_radar_images = {}
-            third_radar_images = {}
-
-            ftp_files = ftp.nlst()
-            self.download_radar_frames(ftp, ftp_files, product_id, 'primary', primary_radar_images)
-
-            # Download second radar images if enabled
+            # Refresh each radar independently; anything not refreshed in time
+            # is rendered from its last good frames in the frame cache
+            stage_start = time.perf_counter()
+            sources = [self.get_radar_source('primary', product_id)]
             offset_x, offset_y = 0, 0
             if second_radar_enabled and second_radar_product_id:
                 logging.info(f"Second radar enabled: {second_radar_product_id}")
-                if self.download_radar_frames(ftp, ftp_files, second_radar_product_id, 'second', second_radar_images):
-                    offset_x, offset_y = self.calculate_radar_offset(product_id, second_radar_product_id)
-                    logging.info(f"Second radar will be offset by ({offset_x}, {offset_y}) pixels")
-
-            # Download third radar images if enabled
+                sources.append(self.get_radar_source('second', second_radar_product_id))
+                offset_x, offset_y = self.calculate_radar_offset(product_id, second_radar_product_id)
+                logging.info(f"Second radar will be offset by ({offset_x}, {offset_y}) pixels")
             third_offset_x, third_offset_y = 0, 0
             if third_radar_enabled and third_radar_product_id:
                 logging.info(f"Third radar enabled: {third_radar_product_id}")
-                if self.download_radar_frames(ftp, ftp_files, third_radar_product_id, 'third', third_radar_images):
-                    third_offset_x, third_offset_y = self.calculate_radar_offset(product_id, third_radar_product_id)
-                    logging.info(f"Third radar will be offset by ({third_offset_x}, {third_offset_y}) pixels")
-
-            # Collect all unique timestamps from all radars
-            all_timestamps = set()
-            all_timestamps.update(primary_radar_images.keys())
-            all_timestamps.update(second_radar_images.keys())
-            all_timestamps.update(third_radar_images.keys())
+                sources.append(self.get_radar_source('third', third_radar_product_id))
+                third_offset_x, third_offset_y = self.calculate_radar_offset(product_id, third_radar_product_id)
+                logging.info(f"Third radar will be offset by ({third_offset_x}, {third_offset_y}) pixels")
+
+            refreshed = self.refresh_radar_sources(sources)
+            radar_images = {}
+            for source in sources:
+                images = refreshed.get(source.label)
+                if not images:
+                    images = self.load_cached_frames(source.product_id)
+                    if images and source.stale:
+                        logging.warning(f"{source.label.capitalize()} radar ({source.product_id}) is stale, "
+                                        f"using {len(images)} cached frame(s)")
+                radar_images[source.label] = images
+            primary_radar_images = radar_images.get('primary', {})
+            second_radar_images = radar_images.get('second', {})
+            third_radar_images = radar_images.get('third', {})
+            stale_labels = {source.label for source in sources if source.stale}
+            sources_by_label = {source.label: source for source in sources}
+            self.record_stage('download', stage_start)
+
+            # Record per-radar availability now: the render pipeline releases
+            # source images from these dicts as each frame is composited
+            radar_frame_counts = {
+                'primary': len(primary_radar_images),
+                'second': len(second_radar_images),
+                'third': len(third_radar_images),
+            }
 
-            # Sort timestamps and take the most recent 5
-            sorted_timestamps = sorted(all_timestamps)[-5:]
+            bucket_minutes = self.config.get('frame_bucket_minutes', DEFAULT_FRAME_BUCKET_MINUTES)
+            if len(sources) > 1 and bucket_minutes:
+                # Align radars with different offsets/cadences into complete mosaics
+                tolerance = self.config.get('frame_bucket_tolerance_minutes')
+                aligned = align_timestamps(
+                    {source.label: radar_images[source.label].keys() for source in sources},
+                    bucket_minutes, int(tolerance) if tolerance not in (None, '') else None
+                )
+                sorted_timestamps = [frame_timestamp for frame_timestamp, _ in aligned]
+                scan_timestamps = {
+                    frame_timestamp: dict(chosen) for frame_timestamp, chosen in aligned
+                }
+                for source in sources:
+                    images = radar_images[source.label]
+                    realigned = {
+                        frame_timestamp: images[chosen[source.label]]
+                        for frame_timestamp, chosen in aligned if source.label in chosen
+                    }
+                    images.clear()
+                    images.update(realigned)
+            else:
+                # Collect all unique timestamps from all radars and take the most recent 5
+                all_timestamps = set()
+                all_timestamps.update(primary_radar_images.keys())
+                all_timestamps.update(second_radar_images.keys())
+                all_timestamps.update(third_radar_images.keys())
+                sorted_timestamps = sorted(all_timestamps)[-FRAME_COUNT:]
+                scan_timestamps = {}
+            latest_sources = set()
+            if sorted_timestamps:
+                latest_timestamp = sorted_timestamps[-1]
+                for label, images in [('primary', primary_radar_images),
+                                      ('second', second_radar_images),
+                                      ('third', third_radar_images)]:
+                    if latest_timestamp in images:
+                        latest_sources.add(label)
 
             if not sorted_timestamps:
                 logging.error("No radar data available from any radar - all radars offline")
-            else:
-                logging.info(f"Processing {len(sorted_timestamps)} frames with timestamps: {sorted_timestamps}")
-
-                # Log timestamp alignment status for each radar
-                for timestamp in sorted_timestamps:
-                    available_radars = []
-                    if timestamp in primary_radar_images:
-                        available_radars.append("primary")
-                    if timestamp in second_radar_images:
-                        available_radars.append("secondary")
-                    if timestamp in third_radar_images:
-                        available_radars.append("tertiary")
-
-                    if len(available_radars) < (1 + int(second_radar_enabled) + int(third_radar_enabled)):
-                        logging.warning(f"Timestamp {timestamp}: partial data - available from {', '.join(available_radars) if available_radars else 'none'}")
-                    else:
-                        logging.debug(f"Timestamp {timestamp}: complete data from all radars")
-
-                # Create frames for each timestamp
-                total_frames = len(sorted_timestamps)
-                for frame_index, timestamp in enumerate(sorted_timestamps):
-                    logging.debug(f"Creating frame for timestamp {timestamp}")
-
-                    # Start with base image (maintains original size)
-                    frame = base_image.copy()
-
-                    # If third radar is enabled and has data for this timestamp, composite it
-                    # Third radar goes first (bottom layer)
-                    if third_radar_enabled and timestamp in third_radar_images:
-                        third_image = third_radar_images[timestamp]
-
-                        # Check if third radar overlaps with primary radar
-                        overlaps = (
-                            third_offset_x < RADAR_IMAGE_SIZE and (third_offset_x + RADAR_IMAGE_SIZE) > 0 and
-                            third_offset_y < RADAR_IMAGE_SIZE and (third_offset_y + RADAR_IMAGE_SIZE) > 0
-                        )
-
-                        if overlaps:
-                            # Paste third radar first (it should be at the bottom)
-                            # PIL will automatically clip if it extends beyond canvas
-                            frame.paste(third_image, (third_offset_x, third_offset_y), third_image)
-                            logging.debug(f"Pasted third radar at ({third_offset_x}, {third_offset_y}) for timestamp {timestamp}")
-                        else:
-                            logging.warning(f"Third radar at offset ({third_offset_x}, {third_offset_y}) does not overlap with primary radar - skipping")
-
-                    # If second radar is enabled and has data for this timestamp, composite it
-                    # Second radar goes on top of third radar (middle layer)
-                    if second_radar_enabled and timestamp in second_radar_images:
-                        second_image = second_radar_images[timestamp]
-
-                        # Check if second radar overlaps with primary radar
-                        overlaps = (
-                            offset_x < RADAR_IMAGE_SIZE and (offset_x + RADAR_IMAGE_SIZE) > 0 and
-                            offset_y < RADAR_IMAGE_SIZE and (offset_y + RADAR_IMAGE_SIZE) > 0
-                        )
-
-                        if overlaps:
-                            # Paste second radar (it should be below primary but above third)
-                            # PIL will automatically clip if it extends beyond canvas
-                            frame.paste(second_image, (offset_x, offset_y), second_image)
-                            logging.debug(f"Pasted second radar at ({offset_x}, {offset_y}) for timestamp {timestamp}")
-                        else:
-                            logging.warning(f"Second radar at offset ({offset_x}, {offset_y}) does not overlap with primary radar - skipping")
-
-                    # If primary radar has data for this timestamp, paste it on top (always at 0, 0)
-                    if timestamp in primary_radar_images:
-                        primary_image = primary_radar_images[timestamp]
-                        frame.paste(primary_image, (0, 0), primary_image)
-                        logging.debug(f"Pasted primary radar for timestamp {timestamp}")
-
-                    # Add legend bar at bottom (all frames get the legend)
-                    frame = self.add_legend_bar(frame)
-
-                    # Add timestamp overlay (all frames get timestamps)
-                    frame = self.add_timestamp_overlay(frame, timestamp)
-
-                    self.frames.append(frame)
-                    self.timestamps.append(timestamp)
-                    logging.debug(f"Successfully created frame for timestamp {timestamp}")
-
-            ftp.quit()
-            logging.info("Disconnected from FTP server")
-
-            if not self.frames:
                 logging.error("No frames were processed")
                 return False
 
-            # Save individual PNG images (without house marker)
-            for i, img in enumerate(self.frames):
-                filename = f"image_{i+1}.png"
-                filepath = os.path.join(self.config['output_directory'], filename)
-                img.save(filepath)
-                self.saved_filenames.append(filename)
-                logging.debug(f"Saved {filepath}")
-
-            logging.info(f"Saved {len(self.saved_filenames)} PNG images")
+            logging.info(f"Processing {len(sorted_timestamps)} frames with timestamps: {sorted_timestamps}")
 
-            # Create GIF frames with house marker (if enabled)
-            # Timestamps are already on the frames from frame creation
-            gif_frames = []
+            # Log timestamp alignment status for each radar
+            for timestamp in sorted_timestamps:
+                available_radars = []
+                if timestamp in primary_radar_images:
+                    available_radars.append("primary")
+                if timestamp in second_radar_images:
+                    available_radars.append("secondary")
+                if timestamp in third_radar_images:
+                    available_radars.append("tertiary")
 
-            if house_icon is not None:
-                logging.info("Adding house markers to GIF frames only")
-                for frame in self.frames:
-                    gif_frame = frame.copy()
-                    gif_frame = self.add_house_marker(gif_frame, house_icon)
-                    gif_frames.append(gif_frame)
+                if len(available_radars) < (1 + int(second_radar_enabled) + int(third_radar_enabled)):
+                    logging.warning(f"Timestamp {timestamp}: partial data - available from {', '.join(available_radars) if available_radars else 'none'}")
+                else:
+                    logging.debug(f"Timestamp {timestamp}: complete data from all radars")
+
+            # Drop source frames that fall outside the loop window straight away
+            for images in (primary_radar_images, second_radar_images, third_radar_images):
+                for timestamp in set(images) - set(sorted_timestamps):
+                    del images[timestamp]
+
+            # Radar layers from bottom to top: third, second, then primary at (0, 0)
+            radar_layers = []
+            if third_radar_enabled:
+                radar_layers.append(('third', third_radar_images, (third_offset_x, third_offset_y)))
+            if second_radar_enabled:
+                radar_layers.append(('second', second_radar_images, (offset_x, offset_y)))
+            radar_layers.append(('primary', primary_radar_images, (0, 0)))
+
+            roi = self.region_of_interest()
+            if roi is not None:
+                # Only the window is composited, overlaid and encoded
+                stage_start = time.perf_counter()
+                radar_layers = self.crop_radar_layers(roi, radar_layers)
+                self.record_stage('roi_crop', stage_start)
+
+            output_mode = self.config.get('output_mode', 'composite')
+            if output_mode in ('layers', 'both'):
+                # Static base, radar-only overlays and a manifest for client-side compositing
+                stage_start = time.perf_counter()
+                layer_sources = {source.label: source.product_id for source in sources}
+                self.write_layer_outputs(base_image, house_icon, sorted_timestamps, radar_layers,
+                                         layer_sources, scan_timestamps)
+                self.record_stage('layers', stage_start)
+
+            if output_mode != 'layers':
+                if house_icon is not None:
+                    logging.info("Adding house markers to GIF frames only")
+                self.render_loop(base_image, house_icon, sorted_timestamps, radar_layers)
             else:
-                # No modifications needed, just use frames directly
-                gif_frames = self.frames
+                self.timestamps = list(sorted_timestamps)
+                self.loop_outputs = []
 
-            # Save animated GIF
-            gif_filepath = os.path.join(
-                self.config['output_directory'],
-                self.config['animated_gif_filename']
-            )
-
-            # Create duration list with longer pause on last frame
-            num_frames = len(gif_frames)
-            frame_durations = [self.config['gif_duration']] * num_frames
-            if num_frames > 0:
-                frame_durations[-1] = self.config['gif_last_frame_duration']
-                logging.debug(f"GIF frame durations: {frame_durations}")
-
-            gif_frames[0].save(
-                gif_filepath,
-                save_all=True,
-                append_images=gif_frames[1:],
-                duration=frame_durations,
-                loop=self.config['gif_loop'],
-                optimize=False
-            )
-            self.saved_filenames.append(self.config['animated_gif_filename'])
-            logging.info(f"Saved animated GIF: {gif_filepath} ({num_frames} frames, last frame pauses for {self.config['gif_last_frame_duration']}ms)")
+            # Stream frames that are new since the last cycle into the daily time-lapse
+            if self.timelapse is not None and self.frame_count:
+                stage_start = time.perf_counter()
+                try:
+                    archived = 0
+                    for index, timestamp in enumerate(self.timestamps, start=1):
+                        archived += self.timelapse.append(timestamp, self.encoded_outputs[f"image_{index}.png"])
+                    self.timelapse.commit()
+                    if archived:
+                        logging.info(f"Added {archived} frame(s) to the time-lapse")
+                except Exception as e:
+                    logging.error(f"Failed to update the time-lapse: {e}")
+                self.record_stage('timelapse', stage_start)
+
+            # Rainfall totals from the echo archive, drawn on the same background
+            rainfall_totals = {}
+            if self.rainfall is not None:
+                stage_start = time.perf_counter()
+                rainfall_layers = [(product_id, (0, 0))]
+                if second_radar_enabled and second_radar_product_id:
+                    rainfall_layers.append((second_radar_product_id, (offset_x, offset_y)))
+                if third_radar_enabled and third_radar_product_id:
+                    rainfall_layers.append((third_radar_product_id, (third_offset_x, third_offset_y)))
+                try:
+                    rainfall_totals = self.render_rainfall(base_image, rainfall_layers, house_icon, sorted_timestamps[-1])
+                except Exception as e:
+                    logging.error(f"Failed to render rainfall totals: {e}")
+                self.record_stage('rainfall', stage_start)
 
             # Extract timestamp from latest radar data
             # Use the most recent timestamp from any available radar
+            stage_start = time.perf_counter()
             timestamp_content = None
             if sorted_timestamps:
                 # Create a dummy filename with the latest timestamp for parsing
                 latest_timestamp = sorted_timestamps[-1]
                 # Determine which radar has this timestamp to get the correct product ID
                 dummy_filename = None
-                if latest_timestamp in primary_radar_images:
+                if 'primary' in latest_sources:
                     dummy_filename = f"{product_id}.T.{latest_timestamp}.png"
-                elif latest_timestamp in second_radar_images:
+                elif 'second' in latest_sources:
                     dummy_filename = f"{second_radar_product_id}.T.{latest_timestamp}.png"
-                elif latest_timestamp in third_radar_images:
+                elif 'third' in latest_sources:
                     dummy_filename = f"{third_radar_product_id}.T.{latest_timestamp}.png"
 
                 if dummy_filename:
@@ -1245,13 +3437,11 @@ class RadarProcessor:
 
             # Write timestamp file locally
             if timestamp_content:
-                timestamp_filepath = os.path.join(
-                    self.config['output_directory'],
-                    self.config['timestamp_filename']
-                )
                 try:
-                    with open(timestamp_filepath, 'w') as f:
-                        f.write(timestamp_content)
+                    timestamp_filepath = self.write_output(
+                        self.config['timestamp_filename'],
+                        timestamp_content.encode('utf-8')
+                    )
                     logging.info(f"Wrote timestamp file: {timestamp_filepath}")
                 except Exception as e:
                     logging.error(f"Failed to write timestamp file: {e}")
@@ -1260,9 +3450,9 @@ class RadarProcessor:
             try:
                 # Determine overall status
                 radars_enabled = 1 + int(second_radar_enabled) + int(third_radar_enabled)
-                radars_online = int(len(primary_radar_images) > 0) + int(len(second_radar_images) > 0) + int(len(third_radar_images) > 0)
+                radars_online = sum(int(count > 0) for count in radar_frame_counts.values())
 
-                if radars_online == radars_enabled and radars_online > 0:
+                if radars_online == radars_enabled and radars_online > 0 and not stale_labels:
                     overall_status = "online"
                 elif radars_online > 0:
                     overall_status = "partial"
@@ -1274,43 +3464,74 @@ class RadarProcessor:
                     "overall_status": overall_status,
                     "primary_enabled": True,
                     "primary_product_id": product_id,
-                    "primary_online": len(primary_radar_images) > 0,
-                    "primary_timestamps": len(primary_radar_images),
+                    "primary_online": radar_frame_counts['primary'] > 0,
+                    "primary_timestamps": radar_frame_counts['primary'],
                     "secondary_enabled": second_radar_enabled,
                     "secondary_product_id": second_radar_product_id if second_radar_enabled else None,
-                    "secondary_online": len(second_radar_images) > 0 if second_radar_enabled else None,
-                    "secondary_timestamps": len(second_radar_images) if second_radar_enabled else 0,
+                    "secondary_online": radar_frame_counts['second'] > 0 if second_radar_enabled else None,
+                    "secondary_timestamps": radar_frame_counts['second'] if second_radar_enabled else 0,
                     "tertiary_enabled": third_radar_enabled,
                     "tertiary_product_id": third_radar_product_id if third_radar_enabled else None,
-                    "tertiary_online": len(third_radar_images) > 0 if third_radar_enabled else None,
-                    "tertiary_timestamps": len(third_radar_images) if third_radar_enabled else 0,
+                    "tertiary_online": radar_frame_counts['third'] > 0 if third_radar_enabled else None,
+                    "tertiary_timestamps": radar_frame_counts['third'] if third_radar_enabled else 0,
                     "latest_timestamp": sorted_timestamps[-1] if sorted_timestamps else None,
-                    "frames_generated": len(self.frames),
+                    "frames_generated": self.frame_count,
+                    "primary_breaker": self.source_health.get(f"radar:{product_id}").state,
+                    "secondary_breaker": self.source_health.get(f"radar:{second_radar_product_id}").state if second_radar_enabled else None,
+                    "tertiary_breaker": self.source_health.get(f"radar:{third_radar_product_id}").state if third_radar_enabled else None,
+                    "primary_stale": 'primary' in stale_labels,
+                    "secondary_stale": 'second' in stale_labels if second_radar_enabled else None,
+                    "tertiary_stale": 'third' in stale_labels if third_radar_enabled else None,
+                    "primary_last_refresh": sources_by_label['primary'].status_time(self.config['timezone']),
+                    "secondary_last_refresh": sources_by_label['second'].status_time(self.config['timezone']) if 'second' in sources_by_label else None,
+                    "tertiary_last_refresh": sources_by_label['third'].status_time(self.config['timezone']) if 'third' in sources_by_label else None,
+                    "sources": self.source_health.status(),
+                    "loop_outputs": self.loop_outputs,
+                    "layer_manifest": LAYER_MANIFEST_FILENAME if output_mode in ('layers', 'both') else None,
+                    "tile_cache": self.tile_provider.cache_stats() if self.config['background_type'] == 'openstreetmap' else None,
+                    "region_of_interest": roi.status() if roi is not None else None,
+                    "shared_cache": self.shared_cache.cache_stats() if self.shared_cache else None,
                     "last_updated": datetime.now(pytz.timezone(self.config['timezone'])).isoformat()
                 }
+                for hours, total in rainfall_totals.items():
+                    status_data[f"rainfall_{hours}h_mm"] = total
 
                 # Write status JSON file
-                status_filepath = os.path.join(
-                    self.config['output_directory'],
-                    'radar_status.json'
+                status_filepath = self.write_output(
+                    'radar_status.json',
+                    json.dumps(status_data, indent=2).encode('utf-8')
                 )
-                with open(status_filepath, 'w') as f:
-                    json.dump(status_data, f, indent=2)
                 logging.info(f"Wrote status file: {status_filepath} (overall_status: {overall_status})")
             except Exception as e:
                 logging.error(f"Failed to write status file: {e}")
 
+            self.record_stage('write_metadata', stage_start)
+
+            # Make the new outputs available to in-memory consumers
+            self.publish_outputs()
+            logging.info("Stage timings: " + ", ".join(
+                f"{name}={seconds:.2f}s" for name, seconds in self.stage_timings.items()
+            ))
+
             # Transfer to SMB share (only in non-addon mode)
             if not self.config.get('addon_mode', False):
                 self.transfer_to_smb(timestamp_content)
             else:
                 logging.info(f"Files saved to {self.config['output_directory']}")
 
+            if len(stale_labels) == len(sources):
+                # Outputs were refreshed from cached frames only; retry soon
+                logging.warning("No radar could be refreshed this cycle, published cached frames")
+                return False
             return True
             
         except ftplib.all_errors as e:
             logging.error(f"FTP Error: {e}")
             return False
+        except BrokenProcessPool as e:
+            logging.error(f"Render worker failed, restarting the pool next cycle: {e}")
+            self.shutdown_render_pool()
+            return False
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
             import traceback
@@ -1318,87 +3539,65 @@ class RadarProcessor:
             return False
     
     def transfer_to_smb(self, timestamp_content):
-        """Transfer files to SMB share (deprecated - only for backward compatibility)"""
+        """Transfer changed files to SMB share (deprecated - only for backward compatibility)"""
         if not self.saved_filenames:
             logging.warning("No files to transfer")
             return
 
-        try:
-            # Import smbclient only when needed (for backward compatibility)
-            try:
-                import smbclient
-            except ImportError:
-                logging.error("SMB transfer requires 'smbprotocol' package. Install with: pip install smbprotocol")
-                return
-
-            # Configure SMB client
-            smbclient.ClientConfig(
-                username=self.config['smb_username'],
-                password=self.config['smb_password']
+        if self.smb_sync is None:
+            self.smb_sync = SMBSync(
+                self.config['smb_server'], self.config['smb_share'], self.config['smb_remote_path'],
+                self.config['smb_username'], self.config['smb_password']
             )
 
-            # Build SMB destination path
-            smb_destination_path = (
-                f"//{self.config['smb_server']}/{self.config['smb_share']}"
-                f"{self.config['smb_remote_path']}"
-            )
-
-            # Create destination directory
-            try:
-                smbclient.makedirs(smb_destination_path, exist_ok=True)
-            except Exception as e:
-                logging.warning(f"Could not create directory: {e}")
-
-            # Transfer each saved file
-            for file_name in self.saved_filenames:
-                local_file_path = os.path.join(self.config['output_directory'], file_name)
-                smb_file_path = f"{smb_destination_path}/{file_name}"
-
-                logging.debug(f"Transferring {file_name}...")
-                try:
-                    with open(local_file_path, 'rb') as local_file:
-                        with smbclient.open_file(smb_file_path, mode="wb") as smb_file:
-                            smb_file.write(local_file.read())
-                    logging.debug(f"Successfully transferred {file_name}")
-                except Exception as e:
-                    logging.error(f"Failed to transfer {file_name}: {e}")
-
-            logging.info(f"Transferred {len(self.saved_filenames)} files to SMB share")
-
-            # Write timestamp file
-            if timestamp_content:
-                timestamp_file_path = f"{smb_destination_path}/{self.config['timestamp_filename']}"
-                try:
-                    with smbclient.open_file(timestamp_file_path, mode="w") as timestamp_file:
-                        timestamp_file.write(timestamp_content)
-                    logging.info(f"Successfully wrote timestamp file")
-                except Exception as e:
-                    logging.error(f"Failed to write timestamp file: {e}")
+        # Upload from the encoded outputs; the timestamp file goes last
+        files = {name: self.encoded_outputs[name] for name in self.saved_filenames if name in self.encoded_outputs}
+        timestamp_name = self.config['timestamp_filename']
+        if timestamp_content and timestamp_name in self.encoded_outputs:
+            files[timestamp_name] = self.encoded_outputs[timestamp_name]
 
+        try:
+            uploaded, unchanged, failed = self.smb_sync.sync(files, last=timestamp_name)
+        except ImportError:
+            logging.error("SMB transfer requires 'smbprotocol' package. Install with: pip install smbprotocol")
+            return
         except Exception as e:
             logging.error(f"Transfer error: {e}")
-            try:
-                import smbclient
-                smbclient.reset_connection_cache()
-            except Exception:
-                pass
+            self.smb_sync.reset()
+            return
+
+        logging.info(f"Transferred {uploaded} changed files to SMB share "
+                     f"({unchanged} unchanged, {failed} failed)")
 
 
 async def main():
     """Main application entry point with continuous scheduling"""
+    startup_start = time.perf_counter()
 
-    # Graceful shutdown flag — set by SIGTERM handler
+    # Graceful shutdown flag — set by SIGTERM handler. The event also wakes
+    # the scheduler from its sleep so the state snapshot is written promptly.
     shutdown_requested = False
+    wake_event = asyncio.Event()
 
     def _request_shutdown():
         nonlocal shutdown_requested
         logging.info('Shutdown signal received, finishing current cycle then exiting...')
         shutdown_requested = True
+        wake_event.set()
+
+    # Hot reload flag — set by SIGHUP or when the options file changes
+    reload_requested = False
+
+    def _request_reload():
+        nonlocal reload_requested
+        reload_requested = True
+        wake_event.set()
 
     # Register SIGTERM handler so Docker/HA supervisor can stop us cleanly.
     # loop.add_signal_handler() fires inside the event loop (safe for async code).
     loop = asyncio.get_event_loop()
     loop.add_signal_handler(signal.SIGTERM, _request_shutdown)
+    loop.add_signal_handler(signal.SIGHUP, _request_reload)
 
     # Load configuration
     config = Config.load()
@@ -1437,24 +3636,141 @@ async def main():
     processor = RadarProcessor(config)
     processor.validate_config()
 
+    # Restore the last snapshot so outputs are republished immediately and
+    # the first cycle only downloads frames that are actually new
+    state_file = config.get('state_file')
+    if state_file:
+        processor.restore_state(state_file)
+
+    # On-demand profiling of processing cycles (SIGUSR1 profiles the next cycle)
+    profiler = CycleProfiler(
+        config['output_directory'],
+        config.get('profile_cycles', 0),
+        config.get('profile_min_seconds', 0.0)
+    )
+    loop.add_signal_handler(signal.SIGUSR1, profiler.arm, 1)
+
+    # Optionally serve outputs straight from memory over HTTP
+    frame_server = None
+    if config.get('http_server_enabled', False):
+        frame_server = FrameServer(processor.frame_store, port=config['http_server_port'])
+        try:
+            await frame_server.start()
+        except OSError as e:
+            logging.error(f"Could not start HTTP server on port {config['http_server_port']}: {e}")
+            frame_server = None
+
+    # Optionally push changed outputs to retained MQTT topics
+    mqtt_sink = None
+    if config.get('mqtt_enabled', False):
+        mqtt_sink = MQTTSink(
+            config['mqtt_host'], config['mqtt_port'], config.get('mqtt_username'), config.get('mqtt_password'),
+            config.get('mqtt_topic_prefix', 'bom_radar'),
+            topics={
+                'loop': config['animated_gif_filename'],
+                'latest': 'latest.png',
+                'status': 'radar_status.json',
+                'timestamp': config['timestamp_filename'],
+            }
+        )
+        try:
+            mqtt_sink.start(processor.frame_store)
+        except ImportError:
+            logging.error("MQTT publishing requires the 'paho-mqtt' package. Install with: pip install paho-mqtt")
+            mqtt_sink = None
+        except Exception as e:
+            logging.error(f"Could not start MQTT publisher for {config['mqtt_host']}:{config['mqtt_port']}: {e}")
+            mqtt_sink = None
+
+    logging.info(f'Startup completed in {(time.perf_counter() - startup_start) * 1000:.0f} ms')
+
+    def _reload_config():
+        return processor.apply_config(Config.load())
+
+    async def _sleep_applying_reloads(seconds):
+        """Sleep until the next cycle is due, applying configuration reloads meanwhile
+
+        Returns early, so the next cycle starts at once, when a reload
+        changed settings that need a new render.
+        """
+        nonlocal reload_requested
+        deadline = loop.time() + seconds
+        while not shutdown_requested:
+            # Checked before sleeping: a reload requested during the cycle is applied at once
+            if reload_requested:
+                reload_requested = False
+                try:
+                    # Off the event loop: loading validates files, and applying it
+                    # waits for refresh jobs and the tile eviction thread
+                    action = await loop.run_in_executor(None, _reload_config)
+                except SystemExit:
+                    # Config.load() exits when no configuration can be read; the reason is logged
+                    logging.error('Could not reload configuration, keeping the current one')
+                    continue
+                except Exception as e:
+                    logging.error(f'Could not reload configuration, keeping the current one: {e}')
+                    continue
+                if action == 'render':
+                    return
+                if action == 'reencode':
+                    if not await loop.run_in_executor(None, processor.reencode_loop):
+                        return
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            wake_event.clear()
+            await _sleep_until_woken(wake_event, remaining)
+
+    async def _watch_config_file(path):
+        """Request a reload whenever the configuration file is modified"""
+        def modified():
+            try:
+                return path.stat().st_mtime_ns
+            except OSError:
+                return None
+
+        last_modified = modified()
+        while not shutdown_requested:
+            await asyncio.sleep(CONFIG_POLL_SECONDS)
+            current = modified()
+            if current != last_modified and current is not None:
+                logging.info(f'Configuration file {path} changed, reloading')
+                _request_reload()
+            last_modified = current
+
     # Run continuously or once
     if config['scheduler_enabled']:
+        config_watcher = loop.create_task(
+            _watch_config_file(OPTIONS_FILE if OPTIONS_FILE.exists() else CONFIG_FILE)
+        )
         run_count = 0
+        failed_runs = 0
         while not shutdown_requested:
             run_count += 1
             logging.info(f'=== Starting radar image processing (run #{run_count}) ===')
 
             try:
-                success = processor.process_images()
+                # Run in a worker thread so the HTTP server stays responsive
+                success = await loop.run_in_executor(
+                    None, profiler.run, processor.process_images, f'run{run_count}'
+                )
+                if run_count == 1:
+                    logging.info(f'First cycle finished {time.perf_counter() - startup_start:.1f}s after startup')
 
                 if success:
                     logging.info('Radar processing completed successfully')
+                    failed_runs = 0
                     sleep_time = config['update_interval']
                 else:
                     logging.error('Radar processing failed')
+                    failed_runs += 1
                     if config['retry_on_error']:
-                        sleep_time = config['retry_interval']
-                        logging.info(f'Will retry in {sleep_time} seconds')
+                        # Back off exponentially (with jitter) up to the update interval
+                        sleep_time = round(backoff_delay(
+                            failed_runs, config['retry_interval'], max(config['retry_interval'], config['update_interval'])
+                        ))
+                        logging.info(f'Will retry in {sleep_time} seconds (failure #{failed_runs})')
                     else:
                         sleep_time = config['update_interval']
 
@@ -1462,7 +3778,7 @@ async def main():
                     break
 
                 logging.info(f'Next update in {sleep_time} seconds ({sleep_time/60:.1f} minutes)')
-                await asyncio.sleep(sleep_time)
+                await _sleep_applying_reloads(sleep_time)
 
             except KeyboardInterrupt:
                 logging.info('Shutdown requested via keyboard interrupt')
@@ -1473,19 +3789,87 @@ async def main():
                 traceback.print_exc()
 
                 if config['retry_on_error']:
-                    sleep_time = config['retry_interval']
+                    failed_runs += 1
+                    sleep_time = round(backoff_delay(
+                        failed_runs, config['retry_interval'], max(config['retry_interval'], config['update_interval'])
+                    ))
                     logging.info(f'Retrying in {sleep_time} seconds')
-                    await asyncio.sleep(sleep_time)
+                    await _sleep_applying_reloads(sleep_time)
                 else:
                     break
 
+        config_watcher.cancel()
         logging.info('Main loop exited cleanly')
     else:
         # Run once and exit
         logging.info('Running single processing cycle')
-        processor.process_images()
+        profiler.run(processor.process_images, 'run1')
         logging.info('Processing complete, exiting')
 
+    if processor.refresh_executor is not None:
+        # Don't wait for a slow radar refresh on the way out
+        processor.refresh_executor.shutdown(wait=False, cancel_futures=True)
+    processor.shutdown_render_pool()
+
+    if state_file:
+        processor.save_state(state_file)
+
+    processor.tile_provider.close()
+
+    if processor.echo_archive is not None:
+        processor.echo_archive.close()
+
+    if processor.timelapse is not None:
+        processor.timelapse.close()
+
+    if mqtt_sink is not None:
+        mqtt_sink.stop()
+
+    if frame_server is not None:
+        await frame_server.stop()
+
+
+# --- Render pool workers ---
+_render_worker = None
+
+
+def _init_render_worker(config, base_png, house_png):
+    """Process pool initializer: decode the shared base image and house icon once"""
+    global _render_worker
+    logging.basicConfig(level=getattr(logging, config['log_level'], logging.INFO),
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    processor = RadarProcessor.for_rendering(config)
+    base_image = Image.open(io.BytesIO(base_png)).convert('RGBA')
+    house_icon = Image.open(io.BytesIO(house_png)).convert('RGBA') if house_png else None
+    _render_worker = (processor, base_image, house_icon)
+
+
+def _render_frame_job(timestamp, layers):
+    """Render one loop frame in a pool worker
+
+    Args:
+        timestamp: YYYYMMDDHHmm timestamp of the frame
+        layers: List of (label, image, (offset_x, offset_y)) bottom to top
+
+    Returns:
+        tuple: (PNG bytes of the clean frame, RGBA frame with house marker for the GIF)
+    """
+    processor, base_image, house_icon = _render_worker
+    radar_layers = [(label, {timestamp: image}, offset) for label, image, offset in layers]
+    _, frame = next(processor.render_frames(base_image, [timestamp], radar_layers))
+    png_data = processor.encode_image(frame, 'PNG')
+    if house_icon is not None:
+        frame = processor.add_house_marker(frame, house_icon)
+    return png_data, frame
+
+
+async def _sleep_until_woken(wake_event, seconds):
+    """Sleep for `seconds`, returning early if shutdown or a reload is requested"""
+    try:
+        await asyncio.wait_for(wake_event.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,274 @@
+"""
+Memory-mapped echo-intensity history for radar products
+
+Each cleaned radar frame is reduced to one byte per pixel: its level on the
+BOM rain-rate colour scale (0 = no echo, 1-15 = the legend colours, light
+to heavy). Levels are appended to a fixed-size ring file per product, so
+24 hours of 512x512 frames at a 5-minute cadence costs about 72 MB (less
+with RLE, as untouched slot space stays sparse on disk).
+
+Ring file layout (little-endian):
+
+    header   64 bytes   magic, version, width, height, compression, slots
+    index    12 bytes per slot: timestamp (YYYYMMDDHHmm as int), length (0 = empty)
+    data     one width*height slot per frame, starting on a page boundary
+
+Raw slots are read straight from the mapping: `frames()` yields memoryviews
+into the file and `levels_image()` wraps one in a Pillow image without
+copying, so long loops, analytics and replays never decode PNGs.
+"""
+import logging
+import mmap
+import re
+import struct
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+MAGIC = b'BOMECHO1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHHHI')
+HEADER_SIZE = 64
+INDEX_ENTRY = struct.Struct('<QI')
+COMPRESSION_NONE = 0
+COMPRESSION_RLE = 1
+COMPRESSIONS = {'none': COMPRESSION_NONE, 'rle': COMPRESSION_RLE}
+MIN_CADENCE_MINUTES = 5         # Fastest BOM radar cadence, used to size the ring
+
+# BOM rain-rate colour scale, level 1 (lightest) to 15 (heaviest)
+BOM_RAIN_COLOURS = [
+    (245, 245, 255), (180, 180, 255), (120, 120, 255), (20, 20, 255),
+    (0, 216, 195), (0, 150, 144), (0, 102, 102), (255, 255, 0),
+    (255, 200, 0), (255, 150, 0), (255, 100, 0), (255, 0, 0),
+    (200, 0, 0), (120, 0, 0), (40, 0, 0),
+]
+LEVEL_COUNT = len(BOM_RAIN_COLOURS) + 1
+
+_palette_image = None
+
+
+def _level_palette():
+    """Palette image for quantize(): index 0 is 'no echo', 1-15 the colour scale"""
+    global _palette_image
+    if _palette_image is None:
+        # Unused entries repeat a colour far from the scale so they are never chosen
+        colours = [(0, 0, 0)] + BOM_RAIN_COLOURS + [(0, 0, 0)] * (256 - LEVEL_COUNT)
+        _palette_image = Image.new('P', (1, 1))
+        _palette_image.putpalette([channel for colour in colours for channel in colour])
+    return _palette_image
+
+
+def intensity_levels(image):
+    """Map a cleaned RGBA radar frame to an 'L' image of colour-scale levels (0-15)
+
+    Each opaque pixel takes the nearest colour on the scale, transparent
+    pixels become 0. The mapping runs in Pillow's C quantizer.
+    """
+    rgba = image.convert('RGBA')
+    quantized = rgba.convert('RGB').quantize(palette=_level_palette(), dither=Image.Dither.NONE)
+    levels = Image.frombytes('L', quantized.size, quantized.tobytes())
+    levels = levels.point(lambda value: value if value < LEVEL_COUNT else 0)
+    echo = rgba.getchannel('A').point(lambda alpha: 255 if alpha >= 128 else 0)
+    return Image.composite(levels, Image.new('L', levels.size, 0), echo)
+
+
+def rle_encode(data):
+    """Run-length encode bytes as (count, value) pairs with counts of 1-255"""
+    out = bytearray()
+    for match in re.finditer(rb'(.)\1*', data, re.S):
+        value = match.group(1)[0]
+        run = match.end() - match.start()
+        while run:
+            count = min(run, 255)
+            out += bytes((count, value))
+            run -= count
+    return bytes(out)
+
+
+def rle_decode(data):
+    """Inverse of rle_encode()"""
+    return b''.join(bytes((data[index + 1],)) * data[index] for index in range(0, len(data), 2))
+
+
+class EchoRing:
+    """Fixed-size ring of intensity frames for one product, backed by mmap"""
+
+    def __init__(self, path, width, height, slots, compression='none'):
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.compression = COMPRESSIONS[compression]
+        self.slot_size = width * height
+        index_end = HEADER_SIZE + slots * INDEX_ENTRY.size
+        self.data_offset = -(-index_end // mmap.PAGESIZE) * mmap.PAGESIZE
+        self.size = self.data_offset + slots * self.slot_size
+        self._lock = threading.Lock()
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, width, height, self.compression, slots)
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                existing = f.read(HEADER.size)
+            if existing != header or self.path.stat().st_size != self.size:
+                logging.info(f"Echo archive {self.path.name} has a different layout, starting a new one")
+                self.path.unlink()
+        new_file = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w+b' if new_file else 'r+b')
+        if new_file:
+            # Sparse until slots are written
+            self._file.truncate(self.size)
+        self._mm = mmap.mmap(self._file.fileno(), self.size)
+        if new_file:
+            self._mm[:HEADER.size] = header
+
+        # timestamp -> slot for occupied slots
+        self._index = {}
+        for slot in range(slots):
+            timestamp, length = INDEX_ENTRY.unpack_from(self._mm, HEADER_SIZE + slot * INDEX_ENTRY.size)
+            if length:
+                self._index[timestamp] = slot
+
+    def __len__(self):
+        return len(self._index)
+
+    def timestamps(self):
+        """Archived timestamps (YYYYMMDDHHmm strings), oldest first"""
+        with self._lock:
+            return [str(timestamp) for timestamp in sorted(self._index)]
+
+    def _write_entry(self, slot, timestamp, length):
+        INDEX_ENTRY.pack_into(self._mm, HEADER_SIZE + slot * INDEX_ENTRY.size, timestamp, length)
+
+    def append(self, timestamp, levels):
+        """Store one frame of levels (width*height bytes)
+
+        The oldest frame is overwritten once the ring is full; frames older
+        than everything in a full ring, or already archived, are skipped.
+
+        Returns:
+            bool: True if the frame was stored
+        """
+        key = int(timestamp)
+        if len(levels) != self.slot_size:
+            raise ValueError(f"Expected {self.slot_size} bytes, got {len(levels)}")
+        payload = levels
+        if self.compression == COMPRESSION_RLE:
+            encoded = rle_encode(levels)
+            if len(encoded) < self.slot_size:
+                payload = encoded
+
+        with self._lock:
+            if key in self._index:
+                return False
+            if len(self._index) < self.slots:
+                used = set(self._index.values())
+                slot = next(slot for slot in range(self.slots) if slot not in used)
+            else:
+                oldest = min(self._index)
+                if key < oldest:
+                    return False
+                slot = self._index.pop(oldest)
+            # Clear the entry first so a crash mid-write never exposes a torn frame
+            self._write_entry(slot, 0, 0)
+            offset = self.data_offset + slot * self.slot_size
+            self._mm[offset:offset + len(payload)] = payload
+            self._write_entry(slot, key, len(payload))
+            self._index[key] = slot
+        return True
+
+    def frames(self, start=None, end=None):
+        """Frames with start <= timestamp <= end, oldest first
+
+        Args:
+            start, end: Optional YYYYMMDDHHmm bounds (inclusive)
+
+        Returns:
+            List of (timestamp, levels) where levels is a memoryview into the
+            mapped file for raw slots (valid until the slot is overwritten) or
+            decoded bytes for RLE slots
+        """
+        low = int(start) if start is not None else 0
+        high = int(end) if end is not None else 10 ** 12
+        view = memoryview(self._mm)
+        result = []
+        with self._lock:
+            for timestamp in sorted(key for key in self._index if low <= key <= high):
+                slot = self._index[timestamp]
+                _, length = INDEX_ENTRY.unpack_from(self._mm, HEADER_SIZE + slot * INDEX_ENTRY.size)
+                offset = self.data_offset + slot * self.slot_size
+                data = view[offset:offset + length]
+                if length != self.slot_size:
+                    data = rle_decode(data)
+                result.append((str(timestamp), data))
+        return result
+
+    def levels(self, timestamp):
+        """Copy of one frame's levels as an 'L' image, or None if it is not archived
+
+        Unlike frames(), the copy stays valid if the slot is overwritten later.
+        """
+        key = int(timestamp)
+        with self._lock:
+            slot = self._index.get(key)
+            if slot is None:
+                return None
+            _, length = INDEX_ENTRY.unpack_from(self._mm, HEADER_SIZE + slot * INDEX_ENTRY.size)
+            offset = self.data_offset + slot * self.slot_size
+            data = self._mm[offset:offset + length]
+        if length != self.slot_size:
+            data = rle_decode(data)
+        return Image.frombytes('L', (self.width, self.height), data)
+
+    def levels_image(self, levels):
+        """Wrap a frame's levels in an 'L' image (shares memory with a raw slot)"""
+        return Image.frombuffer('L', (self.width, self.height), levels, 'raw', 'L', 0, 1)
+
+    def close(self):
+        self._mm.flush()
+        try:
+            self._mm.close()
+        except BufferError:
+            # A caller still holds a view into the mapping; it is closed with the last view
+            pass
+        self._file.close()
+
+
+class EchoArchive:
+    """One EchoRing per radar product under a directory"""
+
+    def __init__(self, directory, hours, compression='none'):
+        self.directory = Path(directory)
+        self.hours = hours
+        if compression not in COMPRESSIONS:
+            logging.warning(f"Unknown echo archive compression '{compression}', using 'none'")
+            compression = 'none'
+        self.compression = compression
+        self.slots = max(1, int(hours * 60 // MIN_CADENCE_MINUTES))
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def ring(self, product_id, size=(512, 512)):
+        """Return (opening or creating) the ring for a product"""
+        with self._lock:
+            ring = self._rings.get(product_id)
+            if ring is None:
+                ring = EchoRing(self.directory / f"{product_id}.ring", size[0], size[1],
+                                self.slots, self.compression)
+                self._rings[product_id] = ring
+            return ring
+
+    def append(self, product_id, timestamp, image):
+        """Convert a cleaned RGBA frame to levels and archive it"""
+        levels = intensity_levels(image)
+        return self.ring(product_id, levels.size).append(timestamp, levels.tobytes())
+
+    def frames(self, product_id, start=None, end=None):
+        return self.ring(product_id).frames(start, end)
+
+    def close(self):
+        with self._lock:
+            for ring in self._rings.values():
+                ring.close()
+            self._rings.clear()
@@ -0,0 +1,125 @@
+"""
+MQTT publisher for radar outputs
+
+Pushes the encoded loop, the newest frame and the status JSON to retained
+MQTT topics whenever a cycle publishes new outputs to the FrameStore, so
+Home Assistant (MQTT camera / sensor) updates without polling files:
+
+    <prefix>/loop          radar_animated.gif bytes
+    <prefix>/latest        newest frame PNG bytes
+    <prefix>/status        radar_status.json
+    <prefix>/timestamp     radar_last_update.txt
+    <prefix>/availability  "online" / "offline" (last will)
+
+A topic is only published when its resource's ETag changed. Requires the
+optional `paho-mqtt` package; the network loop runs in paho's own thread
+and reconnects automatically.
+"""
+import logging
+import threading
+
+MQTT_QOS = 1
+MQTT_KEEPALIVE_SECONDS = 60
+
+
+class MQTTSink:
+    """Publishes FrameStore resources to retained MQTT topics"""
+
+    def __init__(self, host, port=1883, username=None, password=None, topic_prefix='bom_radar',
+                 topics=None, client_id=None):
+        """
+        Args:
+            host, port: MQTT broker address
+            username, password: Optional broker credentials
+            topic_prefix: Prefix for all topics (no trailing slash)
+            topics: Dict of {topic suffix: FrameStore resource name}
+            client_id: Optional MQTT client id
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.topic_prefix = topic_prefix.rstrip('/')
+        self.topics = topics or {}
+        self.client_id = client_id or f"{self.topic_prefix.replace('/', '_')}_radar"
+        self.client = None
+        self._lock = threading.Lock()
+        self._published = {}  # topic -> ETag of the retained payload on the broker
+        self._store = None
+
+    def topic(self, suffix):
+        return f"{self.topic_prefix}/{suffix}"
+
+    def start(self, store):
+        """Connect in the background and publish every future FrameStore update
+
+        Raises:
+            ImportError: If paho-mqtt is not installed
+        """
+        import paho.mqtt.client as mqtt
+
+        if hasattr(mqtt, 'CallbackAPIVersion'):  # paho-mqtt 2.x
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        else:
+            client = mqtt.Client(client_id=self.client_id)
+        if self.username:
+            client.username_pw_set(self.username, self.password)
+        client.will_set(self.topic('availability'), 'offline', qos=MQTT_QOS, retain=True)
+        client.on_connect = self._on_connect
+        client.reconnect_delay_set(min_delay=1, max_delay=120)
+        self.client = client
+        self._store = store
+
+        client.connect_async(self.host, self.port, keepalive=MQTT_KEEPALIVE_SECONDS)
+        client.loop_start()
+        store.add_listener(self.publish)
+        logging.info(f"Publishing radar outputs to MQTT {self.host}:{self.port} under {self.topic_prefix}/")
+
+    def stop(self):
+        """Mark the outputs offline and disconnect"""
+        if self.client is None:
+            return
+        try:
+            self.client.publish(self.topic('availability'), 'offline', qos=MQTT_QOS, retain=True).wait_for_publish(2)
+        except Exception:
+            pass
+        self.client.disconnect()
+        self.client.loop_stop()
+        self.client = None
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if getattr(reason_code, 'is_failure', reason_code != 0):
+            logging.error(f"MQTT connection to {self.host}:{self.port} refused: {reason_code}")
+            return
+        logging.info(f"Connected to MQTT broker {self.host}:{self.port}")
+        client.publish(self.topic('availability'), 'online', qos=MQTT_QOS, retain=True)
+        # The broker may have lost its retained messages; send everything again
+        with self._lock:
+            self._published.clear()
+        if self._store is not None:
+            self.publish(self._store)
+
+    def publish(self, store):
+        """Publish resources whose ETag changed since they were last sent"""
+        client = self.client
+        if client is None or not client.is_connected():
+            return 0
+        sent = 0
+        with self._lock:
+            for suffix, name in self.topics.items():
+                resource = store.get(name)
+                if resource is None:
+                    continue
+                data, etag, _ = resource
+                topic = self.topic(suffix)
+                if self._published.get(topic) == etag:
+                    continue
+                info = client.publish(topic, data, qos=MQTT_QOS, retain=True)
+                if info.rc == 0:
+                    self._published[topic] = etag
+                    sent += 1
+                else:
+                    logging.warning(f"MQTT publish to {topic} failed (rc={info.rc})")
+        if sent:
+            logging.debug(f"Published {sent} changed outputs to MQTT")
+        return sent
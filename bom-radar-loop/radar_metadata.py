@@ -12,7 +12,11 @@ Product ID format: IDRXYZ where:
 - YZ is a unique identifier for each radar location
 
 Data format: 'PRODUCT_ID': (latitude, longitude, km_per_pixel)
+
+A spatial index over the stations is built at import time (see the bottom of
+this file) for coverage and overlap queries.
 """
+import math
 
 RADAR_METADATA = {
     # Northern Territory
@@ -301,3 +305,141 @@ RADAR_METADATA = {
     'IDR983': (-25.696, 149.898, 0.5),  # Taroom 128km
     'IDR984': (-25.696, 149.898, 0.25), # Taroom 64km
 }
+
+
+# --- Spatial index -----------------------------------------------------------
+#
+# Stations (product ID without its range digit) are bucketed into a coarse
+# lat/lon grid once at import so coverage and overlap queries only look at
+# nearby stations instead of scanning every product.
+
+EARTH_RADIUS_KM = 6371.0
+CANVAS_HALF_PIXELS = 256        # Radar images are 512x512 centred on the station
+GRID_CELL_DEGREES = 2.0
+
+
+def station_of(product_id):
+    """Return the station prefix of a product ID (e.g. 'IDR02' for 'IDR023')"""
+    return product_id[:-1]
+
+
+def range_digit_of(product_id):
+    """Return the range digit of a product ID (e.g. '3' for 'IDR023')"""
+    return product_id[-1]
+
+
+def canvas_half_width_km(product_id):
+    """Half the width of a product's square image footprint, in km"""
+    return CANVAS_HALF_PIXELS * RADAR_METADATA[product_id][2]
+
+
+def offset_km(from_lat, from_lon, to_lat, to_lon):
+    """Approximate (east, north) offset in km between two points
+
+    Uses the same local equirectangular approximation as the image pipeline,
+    so results agree with the pixel offsets used for compositing.
+    """
+    dx = math.radians(to_lon - from_lon) * EARTH_RADIUS_KM * math.cos(math.radians(from_lat))
+    dy = math.radians(to_lat - from_lat) * EARTH_RADIUS_KM
+    return dx, dy
+
+
+def _grid_cell(lat, lon):
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lon / GRID_CELL_DEGREES))
+
+
+def _build_station_index():
+    stations = {}
+    for product_id, (lat, lon, _) in RADAR_METADATA.items():
+        station = stations.setdefault(station_of(product_id), {'lat': lat, 'lon': lon, 'products': {}})
+        station['products'][range_digit_of(product_id)] = product_id
+
+    grid = {}
+    for station_id, station in stations.items():
+        grid.setdefault(_grid_cell(station['lat'], station['lon']), []).append(station_id)
+    return stations, grid
+
+
+STATIONS, _STATION_GRID = _build_station_index()
+
+
+def stations_within(lat, lon, radius_km):
+    """Yield (station_id, dx_km, dy_km) for stations within a square search window
+
+    Args:
+        lat, lon: Centre of the search window in decimal degrees
+        radius_km: Half-width of the window in km
+    """
+    lat_span = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lon_span = lat_span / max(math.cos(math.radians(lat)), 0.01)
+    min_cell = _grid_cell(lat - lat_span, lon - lon_span)
+    max_cell = _grid_cell(lat + lat_span, lon + lon_span)
+
+    for cell_lat in range(min_cell[0], max_cell[0] + 1):
+        for cell_lon in range(min_cell[1], max_cell[1] + 1):
+            for station_id in _STATION_GRID.get((cell_lat, cell_lon), ()):
+                station = STATIONS[station_id]
+                dx, dy = offset_km(lat, lon, station['lat'], station['lon'])
+                if abs(dx) <= radius_km and abs(dy) <= radius_km:
+                    yield station_id, dx, dy
+
+
+def nearest_products(lat, lon, range_digit, k=3):
+    """Find the k nearest products whose image footprint covers a point
+
+    Args:
+        lat, lon: Point of interest in decimal degrees
+        range_digit: Product range digit ('1'=512km ... '4'=64km)
+        k: Maximum number of products to return (None for all)
+
+    Returns:
+        list: [(product_id, distance_km), ...] sorted by distance
+    """
+    matches = []
+    half_width = CANVAS_HALF_PIXELS * {'1': 2.0, '2': 1.0, '3': 0.5, '4': 0.25}.get(range_digit, 2.0)
+    for station_id, dx, dy in stations_within(lat, lon, half_width):
+        product_id = STATIONS[station_id]['products'].get(range_digit)
+        if product_id is None or abs(dx) > canvas_half_width_km(product_id) or \
+                abs(dy) > canvas_half_width_km(product_id):
+            continue
+        matches.append((product_id, math.hypot(dx, dy)))
+    matches.sort(key=lambda match: match[1])
+    return matches if k is None else matches[:k]
+
+
+def overlap_fraction(product_id, other_product_id):
+    """Fraction of product_id's canvas covered by other_product_id's canvas"""
+    lat, lon, _ = RADAR_METADATA[product_id]
+    other_lat, other_lon, _ = RADAR_METADATA[other_product_id]
+    dx, dy = offset_km(lat, lon, other_lat, other_lon)
+    half = canvas_half_width_km(product_id)
+    other_half = canvas_half_width_km(other_product_id)
+    overlap_x = max(0.0, min(half, dx + other_half) - max(-half, dx - other_half))
+    overlap_y = max(0.0, min(half, dy + other_half) - max(-half, dy - other_half))
+    return (overlap_x * overlap_y) / (4 * half * half)
+
+
+def overlapping_products(product_id, min_overlap=0.1):
+    """Find other stations' products (same range) overlapping a product's canvas
+
+    Args:
+        product_id: Primary product ID
+        min_overlap: Minimum fraction (0-1) of the primary canvas that must be covered
+
+    Returns:
+        list: [(product_id, overlap_fraction), ...] sorted by overlap, largest first
+    """
+    if product_id not in RADAR_METADATA:
+        return []
+    lat, lon, _ = RADAR_METADATA[product_id]
+    digit = range_digit_of(product_id)
+    matches = []
+    for station_id, _, _ in stations_within(lat, lon, 2 * canvas_half_width_km(product_id)):
+        other = STATIONS[station_id]['products'].get(digit)
+        if other is None or station_id == station_of(product_id):
+            continue
+        fraction = overlap_fraction(product_id, other)
+        if fraction >= min_overlap:
+            matches.append((other, fraction))
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return matches
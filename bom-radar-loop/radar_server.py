@@ -0,0 +1,300 @@
+"""
+Lightweight HTTP server for radar outputs
+
+Serves the most recently published radar loop, individual frames and the
+status JSON directly from the in-memory encoded buffers held by the
+processor, so dashboards never touch the disk copies under /config/www.
+
+Every resource carries a strong ETag and a Cache-Control header, and
+conditional requests (If-None-Match) are answered with 304 Not Modified.
+Adding ?wait=<seconds> to a conditional request turns it into a long-poll:
+the response is held until a new version of the resource is published or
+the wait expires.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+
+CONTENT_TYPES = {
+    '.gif': 'image/gif',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.json': 'application/json',
+    '.txt': 'text/plain; charset=utf-8',
+}
+
+CACHE_MAX_AGE = 30            # Seconds clients may reuse a response before revalidating
+MAX_LONG_POLL_SECONDS = 300   # Upper bound for ?wait= long-poll requests
+KEEP_ALIVE_TIMEOUT = 15       # Idle seconds before a keep-alive connection is closed
+MAX_HEADER_BYTES = 8192       # Requests with larger headers are rejected
+
+
+class FrameStore:
+    """Thread-safe holder for the latest set of encoded outputs
+
+    The processor publishes a complete cycle's outputs at once (possibly from a
+    worker thread); the HTTP server reads them from the event loop. Each publish
+    bumps the generation counter and wakes any long-poll waiters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources = {}
+        self._generation = 0
+        self._published_at = None
+        self._loop = None
+        self._changed = None
+        self._listeners = []
+
+    @staticmethod
+    def make_etag(data):
+        """Return a strong ETag for the given bytes"""
+        return '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+
+    @staticmethod
+    def content_type_for(name):
+        """Guess a Content-Type from a resource name"""
+        for suffix, content_type in CONTENT_TYPES.items():
+            if name.endswith(suffix):
+                return content_type
+        return 'application/octet-stream'
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def attach_loop(self, loop):
+        """Bind the store to the event loop used for long-poll notifications"""
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def add_listener(self, callback):
+        """Call `callback(store)` after every publish (from the publishing thread)"""
+        self._listeners.append(callback)
+
+    def publish(self, outputs, aliases=None):
+        """Replace the published resources with a new cycle's outputs
+
+        Args:
+            outputs: Dict of {name: bytes}
+            aliases: Optional dict of {alias: name} (e.g. 'latest.png')
+        """
+        resources = {}
+        for name, data in outputs.items():
+            resources[name] = (data, self.make_etag(data), self.content_type_for(name))
+        for alias, name in (aliases or {}).items():
+            if name in resources:
+                resources[alias] = resources[name]
+
+        with self._lock:
+            self._resources = resources
+            self._generation += 1
+            self._published_at = time.time()
+            generation = self._generation
+
+        logging.debug(f"Published {len(outputs)} outputs (generation {generation})")
+
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._notify)
+
+        for callback in self._listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                logging.error(f"Output listener failed: {e}")
+
+    def _notify(self):
+        # Wake every current waiter, then re-arm for the next publish
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def get(self, name):
+        """Return (data, etag, content_type) for a resource or None"""
+        with self._lock:
+            return self._resources.get(name)
+
+    def index(self):
+        """Return a JSON-serialisable listing of the published resources"""
+        with self._lock:
+            return {
+                'generation': self._generation,
+                'published_at': self._published_at,
+                'resources': {
+                    name: {'etag': etag, 'content_type': content_type, 'size': len(data)}
+                    for name, (data, etag, content_type) in self._resources.items()
+                },
+            }
+
+    async def wait_for_change(self, name, etag, timeout):
+        """Wait until the resource's ETag differs from `etag` or timeout expires
+
+        Returns:
+            The current (data, etag, content_type) tuple, or None if missing
+        """
+        deadline = self._loop.time() + timeout
+        while True:
+            current = self.get(name)
+            if current is None or current[1] != etag:
+                return current
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return current
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.get(name)
+
+
+class FrameServer:
+    """Minimal HTTP/1.1 server exposing a FrameStore"""
+
+    def __init__(self, store, host='0.0.0.0', port=8099):
+        self.store = store
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Start listening on the configured host and port"""
+        self.store.attach_loop(asyncio.get_running_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logging.info(f"HTTP server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        """Stop accepting connections"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            logging.info("HTTP server stopped")
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 431, b'Request header fields too large\n', close=True)
+                    break
+
+                if len(head) > MAX_HEADER_BYTES:
+                    await self._send(writer, 431, b'Request header fields too large\n', close=True)
+                    break
+
+                keep_alive = await self._handle_request(head, writer)
+                if not keep_alive:
+                    break
+        except Exception as e:
+            logging.debug(f"HTTP connection error: {e}")
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _handle_request(self, head, writer):
+        """Serve a single request; return True to keep the connection open"""
+        try:
+            lines = head.decode('latin-1').split('\r\n')
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            await self._send(writer, 400, b'Bad request\n', close=True)
+            return False
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = (version == 'HTTP/1.1' and connection != 'close') or connection == 'keep-alive'
+
+        if method not in ('GET', 'HEAD'):
+            await self._send(writer, 405, b'Method not allowed\n',
+                             extra={'Allow': 'GET, HEAD'}, close=not keep_alive)
+            return keep_alive
+
+        url = urlsplit(target)
+        name = url.path.lstrip('/')
+        query = parse_qs(url.query)
+
+        if name == '':
+            body = json.dumps(self.store.index(), indent=2).encode('utf-8')
+            await self._send(writer, 200, body, content_type='application/json',
+                             extra={'Cache-Control': 'no-cache'},
+                             head_only=method == 'HEAD', close=not keep_alive)
+            return keep_alive
+
+        resource = self.store.get(name)
+        if resource is None:
+            await self._send(writer, 404, b'Not found\n', close=not keep_alive)
+            return keep_alive
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and 'wait' in query and resource[1] in _parse_etags(if_none_match):
+            try:
+                wait = min(float(query['wait'][0]), MAX_LONG_POLL_SECONDS)
+            except ValueError:
+                wait = 0
+            if wait > 0:
+                resource = await self.store.wait_for_change(name, resource[1], wait)
+                if resource is None:
+                    await self._send(writer, 404, b'Not found\n', close=not keep_alive)
+                    return keep_alive
+
+        data, etag, content_type = resource
+        extra = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={CACHE_MAX_AGE}, must-revalidate',
+            'X-Radar-Generation': str(self.store.generation),
+        }
+
+        if if_none_match and (if_none_match.strip() == '*' or etag in _parse_etags(if_none_match)):
+            await self._send(writer, 304, b'', extra=extra, close=not keep_alive)
+            return keep_alive
+
+        await self._send(writer, 200, data, content_type=content_type, extra=extra,
+                         head_only=method == 'HEAD', close=not keep_alive)
+        return keep_alive
+
+    async def _send(self, writer, status, body, content_type='text/plain; charset=utf-8',
+                    extra=None, head_only=False, close=False):
+        reasons = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                   405: 'Method Not Allowed', 431: 'Request Header Fields Too Large'}
+        header_lines = [
+            f"HTTP/1.1 {status} {reasons.get(status, '')}",
+            f"Date: {formatdate(usegmt=True)}",
+            f"Connection: {'close' if close else 'keep-alive'}",
+        ]
+        if status != 304:
+            header_lines.append(f"Content-Type: {content_type}")
+            header_lines.append(f"Content-Length: {len(body)}")
+        for key, value in (extra or {}).items():
+            header_lines.append(f"{key}: {value}")
+        writer.write(('\r\n'.join(header_lines) + '\r\n\r\n').encode('latin-1'))
+        if body and not head_only and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+
+def _parse_etags(header_value):
+    """Split an If-None-Match header into individual (strong) ETags"""
+    etags = set()
+    for part in header_value.split(','):
+        part = part.strip()
+        if part.startswith('W/'):
+            part = part[2:]
+        if part:
+            etags.add(part)
+    return etags
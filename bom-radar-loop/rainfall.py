@@ -0,0 +1,216 @@
+"""
+Rainfall totals estimated from archived echo levels
+
+Each level of the BOM colour scale stands for a rain rate, so a frame of
+levels times the minutes it covers is a rainfall amount. A RainfallAccumulator
+keeps a per-pixel running total over a sliding window (1, 3, 24 hours, ...):
+frames are added as they are archived and subtracted again as they leave the
+window, reading their levels back from the EchoArchive. Each frame therefore
+costs a few whole-image passes in Pillow's C code whatever the window length;
+the window is only re-summed when it is first built (e.g. after a restart).
+
+Totals are held in micrometres in 32-bit 'I' images.
+"""
+import calendar
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont, ImageMath
+
+# Rain rate (mm/h) of each level of the BOM colour scale, level 1 to 15
+RAIN_RATES_MM_PER_HOUR = [0.2, 0.5, 1.5, 2.5, 4, 6, 10, 15, 20, 35, 50, 80, 120, 200, 360]
+MAX_FRAME_MINUTES = 10          # A scan stands for at most this long; longer gaps are not filled in
+DEFAULT_FRAME_MINUTES = 5       # Assumed for the oldest archived frame
+MICROMETRES_PER_MM = 1000
+
+# Rainfall total colour scale: lower bound (mm) and colour of each band
+RAINFALL_BANDS = [
+    (0.2, (200, 230, 255)), (1, (150, 200, 255)), (2, (90, 160, 255)), (5, (30, 110, 240)),
+    (10, (0, 180, 140)), (15, (0, 140, 60)), (20, (120, 200, 40)), (25, (240, 230, 40)),
+    (40, (255, 180, 0)), (50, (255, 120, 0)), (75, (240, 40, 0)), (100, (190, 0, 30)),
+    (150, (140, 0, 90)), (200, (100, 0, 140)), (300, (60, 0, 90)),
+]
+LEGEND_HEIGHT = 14
+
+# ImageMath.eval was renamed unsafe_eval in Pillow 11; expressions here are constants
+_image_math = getattr(ImageMath, 'unsafe_eval', None) or ImageMath.eval
+
+
+def _minutes(timestamp):
+    """Minutes since the epoch for a YYYYMMDDHHmm (UTC) timestamp"""
+    return calendar.timegm(time.strptime(str(timestamp), '%Y%m%d%H%M')) // 60
+
+
+@lru_cache(maxsize=16)
+def _amount_tables(minutes):
+    """Low and high byte lookup tables of each level's rainfall (micrometres) over `minutes`"""
+    amounts = [0] + [round(rate * minutes * MICROMETRES_PER_MM / 60) for rate in RAIN_RATES_MM_PER_HOUR]
+    amounts += [0] * (256 - len(amounts))
+    return [amount & 0xFF for amount in amounts], [amount >> 8 for amount in amounts]
+
+
+def frame_rainfall(levels, minutes):
+    """Rainfall (micrometres) represented by an 'L' image of levels, as an 'I' image
+
+    Amounts fit in 16 bits for up to MAX_FRAME_MINUTES, so the level lookup
+    is done with two 8-bit point() tables whose interleaved bytes form a
+    little-endian 16-bit image.
+    """
+    low, high = _amount_tables(minutes)
+    interleaved = Image.merge('LA', (levels.point(low), levels.point(high))).tobytes()
+    return Image.frombytes('I;16', levels.size, interleaved).convert('I')
+
+
+class RainfallAccumulator:
+    """Running rainfall total over a sliding window for one archived product"""
+
+    def __init__(self, ring, hours):
+        self.ring = ring
+        self.hours = hours
+        self.window_minutes = int(hours * 60)
+        self.total = Image.new('I', (ring.width, ring.height), 0)
+        self.frames = deque()  # (timestamp, minutes) in the window, oldest first
+
+    def reset(self):
+        self.total = Image.new('I', (self.ring.width, self.ring.height), 0)
+        self.frames.clear()
+
+    def _apply(self, timestamp, minutes, expression):
+        levels = self.ring.levels(timestamp)
+        if levels is None:
+            return False
+        self.total = _image_math(expression, total=self.total, rainfall=frame_rainfall(levels, minutes))
+        return True
+
+    def update(self):
+        """Add archived frames newer than the window's latest and subtract expired ones
+
+        A frame covers the minutes since the previous archived frame (at most
+        MAX_FRAME_MINUTES). Frames that arrive out of order are skipped.
+
+        Returns:
+            int: Number of frames added
+        """
+        timestamps = self.ring.timestamps()
+        if not timestamps:
+            return 0
+        window_start = _minutes(timestamps[-1]) - self.window_minutes
+        latest = int(self.frames[-1][0]) if self.frames else None
+
+        added = 0
+        previous = None
+        for timestamp in timestamps:
+            minute = _minutes(timestamp)
+            if minute > window_start and (latest is None or int(timestamp) > latest):
+                minutes = min(MAX_FRAME_MINUTES, minute - previous) if previous is not None else DEFAULT_FRAME_MINUTES
+                if self._apply(timestamp, minutes, 'total + rainfall'):
+                    self.frames.append((timestamp, minutes))
+                    added += 1
+            previous = minute
+
+        while self.frames and _minutes(self.frames[0][0]) <= window_start:
+            timestamp, minutes = self.frames.popleft()
+            if not self._apply(timestamp, minutes, 'total - rainfall'):
+                # Already overwritten in the archive: rebuild from what it still holds
+                logging.warning(f"Frame {timestamp} left the echo archive before the "
+                                f"{self.hours}h rainfall window, re-summing the window")
+                self.reset()
+                return self.update()
+        return added
+
+    def total_at(self, x, y):
+        """Rainfall total (mm) at a pixel, or None outside the image"""
+        if not (0 <= x < self.total.width and 0 <= y < self.total.height):
+            return None
+        return self.total.getpixel((x, y)) / MICROMETRES_PER_MM
+
+
+class RainfallTracker:
+    """Rainfall accumulators for every window and product, fed from an EchoArchive"""
+
+    def __init__(self, archive, windows):
+        """
+        Args:
+            archive: EchoArchive holding each product's levels
+            windows: Window lengths in hours, e.g. [1, 3, 24]
+        """
+        self.archive = archive
+        self.windows = sorted(set(windows))
+        self._accumulators = {}  # (product_id, hours) -> RainfallAccumulator
+
+    def update(self, product_ids):
+        """Bring the accumulators of these products up to date; forget other products"""
+        for key in [key for key in self._accumulators if key[0] not in product_ids]:
+            del self._accumulators[key]
+        for product_id in product_ids:
+            ring = self.archive.ring(product_id)
+            for hours in self.windows:
+                accumulator = self._accumulators.get((product_id, hours))
+                if accumulator is None:
+                    accumulator = RainfallAccumulator(ring, hours)
+                    self._accumulators[(product_id, hours)] = accumulator
+                added = accumulator.update()
+                if added:
+                    logging.debug(f"Added {added} frame(s) to the {hours}h rainfall total for {product_id}")
+
+    def mosaic(self, hours, layers, size):
+        """Merge per-product totals onto one canvas, keeping the larger total where radars overlap
+
+        Args:
+            hours: Window length
+            layers: List of (product_id, (offset_x, offset_y))
+            size: Canvas size
+
+        Returns:
+            'I' image of totals in micrometres
+        """
+        merged = Image.new('I', size, 0)
+        for product_id, offset in layers:
+            accumulator = self._accumulators.get((product_id, hours))
+            if accumulator is None:
+                continue
+            placed = Image.new('I', size, 0)
+            placed.paste(accumulator.total, offset)
+            merged = _image_math('max(merged, placed)', merged=merged, placed=placed)
+        return merged
+
+
+def colourise(total):
+    """Map an 'I' image of totals (micrometres) to RGBA on the rainfall scale
+
+    Pixels below the first band are transparent.
+    """
+    thresholds = {f"t{index}": round(lower * MICROMETRES_PER_MM) for index, (lower, _) in enumerate(RAINFALL_BANDS)}
+    expression = ' + '.join(f"(total >= t{index})" for index in range(len(RAINFALL_BANDS)))
+    bands = _image_math(expression, total=total, **thresholds).convert('L')
+    image = Image.frombytes('P', bands.size, bands.tobytes())
+    image.putpalette([0, 0, 0] + [channel for _, colour in RAINFALL_BANDS for channel in colour])
+    image.info['transparency'] = 0
+    return image.convert('RGBA')
+
+
+def _legend_font():
+    try:
+        return ImageFont.load_default(size=10)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def rainfall_legend(width):
+    """Legend bar for colourise(): one labelled box per band (mm)"""
+    legend = Image.new('RGBA', (width, LEGEND_HEIGHT), (255, 255, 255, 255))
+    draw = ImageDraw.Draw(legend)
+    font = _legend_font()
+    for index, (lower, colour) in enumerate(RAINFALL_BANDS):
+        left = index * width // len(RAINFALL_BANDS)
+        right = (index + 1) * width // len(RAINFALL_BANDS)
+        draw.rectangle([left, 0, right - 1, LEGEND_HEIGHT - 1], fill=colour + (255,))
+        label = f"{lower:g}"
+        text_width = draw.textlength(label, font=font)
+        # Dark text on light bands, white on dark ones
+        luminance = 0.299 * colour[0] + 0.587 * colour[1] + 0.114 * colour[2]
+        fill = (32, 32, 32, 255) if luminance > 128 else (255, 255, 255, 255)
+        draw.text(((left + right - text_width) / 2, 1), label, font=font, fill=fill)
+    return legend
@@ -0,0 +1,194 @@
+"""
+Upstream cache shared by co-located instances
+
+Several instances on one host (different products or output paths) can
+point at the same shared cache directory so that each BOM listing, radar
+frame and OSM tile is fetched from upstream once rather than once per
+instance. Entries are plain files:
+
+    listings/<name>         FTP directory listings (short-lived)
+    frames/<filename>       raw radar frames as served by BOM
+    locks/<key>.lock        lock file of an entry while it is being fetched
+
+Leader election is a per-entry `flock()`: the instance that takes the lock
+fetches and writes the entry (atomically, via rename), while the others
+block on the lock and then read what the leader wrote. Locks are released
+by the kernel if an instance dies, so a crashed leader never wedges the
+others; a follower that waits longer than SHARED_LOCK_TIMEOUT_SECONDS
+fetches the entry itself. The holder removes the lock file before
+releasing it, and a waiter that then gets the lock on the removed file
+opens the lock path again, so lock files do not pile up next to the
+entries.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+SHARED_LOCK_TIMEOUT_SECONDS = 120   # How long a follower waits for a leader before fetching itself
+SHARED_LOCK_POLL_SECONDS = 0.05
+
+
+class SharedCache:
+    """File cache under a directory shared between instances, coordinated by file locks"""
+
+    def __init__(self, directory, lock_timeout=SHARED_LOCK_TIMEOUT_SECONDS):
+        """
+        Args:
+            directory: Shared cache directory (created if missing)
+            lock_timeout: Seconds to wait for another instance's fetch before fetching anyway
+
+        Raises:
+            OSError: If file locks are not supported on this platform
+        """
+        if fcntl is None:
+            raise OSError("file locks (fcntl) are not available on this platform")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock_timeout = lock_timeout
+        self._stats_lock = threading.Lock()
+        self.stats = {'fetched': 0, 'shared_hits': 0, 'waited': 0, 'lock_timeouts': 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def path(self, key):
+        return self.directory / key
+
+    def lock_path(self, key):
+        return self.directory / 'locks' / f"{key}.lock"
+
+    @contextmanager
+    def lock(self, key):
+        """Hold the exclusive lock for an entry
+
+        Yields:
+            bool: True if the lock was taken, False if waiting timed out
+        """
+        lock_path = self.lock_path(key)
+        deadline = time.monotonic() + self.lock_timeout
+        waited = False
+        lock_file = None
+        try:
+            while True:
+                if lock_file is None:
+                    lock_path.parent.mkdir(parents=True, exist_ok=True)
+                    lock_file = open(lock_path, 'a+b')
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logging.warning(f"Timed out waiting for another instance to fetch {key}, fetching it here")
+                        self._count('lock_timeouts')
+                        locked = False
+                        break
+                    waited = True
+                    time.sleep(SHARED_LOCK_POLL_SECONDS)
+                    continue
+                # The previous holder removes the file before releasing it: only
+                # a lock on the file currently at lock_path counts
+                try:
+                    current = os.stat(lock_path)
+                    opened = os.fstat(lock_file.fileno())
+                    locked = (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+                except FileNotFoundError:
+                    locked = False
+                if locked:
+                    break
+                lock_file.close()
+                lock_file = None
+            if waited:
+                self._count('waited')
+            try:
+                yield locked
+            finally:
+                if locked:
+                    # Removed while held, so no other instance can be holding this file
+                    lock_path.unlink(missing_ok=True)
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # Releases the lock
+
+    def read(self, key, max_age=None):
+        """Return an entry's bytes, or None if it is missing or older than max_age seconds"""
+        path = self.path(key)
+        try:
+            if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key, data):
+        """Store an entry atomically so readers never see a partial file"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def fetch(self, key, loader, max_age=None):
+        """Return an entry, calling loader() to fetch it if no instance has yet
+
+        Args:
+            key: Entry path relative to the cache directory
+            loader: Callable returning the entry's bytes from upstream
+            max_age: Seconds an entry stays valid (None = never expires)
+
+        Returns:
+            bytes: The entry, from the cache or from loader()
+
+        Exceptions raised by loader() propagate; nothing is stored then.
+        """
+        data = self.read(key, max_age)
+        if data is not None:
+            self._count('shared_hits')
+            return data
+        with self.lock(key):
+            # The leader may have written the entry while this instance waited
+            data = self.read(key, max_age)
+            if data is not None:
+                self._count('shared_hits')
+                return data
+            data = loader()
+            self.write(key, data)
+            self._count('fetched')
+            return data
+
+    def prune(self, subdirectory, max_age):
+        """Delete entries in a subdirectory older than max_age seconds
+
+        Lock files are left alone: their holders remove them.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        cutoff = time.time() - max_age
+        deleted = 0
+        try:
+            entries = list(os.scandir(self.path(subdirectory)))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if entry.name.endswith('.lock'):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    deleted += 1
+            except FileNotFoundError:
+                pass  # Pruned by another instance
+        return deleted
+
+    def cache_stats(self):
+        """Return counters for the status file"""
+        with self._stats_lock:
+            return dict(self.stats)
@@ -0,0 +1,147 @@
+"""
+Incremental upload of radar outputs to an SMB share (standalone mode)
+
+Only files whose content changed since the last successful push are sent.
+Each file is streamed from the in-memory encoded output in chunks, several
+files are uploaded concurrently over the same cached SMB session, and the
+timestamp file is written last so that consumers watching it only see a
+complete set of images.
+
+The `client` is the `smbclient` module from `smbprotocol` by default; any
+object with the same `ClientConfig`, `makedirs`, `open_file` and
+`reset_connection_cache` functions can stand in for it (see
+`benchmarks/local_servers.py`).
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+SMB_UPLOAD_WORKERS = 4          # Files uploaded concurrently over one session
+SMB_CHUNK_SIZE = 256 * 1024     # Bytes per write request
+
+
+def _needs_reconnect(error):
+    """Whether an upload error means the cached session is unusable
+
+    smbclient reports per-file NT status errors (access denied, sharing
+    violation, ...) as OSError; anything else, or a dropped/timed-out
+    connection, means the session should be rebuilt.
+    """
+    return isinstance(error, (ConnectionError, TimeoutError)) or not isinstance(error, OSError)
+
+
+class SMBSync:
+    """Pushes changed outputs to //server/share/remote_path"""
+
+    def __init__(self, server, share, remote_path, username, password, client=None,
+                 workers=SMB_UPLOAD_WORKERS, chunk_size=SMB_CHUNK_SIZE):
+        self.destination = f"//{server}/{share}{remote_path or ''}"
+        self.username = username
+        self.password = password
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._client = client
+        self._configured = False
+        self._directory_ready = False
+        self._pushed = {}  # name -> digest of the content last written successfully
+
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _connect(self):
+        """Import and configure the SMB client once; the session is cached by smbclient"""
+        if self._client is None:
+            # Import smbclient only when needed (for backward compatibility)
+            import smbclient
+            self._client = smbclient
+        if not self._configured:
+            self._client.ClientConfig(username=self.username, password=self.password)
+            self._configured = True
+        if not self._directory_ready:
+            try:
+                self._client.makedirs(self.destination, exist_ok=True)
+                self._directory_ready = True
+            except Exception as e:
+                logging.warning(f"Could not create directory: {e}")
+        return self._client
+
+    def _upload(self, client, name, data):
+        with client.open_file(f"{self.destination}/{name}", mode="wb") as remote_file:
+            view = memoryview(data)
+            for offset in range(0, len(view), self.chunk_size):
+                remote_file.write(view[offset:offset + self.chunk_size])
+
+    def reset(self):
+        """Drop the cached session; the next sync reconnects and re-checks the directory"""
+        self._directory_ready = False
+        if self._client is not None:
+            try:
+                self._client.reset_connection_cache()
+            except Exception:
+                pass
+
+    def sync(self, files, last=None):
+        """
+        Upload files whose content changed since the last successful push
+
+        Args:
+            files: Dict of {name: bytes}
+            last: Optional name uploaded only after all other files succeeded
+
+        Returns:
+            Tuple of (uploaded, unchanged, failed) file counts
+        """
+        client = self._connect()
+        changed = []
+        for name, data in files.items():
+            digest = self.digest(data)
+            if self._pushed.get(name) != digest:
+                changed.append((name, data, digest))
+        unchanged = len(files) - len(changed)
+        final = [entry for entry in changed if entry[0] == last]
+        changed = [entry for entry in changed if entry[0] != last]
+
+        uploaded, failed, reconnect = 0, 0, False
+
+        def upload(entry):
+            name, data, _ = entry
+            logging.debug(f"Transferring {name} ({len(data)} bytes)...")
+            self._upload(client, name, data)
+            return entry
+
+        def record(entry, error):
+            nonlocal uploaded, failed, reconnect
+            name, _, digest = entry
+            if error is None:
+                self._pushed[name] = digest
+                uploaded += 1
+                return
+            # Forget the remote state so the file is retried next cycle
+            self._pushed.pop(name, None)
+            failed += 1
+            reconnect = reconnect or _needs_reconnect(error)
+            logging.error(f"Failed to transfer {name}: {error}")
+
+        if changed:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(changed)),
+                                    thread_name_prefix='smb-upload') as pool:
+                futures = [(entry, pool.submit(upload, entry)) for entry in changed]
+                for entry, future in futures:
+                    record(entry, future.exception())
+
+        for entry in final:
+            if failed:
+                # Keep the previous timestamp until every image is in place
+                self._pushed.pop(entry[0], None)
+                failed += 1
+                continue
+            try:
+                upload(entry)
+                record(entry, None)
+            except Exception as e:
+                record(entry, e)
+
+        if reconnect:
+            self.reset()
+        return uploaded, unchanged, failed
@@ -0,0 +1,146 @@
+"""
+Upstream sources for OpenStreetMap-style background tiles
+
+A tile source is where MapTileProvider gets tiles it does not have cached:
+
+- UrlTileSource: any XYZ URL template, e.g. the public OpenStreetMap server
+  or a self-hosted tileserver on the LAN
+- DirectoryTileSource: a local {z}/{x}/{y}.png directory tree
+- MBTilesTileSource: a local MBTiles file
+
+`open_tile_source()` picks one from a single config string. Requests to
+URL sources pass through a TokenBucket so bulk background builds stay
+within the tile server's usage policy.
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+
+from tile_store import MBTilesStore, MBTILES_SUFFIX
+
+OSM_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+
+
+class TileNotFound(Exception):
+    """The source does not have this tile (not a sign the source is unhealthy)"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class UrlTileSource:
+    """Tiles from an XYZ URL template such as https://host/{z}/{x}/{y}.png"""
+
+    remote = True
+
+    def __init__(self, template, user_agent, limiter=None, timeout=10):
+        self.template = template
+        self.user_agent = user_agent
+        self.limiter = limiter
+        self.timeout = timeout
+
+    @property
+    def name(self):
+        return self.template
+
+    def fetch(self, z, x, y):
+        """Return the tile's encoded bytes"""
+        # Only OSM backgrounds need urllib, so keep it off the startup path
+        import urllib.error
+        import urllib.request
+
+        if self.limiter is not None:
+            self.limiter.acquire()
+        url = self.template.format(z=z, x=x, y=y)
+        request = urllib.request.Request(url, headers={'User-Agent': self.user_agent})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise TileNotFound(f"{url} not found") from e
+            raise
+
+
+class DirectoryTileSource:
+    """Tiles from a local {z}/{x}/{y}.png directory tree (read-only)"""
+
+    remote = False
+
+    def __init__(self, path):
+        self.root = Path(path)
+        if not self.root.is_dir():
+            logging.warning(f"Tile source directory {self.root} does not exist")
+
+    @property
+    def name(self):
+        return str(self.root)
+
+    def fetch(self, z, x, y):
+        path = self.root / str(z) / str(x) / f"{y}.png"
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            raise TileNotFound(f"{path} not found") from None
+
+
+class MBTilesTileSource:
+    """Tiles from a local MBTiles file (read-only)"""
+
+    remote = False
+
+    def __init__(self, path):
+        self._store = MBTilesStore(path, readonly=True)
+
+    @property
+    def name(self):
+        return str(self._store.path)
+
+    def fetch(self, z, x, y):
+        data = self._store.read_tile(z, x, y)
+        if data is None:
+            raise TileNotFound(f"{z}/{x}/{y} not in {self.name}")
+        return data
+
+
+def open_tile_source(spec, user_agent, rate_limit=0, burst=None):
+    """Create a tile source from a config string
+
+    Args:
+        spec: XYZ URL template (http/https), path to a .mbtiles file, or a
+            tile directory. Empty/None means the public OpenStreetMap server.
+        user_agent: User-Agent header for URL sources
+        rate_limit: Requests per second for URL sources (0 = unlimited)
+        burst: Burst size for the rate limiter (default: 2 seconds' worth)
+    """
+    spec = spec or OSM_TILE_URL
+    if spec.startswith(('http://', 'https://')):
+        limiter = None
+        if rate_limit and rate_limit > 0:
+            limiter = TokenBucket(rate_limit, burst if burst is not None else 2 * rate_limit)
+        return UrlTileSource(spec, user_agent, limiter)
+    if spec.endswith(MBTILES_SUFFIX):
+        return MBTilesTileSource(spec)
+    return DirectoryTileSource(spec)
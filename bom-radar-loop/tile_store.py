@@ -0,0 +1,426 @@
+"""
+Persistent stores for OpenStreetMap background tiles
+
+DirectoryTileStore keeps the original tile_cache/{z}/{x}/{y}.png layout,
+where the file modification time records when a tile was fetched.
+
+MBTilesStore keeps every tile in a single SQLite file using the MBTiles 1.3
+schema (TMS row numbering), with a side table recording when each tile was
+fetched and last used, so cache expiry and LRU eviction survive imports and
+restarts. A whole background grid is read with one query instead of one
+exists()/stat() per tile, which matters on SD cards with slow metadata
+operations.
+
+Bundles can be exported from either store and imported into either store,
+for example to pre-seed the cache of an offline install:
+
+    python tile_store.py export /config/www/bom_radar/tile_cache bundle.mbtiles
+    python tile_store.py import bundle.mbtiles /config/www/bom_radar/tile_cache.mbtiles
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+MBTILES_SUFFIX = '.mbtiles'
+EVICTION_TARGET_FRACTION = 0.9   # Evict down to 90% of the budget so eviction doesn't run on every put
+ITEMS_BATCH_SIZE = 500           # Tiles read per query when iterating a whole MBTiles store
+
+
+class DirectoryTileStore:
+    """Tiles as individual files under {root}/{z}/{x}/{y}.png
+
+    The size/last-access index is built by scanning the directory once
+    (scan() or the first evict()) and maintained as tiles are read and
+    written. Access times are kept in memory and written to the files'
+    atimes in one batch on evict() and close(), so LRU order survives
+    restarts even on noatime mounts without a metadata write per read.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = None   # {(z, x, y): [size, last_access]} once scanned
+        self._accessed = {}  # {(z, x, y): last_access} not yet written to the files
+        self.total_bytes = None
+
+    def _path(self, z, x, y):
+        return self.root / str(z) / str(x) / f"{y}.png"
+
+    def get(self, z, x, y):
+        """Return (data, fetched_at) for a tile, or None if not stored"""
+        path = self._path(z, x, y)
+        try:
+            fetched_at = path.stat().st_mtime
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        with self._lock:
+            self._accessed[(z, x, y)] = now
+            if self._index is not None and (z, x, y) in self._index:
+                self._index[(z, x, y)][1] = now
+        return data, fetched_at
+
+    def get_many(self, z, coords):
+        """Return {(x, y): (data, fetched_at)} for the stored tiles among coords"""
+        found = {}
+        for x, y in coords:
+            entry = self.get(z, x, y)
+            if entry is not None:
+                found[(x, y)] = entry
+        return found
+
+    def put(self, z, x, y, data, fetched_at=None):
+        """Store a tile's encoded bytes"""
+        path = self._path(z, x, y)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        if fetched_at is not None:
+            os.utime(path, (time.time(), fetched_at))
+        with self._lock:
+            if self._index is not None:
+                previous = self._index.get((z, x, y))
+                self.total_bytes += len(data) - (previous[0] if previous else 0)
+                self._index[(z, x, y)] = [len(data), time.time()]
+
+    def scan(self):
+        """(Re)build the size and last-access index from the files on disk"""
+        index = {}
+        for path in self.root.glob('*/*/*.png'):
+            try:
+                key = (int(path.parent.parent.name), int(path.parent.name), int(path.stem))
+                st = path.stat()
+            except (ValueError, OSError):
+                continue
+            index[key] = [st.st_size, st.st_atime]
+        with self._lock:
+            for key, last_access in self._accessed.items():
+                if key in index:
+                    index[key][1] = max(index[key][1], last_access)
+            self._index = index
+            self.total_bytes = sum(size for size, _ in index.values())
+
+    def evict(self, max_bytes):
+        """Delete least recently used tiles until the store fits in max_bytes
+
+        Returns:
+            tuple: (tiles evicted, bytes freed)
+        """
+        if self._index is None:
+            self.scan()
+        with self._lock:
+            if self.total_bytes <= max_bytes:
+                return 0, 0
+            target = max_bytes * EVICTION_TARGET_FRACTION
+            victims = []
+            for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if self.total_bytes <= target:
+                    break
+                victims.append(key)
+                self.total_bytes -= size
+                del self._index[key]
+                self._accessed.pop(key, None)
+
+        freed = 0
+        for z, x, y in victims:
+            path = self._path(z, x, y)
+            try:
+                freed += path.stat().st_size
+                path.unlink()
+            except OSError:
+                pass
+        self.flush_access_times()
+        return len(victims), freed
+
+    def flush_access_times(self):
+        """Write the access times recorded since the last flush to the files' atimes"""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        for (z, x, y), last_access in accessed.items():
+            path = self._path(z, x, y)
+            try:
+                os.utime(path, (last_access, path.stat().st_mtime))
+            except OSError:
+                pass
+
+    def items(self):
+        """Yield (z, x, y, data, fetched_at) for every stored tile"""
+        for path in self.root.glob('*/*/*.png'):
+            try:
+                z, x, y = int(path.parent.parent.name), int(path.parent.name), int(path.stem)
+            except ValueError:
+                continue
+            yield z, x, y, path.read_bytes(), path.stat().st_mtime
+
+    def close(self):
+        self.flush_access_times()
+
+
+class MBTilesStore:
+    """Tiles in a single SQLite file (MBTiles 1.3) plus per-tile cache metadata
+
+    The tile_info side table records each tile's fetch time (for expiry),
+    last access (for LRU eviction) and size. Standard MBTiles readers ignore it.
+    """
+
+    def __init__(self, path, readonly=False, journal_mode='WAL'):
+        """
+        Args:
+            path: MBTiles file path (created if missing unless readonly)
+            readonly: Open an existing file without modifying it
+            journal_mode: SQLite journal mode; bundles meant to be copied
+                elsewhere use 'DELETE' so they are a single self-contained file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.total_bytes = None
+        if readonly:
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared between the scheduler's worker threads; access is serialised by _lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(f'PRAGMA journal_mode={journal_mode}')
+            self._db.execute('CREATE TABLE IF NOT EXISTS metadata (name TEXT, value TEXT)')
+            self._db.execute('CREATE UNIQUE INDEX IF NOT EXISTS metadata_name ON metadata (name)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS tiles ('
+                             'zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB)')
+            self._db.execute('CREATE UNIQUE INDEX IF NOT EXISTS tile_index '
+                             'ON tiles (zoom_level, tile_column, tile_row)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS tile_info ('
+                             'zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, '
+                             'fetched_at REAL, last_access REAL, size INTEGER, '
+                             'PRIMARY KEY (zoom_level, tile_column, tile_row))')
+            self._db.execute('CREATE INDEX IF NOT EXISTS tile_info_access ON tile_info (last_access)')
+            for name, value in (('name', 'BoM radar background tiles'), ('format', 'png'),
+                                ('type', 'baselayer'), ('version', '1.3')):
+                self._db.execute('INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)', (name, value))
+            self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM tile_info').fetchone()[0]
+
+    @staticmethod
+    def _tms_row(z, y):
+        # MBTiles numbers rows from the south (TMS); XYZ tiles from the north
+        return (1 << z) - 1 - y
+
+    def scan(self):
+        """Re-read the stored size, e.g. after other processes wrote to the file"""
+        with self._lock:
+            self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM tile_info').fetchone()[0]
+
+    def get(self, z, x, y):
+        """Return (data, fetched_at) for a tile, or None if not stored"""
+        return self.get_many(z, [(x, y)]).get((x, y))
+
+    def read_tile(self, z, x, y):
+        """Return a tile's encoded bytes, or None if not stored
+
+        A plain lookup that leaves the cache metadata alone, so it also
+        works on read-only bundles without a tile_info table.
+        """
+        with self._lock:
+            result = self._db.execute(
+                'SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+                (z, x, self._tms_row(z, y))
+            ).fetchone()
+        return result[0] if result is not None else None
+
+    def get_many(self, z, coords):
+        """Return {(x, y): (data, fetched_at)} for the stored tiles among coords
+
+        The bounding box of coords is read in a single query and the hits'
+        access times are updated in a single transaction.
+        """
+        coords = list(coords)
+        if not coords:
+            return {}
+        xs = [x for x, _ in coords]
+        rows = [self._tms_row(z, y) for _, y in coords]
+        now = time.time()
+        with self._lock:
+            result = self._db.execute(
+                'SELECT t.tile_column, t.tile_row, t.tile_data, i.fetched_at FROM tiles t '
+                'LEFT JOIN tile_info i ON i.zoom_level = t.zoom_level '
+                'AND i.tile_column = t.tile_column AND i.tile_row = t.tile_row '
+                'WHERE t.zoom_level = ? AND t.tile_column BETWEEN ? AND ? AND t.tile_row BETWEEN ? AND ?',
+                (z, min(xs), max(xs), min(rows), max(rows))
+            ).fetchall()
+            wanted = set(coords)
+            found = {}
+            touched = []
+            for column, row, data, fetched_at in result:
+                coord = (column, self._tms_row(z, row))
+                if coord in wanted:
+                    # Tiles imported without a fetch time count as fetched now
+                    found[coord] = (data, fetched_at if fetched_at is not None else now)
+                    touched.append((now, z, column, row))
+            if touched:
+                with self._db:
+                    self._db.executemany('UPDATE tile_info SET last_access = ? '
+                                         'WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?', touched)
+        return found
+
+    def put(self, z, x, y, data, fetched_at=None):
+        """Store a tile's encoded bytes"""
+        self.put_many([(z, x, y, data, fetched_at)])
+
+    def put_many(self, tiles):
+        """Store (z, x, y, data, fetched_at) tuples in one transaction"""
+        now = time.time()
+        with self._lock, self._db:
+            for z, x, y, data, fetched_at in tiles:
+                row = self._tms_row(z, y)
+                previous = self._db.execute('SELECT size FROM tile_info WHERE zoom_level = ? '
+                                            'AND tile_column = ? AND tile_row = ?', (z, x, row)).fetchone()
+                self._db.execute('INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) '
+                                 'VALUES (?, ?, ?, ?)', (z, x, row, sqlite3.Binary(data)))
+                self._db.execute('INSERT OR REPLACE INTO tile_info '
+                                 '(zoom_level, tile_column, tile_row, fetched_at, last_access, size) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)',
+                                 (z, x, row, fetched_at if fetched_at is not None else now, now, len(data)))
+                self.total_bytes += len(data) - ((previous[0] or 0) if previous else 0)
+
+    def evict(self, max_bytes):
+        """Delete least recently used tiles until the store fits in max_bytes
+
+        Freed pages are reused by later tiles; the file itself does not shrink.
+
+        Returns:
+            tuple: (tiles evicted, bytes freed)
+        """
+        with self._lock:
+            if self.total_bytes <= max_bytes:
+                return 0, 0
+            excess = self.total_bytes - max_bytes * EVICTION_TARGET_FRACTION
+            victims = []
+            freed = 0
+            for z, column, row, size in self._db.execute(
+                    'SELECT zoom_level, tile_column, tile_row, size FROM tile_info ORDER BY last_access'):
+                if freed >= excess:
+                    break
+                victims.append((z, column, row))
+                freed += size or 0
+            with self._db:
+                for table in ('tiles', 'tile_info'):
+                    self._db.executemany(f'DELETE FROM {table} WHERE zoom_level = ? '
+                                         'AND tile_column = ? AND tile_row = ?', victims)
+            self.total_bytes -= freed
+        return len(victims), freed
+
+    def items(self, batch_size=ITEMS_BATCH_SIZE):
+        """Yield (z, x, y, data, fetched_at) for every stored tile
+
+        Tiles are read batch_size at a time in tile order, each batch in its
+        own query, so neither the whole store nor the lock is held while
+        the caller consumes them.
+        """
+        with self._lock:
+            has_info = self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tile_info'"
+            ).fetchone() is not None
+        if has_info:
+            query = ('SELECT t.zoom_level, t.tile_column, t.tile_row, t.tile_data, i.fetched_at FROM tiles t '
+                     'LEFT JOIN tile_info i ON i.zoom_level = t.zoom_level '
+                     'AND i.tile_column = t.tile_column AND i.tile_row = t.tile_row '
+                     'WHERE (t.zoom_level, t.tile_column, t.tile_row) > (?, ?, ?) '
+                     'ORDER BY t.zoom_level, t.tile_column, t.tile_row LIMIT ?')
+        else:
+            query = ('SELECT zoom_level, tile_column, tile_row, tile_data, NULL FROM tiles '
+                     'WHERE (zoom_level, tile_column, tile_row) > (?, ?, ?) '
+                     'ORDER BY zoom_level, tile_column, tile_row LIMIT ?')
+        last = (-1, -1, -1)
+        while True:
+            with self._lock:
+                rows = self._db.execute(query, (*last, batch_size)).fetchall()
+            for z, x, row, data, fetched_at in rows:
+                yield z, x, self._tms_row(z, row), data, fetched_at
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][:3]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_tile_store(path):
+    """Open an MBTiles file or a tile directory, depending on the path"""
+    if str(path).endswith(MBTILES_SUFFIX):
+        return MBTilesStore(path)
+    return DirectoryTileStore(path)
+
+
+def copy_tiles(source, target, batch_size=500):
+    """Copy every tile (and its fetch time) from one store to another
+
+    Returns:
+        int: Number of tiles copied
+    """
+    count = 0
+    batch = []
+    for tile in source.items():
+        batch.append(tile)
+        if len(batch) >= batch_size:
+            count += _put_batch(target, batch)
+            batch = []
+    count += _put_batch(target, batch)
+    return count
+
+
+def _put_batch(target, batch):
+    if isinstance(target, MBTilesStore):
+        target.put_many(batch)
+    else:
+        for z, x, y, data, fetched_at in batch:
+            target.put(z, x, y, data, fetched_at)
+    return len(batch)
+
+
+def import_bundle(bundle_path, store):
+    """Import an MBTiles bundle into a store
+
+    Returns:
+        int: Number of tiles imported
+    """
+    bundle = MBTilesStore(bundle_path, readonly=True)
+    try:
+        return copy_tiles(bundle, store)
+    finally:
+        bundle.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export BoM radar background tiles as MBTiles')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='Export a tile cache (directory or .mbtiles) to an MBTiles bundle')
+    export.add_argument('cache', help='Tile cache directory or .mbtiles file')
+    export.add_argument('bundle', help='MBTiles file to write')
+    imp = sub.add_parser('import', help='Import an MBTiles bundle into a tile cache')
+    imp.add_argument('bundle', help='MBTiles file to read')
+    imp.add_argument('cache', help='Tile cache directory or .mbtiles file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'export':
+        source, target = open_tile_store(args.cache), MBTilesStore(args.bundle, journal_mode='DELETE')
+        count = copy_tiles(source, target)
+        source.close()
+        target.close()
+        logging.info(f"Exported {count} tiles to {args.bundle}")
+    else:
+        store = open_tile_store(args.cache)
+        count = import_bundle(args.bundle, store)
+        store.close()
+        logging.info(f"Imported {count} tiles into {args.cache}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Streaming time-lapse archive of rendered radar frames
+
+Every newly rendered loop frame is appended to a per-day archive under the
+time-lapse directory, one frame at a time as cycles complete:
+
+- With a local `ffmpeg` binary, frames are piped to an H.264 MP4 per day
+  (YYYY-MM-DD_HHMM.mp4, named after its first frame). The MP4 is fragmented,
+  so a segment is playable even if the add-on stops mid-day.
+- Otherwise the already-encoded PNG of each frame is written as
+  YYYY-MM-DD/HHMM.png, ready for any external tool to assemble.
+
+Days follow the configured local timezone. Nothing but the current frame is
+held in memory, and the oldest days are deleted once the directory exceeds
+its disk budget.
+"""
+import logging
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import pytz
+
+TIMELAPSE_FRAME_RATE = 10       # Frames per second of the MP4 segments
+TIMELAPSE_FORMATS = ('auto', 'mp4', 'frames')
+LAST_TIMESTAMP_FILENAME = '.last_timestamp'
+
+
+def _size(path):
+    """Bytes used by a file or (recursively) a directory"""
+    if path.is_dir():
+        return sum(entry.stat().st_size for entry in path.rglob('*') if entry.is_file())
+    return path.stat().st_size
+
+
+class TimelapseWriter:
+    """Appends frames to per-day MP4 segments or PNG sequences with a disk budget"""
+
+    def __init__(self, directory, timezone, max_mb=0, format='auto', frame_rate=TIMELAPSE_FRAME_RATE):
+        """
+        Args:
+            directory: Where day archives are written
+            timezone: Timezone name that decides which day a frame belongs to
+            max_mb: Disk budget for the whole directory (0 = unlimited)
+            format: 'mp4' (needs ffmpeg), 'frames', or 'auto' to use ffmpeg when available
+            frame_rate: Frames per second of MP4 segments
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.timezone = pytz.timezone(timezone)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.frame_rate = frame_rate
+
+        self.ffmpeg = None
+        if format in ('auto', 'mp4'):
+            self.ffmpeg = shutil.which('ffmpeg')
+            if self.ffmpeg is None and format == 'mp4':
+                logging.warning("ffmpeg not found, archiving the time-lapse as PNG frames")
+
+        self._day = None
+        self._sizes = {}            # Sizes of finished day archives, measured once
+        self._segment = None        # Path of the MP4 being written
+        self._process = None        # ffmpeg process for the current segment
+        self._last_path = self.directory / LAST_TIMESTAMP_FILENAME
+        try:
+            self.last_timestamp = self._last_path.read_text().strip() or None
+        except FileNotFoundError:
+            self.last_timestamp = None
+
+    @property
+    def format(self):
+        return 'mp4' if self.ffmpeg else 'frames'
+
+    def _local_time(self, timestamp):
+        utc = pytz.utc.localize(datetime.strptime(timestamp, '%Y%m%d%H%M'))
+        return utc.astimezone(self.timezone)
+
+    def _start_segment(self, day, local_time):
+        self._segment = self.directory / f"{day}_{local_time:%H%M}.mp4"
+        command = [
+            self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'image2pipe', '-framerate', str(self.frame_rate), '-c:v', 'png', '-i', '-',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', '-g', str(self.frame_rate),
+            # Fragmented MP4: every keyframe closes a fragment, so a partial day still plays
+            '-movflags', 'frag_keyframe+empty_moov+default_base_moof',
+            str(self._segment),
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        logging.info(f"Started time-lapse segment {self._segment.name}")
+
+    def _finish_segment(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"ffmpeg did not finish {self._segment.name} cleanly: {e}")
+            self._process.kill()
+        self._process = None
+        self._segment = None
+
+    def append(self, timestamp, png_data):
+        """Add one frame (YYYYMMDDHHmm, encoded PNG bytes); frames not newer than the last are skipped
+
+        Returns:
+            bool: True if the frame was archived
+        """
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        local_time = self._local_time(timestamp)
+        day = f"{local_time:%Y-%m-%d}"
+        if day != self._day:
+            self._finish_segment()
+            self._day = day
+
+        if self.ffmpeg:
+            if self._process is None:
+                self._start_segment(day, local_time)
+            try:
+                self._process.stdin.write(png_data)
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                logging.error(f"ffmpeg stopped ({e}), archiving the time-lapse as PNG frames from now on")
+                self._finish_segment()
+                self.ffmpeg = None
+        if not self.ffmpeg:
+            day_directory = self.directory / day
+            day_directory.mkdir(exist_ok=True)
+            path = day_directory / f"{local_time:%H%M}.png"
+            tmp_path = path.with_suffix('.png.tmp')
+            tmp_path.write_bytes(png_data)
+            os.replace(tmp_path, path)
+
+        self.last_timestamp = timestamp
+        return True
+
+    def commit(self):
+        """Record the last archived frame (so a restart does not repeat it) and apply the disk budget"""
+        if self.last_timestamp is not None:
+            self._last_path.write_text(self.last_timestamp)
+        if self.max_bytes:
+            self.enforce_budget()
+
+    def enforce_budget(self):
+        """Delete the oldest day archives until the directory fits in its budget
+
+        The segment or day currently being written is never deleted.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        entries = sorted(
+            (path for path in self.directory.iterdir() if not path.name.startswith('.')),
+            key=lambda path: path.name
+        )
+        sizes = {}
+        for path in entries:
+            if path == self._segment or path.name == self._day:
+                sizes[path] = _size(path)
+            else:
+                sizes[path] = self._sizes.get(path.name)
+                if sizes[path] is None:
+                    sizes[path] = self._sizes[path.name] = _size(path)
+        total = sum(sizes.values())
+        deleted = 0
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == self._segment or path.name == self._day:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            total -= sizes[path]
+            self._sizes.pop(path.name, None)
+            deleted += 1
+            logging.info(f"Deleted time-lapse {path.name} to stay within {self.max_bytes // (1024 * 1024)} MB")
+        return deleted
+
+    def close(self):
+        self._finish_segment()
+        self.commit()